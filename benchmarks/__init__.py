@@ -0,0 +1,3 @@
+"""
+Scale benchmarks of fastwg, run with `python -m benchmarks`
+"""
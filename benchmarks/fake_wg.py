@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Scriptable stand-in for `wg` and `wg-quick`
+
+Interface state lives in FAKE_WG_DIR as one `<interface>.dump` file per
+running interface, in `wg show all dump` format, so `show` only copies
+files. Every invocation is appended to `calls.log` as a JSON line.
+
+Environment:
+    FAKE_WG_DIR         state directory (required)
+    FAKE_WG_CONFIG_DIR  directory wg-quick reads `<interface>.conf` from
+    FAKE_WG_FAIL        comma-separated subcommands to fail, e.g. "syncconf"
+    FAKE_WG_DELAY       seconds to sleep in every call
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Keys of interface-level settings dropped by `wg-quick strip`
+QUICK_ONLY = (
+    "address",
+    "dns",
+    "mtu",
+    "table",
+    "preup",
+    "postup",
+    "predown",
+    "postdown",
+    "saveconfig",
+)
+
+# Peer fields kept in dump files
+Peer = List[str]
+
+
+def state_dir() -> str:
+    """Returns state directory"""
+    return os.environ["FAKE_WG_DIR"]
+
+
+def dump_path(interface: str) -> str:
+    """Returns dump file of interface"""
+    return os.path.join(state_dir(), f"{interface}.dump")
+
+
+def log_call(tool: str, args: List[str]) -> None:
+    """Appends invocation to call log"""
+    with open(os.path.join(state_dir(), "calls.log"), "a") as f:
+        f.write(json.dumps({"tool": tool, "args": args, "time": time.time()}) + "\n")
+
+
+def read_interface(interface: str) -> Optional[Tuple[List[str], Dict[str, Peer]]]:
+    """Reads interface row and peers by public key, None if it is down"""
+    try:
+        with open(dump_path(interface)) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    if not lines:
+        return None
+    peers = {}
+    for line in lines[1:]:
+        fields = line.split("\t")
+        peers[fields[1]] = fields
+    return lines[0].split("\t"), peers
+
+
+def write_interface(header: List[str], peers: Dict[str, Peer]) -> None:
+    """Replaces dump file of interface"""
+    path = dump_path(header[0])
+    with open(path + ".tmp", "w") as f:
+        f.write("\t".join(header) + "\n")
+        for fields in peers.values():
+            f.write("\t".join(fields) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def new_peer(interface: str, public_key: str, allowed_ips: str) -> Peer:
+    """Returns dump fields of peer that never connected"""
+    return [
+        interface,
+        public_key,
+        "(none)",
+        "(none)",
+        allowed_ips,
+        "0",
+        "0",
+        "0",
+        "off",
+    ]
+
+
+def parse_config(text: str) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    """Parses interface settings and peer sections of a config"""
+    interface: Dict[str, str] = {}
+    peers: List[Dict[str, str]] = []
+    section: Optional[Dict[str, str]] = None
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if line.lower() == "[interface]":
+            section = interface
+        elif line.lower() == "[peer]":
+            section = {}
+            peers.append(section)
+        elif "=" in line and section is not None:
+            key, value = line.split("=", 1)
+            section[key.strip().lower()] = value.strip()
+    return interface, peers
+
+
+def fail(message: str, code: int = 1) -> int:
+    """Reports error the way wg does, returns exit code"""
+    sys.stderr.write(message + "\n")
+    return code
+
+
+def wg_show(args: List[str]) -> int:
+    """Handles `wg show interfaces` and `wg show <interface|all> dump`"""
+    if args == ["interfaces"]:
+        names = sorted(
+            n[: -len(".dump")] for n in os.listdir(state_dir()) if n.endswith(".dump")
+        )
+        print(" ".join(names))
+        return 0
+
+    if len(args) == 2 and args[1] == "dump":
+        if args[0] == "all":
+            for name in sorted(os.listdir(state_dir())):
+                if name.endswith(".dump"):
+                    with open(os.path.join(state_dir(), name)) as f:
+                        sys.stdout.write(f.read())
+            return 0
+
+        state = read_interface(args[0])
+        if state is None:
+            return fail("Unable to access interface: No such device")
+        header, peers = state
+        print("\t".join(header[1:]))
+        for fields in peers.values():
+            print("\t".join(fields[1:]))
+        return 0
+
+    return fail(f"Unsupported show arguments: {' '.join(args)}")
+
+
+def wg_set(args: List[str]) -> int:
+    """Handles `wg set` peer additions, updates and removals"""
+    state = read_interface(args[0])
+    if state is None:
+        return fail("Unable to modify interface: No such device")
+    header, peers = state
+
+    rest = args[1:]
+    current: Optional[str] = None
+    while rest:
+        word = rest.pop(0)
+        if word == "peer":
+            current = rest.pop(0)
+            peers.setdefault(current, new_peer(args[0], current, "(none)"))
+        elif word == "remove" and current:
+            peers.pop(current, None)
+            current = None
+        elif word == "allowed-ips" and current:
+            peers[current][4] = rest.pop(0)
+        elif word in ("endpoint", "persistent-keepalive", "preshared-key") and current:
+            rest.pop(0)
+        elif word in ("listen-port", "private-key", "fwmark"):
+            rest.pop(0)
+    write_interface(header, peers)
+    return 0
+
+
+def wg_syncconf(args: List[str]) -> int:
+    """Handles `wg syncconf`, keeping counters of remaining peers"""
+    interface, path = args
+    state = read_interface(interface)
+    if state is None:
+        return fail("Unable to modify interface: No such device")
+    header, peers = state
+
+    with open(path) as f:
+        _, sections = parse_config(f.read())
+    synced = {}
+    for section in sections:
+        key = section.get("publickey", "")
+        fields = peers.get(key) or new_peer(interface, key, "(none)")
+        fields[4] = section.get("allowedips", "(none)").replace(" ", "")
+        synced[key] = fields
+    write_interface(header, synced)
+    return 0
+
+
+def config_path(interface: str) -> str:
+    """Resolves wg-quick argument to config file path"""
+    if os.sep in interface:
+        return interface
+    config_dir = os.environ.get("FAKE_WG_CONFIG_DIR", "/etc/wireguard")
+    return os.path.join(config_dir, f"{interface}.conf")
+
+
+def quick_up(interface: str) -> int:
+    """Handles `wg-quick up`"""
+    if read_interface(interface) is not None:
+        return fail(f"wg-quick: `{interface}' already exists")
+    try:
+        with open(config_path(interface)) as f:
+            settings, sections = parse_config(f.read())
+    except FileNotFoundError:
+        return fail(f"wg-quick: `{config_path(interface)}' does not exist")
+
+    header = [
+        interface,
+        settings.get("privatekey", "(none)"),
+        "(none)",
+        settings.get("listenport", "51820"),
+        "off",
+    ]
+    peers = {
+        s.get("publickey", ""): new_peer(
+            interface,
+            s.get("publickey", ""),
+            s.get("allowedips", "(none)").replace(" ", ""),
+        )
+        for s in sections
+    }
+    write_interface(header, peers)
+    return 0
+
+
+def quick_down(interface: str) -> int:
+    """Handles `wg-quick down`"""
+    try:
+        os.remove(dump_path(interface))
+    except FileNotFoundError:
+        return fail(f"wg-quick: `{interface}' is not a WireGuard interface")
+    return 0
+
+
+def quick_strip(path: str) -> int:
+    """Handles `wg-quick strip`"""
+    with open(config_path(path)) as f:
+        for raw in f:
+            key = raw.split("=", 1)[0].strip().lower()
+            if "=" in raw and key in QUICK_ONLY:
+                continue
+            sys.stdout.write(raw)
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    """Dispatches call of tool named by argv[1]"""
+    tool, args = os.path.basename(argv[1]), argv[2:]
+    log_call(tool, args)
+
+    delay = float(os.environ.get("FAKE_WG_DELAY", "0"))
+    if delay:
+        time.sleep(delay)
+
+    command = args[0] if args else "show"
+    if command in os.environ.get("FAKE_WG_FAIL", "").split(","):
+        return fail(f"{tool} {command}: failure requested by FAKE_WG_FAIL")
+
+    if tool == "wg":
+        handlers = {"show": wg_show, "set": wg_set, "syncconf": wg_syncconf}
+        if command not in handlers:
+            return fail(f"Unsupported wg command: {command}")
+        return handlers[command](args[1:])
+
+    quick = {"up": quick_up, "down": quick_down, "strip": quick_strip}
+    if command not in quick or len(args) != 2:
+        return fail("Usage: wg-quick [ up | down | strip ] [ CONFIG_FILE | INTERFACE ]")
+    return quick[command](args[1])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,215 @@
+"""
+Synthetic WireGuard fleets for benchmarks
+"""
+
+import base64
+import ipaddress
+import json
+import math
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from fastwg.core.database import Database
+from fastwg.core.keypool import generate_keypair
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Client, Server
+
+FAKE_WG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_wg.py")
+
+INTERFACE = "wg0"
+
+# Clients inserted per transaction while building the database
+CHUNK_SIZE = 5000
+
+
+def fleet_network(size: int) -> ipaddress.IPv4Network:
+    """Returns network holding size clients with room to grow"""
+    host_bits = math.ceil(math.log2(size * 2 + 4096))
+    return ipaddress.IPv4Network(f"10.0.0.0/{32 - host_bits}")
+
+
+class Fleet:
+    """Server with size clients, its config and a running fake interface
+
+    Everything lives under root: the database, config directory, key
+    directory, fake `wg`/`wg-quick` binaries and their state. Keys are
+    random bytes rather than real Curve25519 keys, except for the server,
+    so building a 100k fleet takes seconds.
+    """
+
+    def __init__(self, root: str, size: int, seed: int = 0) -> None:
+        self.root = os.path.abspath(root)
+        self.size = size
+        self.random = random.Random(seed)
+        self.network = fleet_network(size)
+        self.config_dir = os.path.join(self.root, "etc")
+        self.state_dir = os.path.join(self.root, "wg-state")
+        self.bin_dir = os.path.join(self.root, "bin")
+        self.db_path = os.path.join(self.root, "wireguard.db")
+
+    def random_key(self) -> str:
+        """Returns random base64 key of WireGuard length"""
+        return base64.b64encode(self.random.randbytes(32)).decode()
+
+    def build(self) -> "Fleet":
+        """Creates database, server config and running interface"""
+        for path in (self.config_dir, self.state_dir, self.bin_dir):
+            os.makedirs(path, exist_ok=True)
+        self._install_fake_wg()
+
+        with self.activate():
+            db = Database(self.db_path)
+            try:
+                self._fill_database(db)
+                manager = self.manager(db)
+                manager._update_server_config()
+                self._start_interface()
+            finally:
+                db.close()
+        return self
+
+    def _install_fake_wg(self) -> None:
+        """Writes `wg` and `wg-quick` wrappers around fake_wg.py"""
+        for tool in ("wg", "wg-quick"):
+            path = os.path.join(self.bin_dir, tool)
+            with open(path, "w") as f:
+                f.write(
+                    f'#!/bin/sh\nexec "{sys.executable}" -I -S "{FAKE_WG}" {tool} "$@"\n'
+                )
+            os.chmod(path, 0o755)
+
+    def _fill_database(self, db: Database) -> None:
+        """Stores server and size active clients with sequential IPs"""
+        private_key, public_key = generate_keypair()
+        hosts = self.network.hosts()
+        server_ip = next(hosts)
+        db.save_server_config(
+            Server(
+                id=None,
+                interface=INTERFACE,
+                private_key=private_key,
+                public_key=public_key,
+                address=f"{server_ip}/{self.network.prefixlen}",
+                port=51820,
+                dns="8.8.8.8",
+                mtu=1420,
+                config_path=os.path.join(self.config_dir, f"{INTERFACE}.conf"),
+                external_ip="203.0.113.1",
+            )
+        )
+
+        created_at = datetime.now() - timedelta(days=30)
+        for start in range(0, self.size, CHUNK_SIZE):
+            db.add_clients(
+                [
+                    Client(
+                        id=None,
+                        name=f"client_{number}",
+                        public_key=self.random_key(),
+                        private_key=self.random_key(),
+                        ip_address=str(next(hosts)),
+                        created_at=created_at,
+                        is_active=True,
+                        is_blocked=False,
+                        last_seen=None,
+                        config_path=None,
+                    )
+                    for number in range(start, min(start + CHUNK_SIZE, self.size))
+                ]
+            )
+
+    def _start_interface(self) -> None:
+        """Brings interface up with handshakes and traffic on most peers"""
+        with open(os.path.join(self.config_dir, f"{INTERFACE}.conf")) as f:
+            config = f.read()
+
+        now = int(time.time())
+        lines = [f"{INTERFACE}\t(none)\t(none)\t51820\toff"]
+        for section in config.split("[Peer]")[1:]:
+            values = dict(
+                line.split(" = ", 1) for line in section.splitlines() if " = " in line
+            )
+            # A quarter of the fleet never connected
+            connected = self.random.random() < 0.75
+            lines.append(
+                "\t".join(
+                    [
+                        INTERFACE,
+                        values["PublicKey"],
+                        "(none)",
+                        (
+                            f"198.51.100.{self.random.randint(1, 254)}:51820"
+                            if connected
+                            else "(none)"
+                        ),
+                        values["AllowedIPs"],
+                        str(now - self.random.randint(0, 7200)) if connected else "0",
+                        str(self.random.randint(0, 10**9)) if connected else "0",
+                        str(self.random.randint(0, 10**9)) if connected else "0",
+                        "off",
+                    ]
+                )
+            )
+        with open(os.path.join(self.state_dir, f"{INTERFACE}.dump"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def manager(self, db: Database) -> WireGuardManager:
+        """Creates manager of this fleet using db"""
+        manager = WireGuardManager(
+            config_dir=self.config_dir,
+            keys_dir=os.path.join(self.root, "wireguard", "keys"),
+        )
+        manager.db = db
+        return manager
+
+    def write_import_config(self, path: str) -> None:
+        """Writes standalone server config with size peers for import"""
+        private_key, _ = generate_keypair()
+        hosts = self.network.hosts()
+        server_ip = next(hosts)
+        with open(path, "w") as f:
+            f.write(
+                f"[Interface]\nPrivateKey = {private_key}\n"
+                f"Address = {server_ip}/{self.network.prefixlen}\nListenPort = 51820\n\n"
+            )
+            for _ in range(self.size):
+                f.write(
+                    f"[Peer]\nPublicKey = {self.random_key()}\n"
+                    f"AllowedIPs = {next(hosts)}/32\n\n"
+                )
+
+    @contextmanager
+    def activate(self) -> Iterator["Fleet"]:
+        """Runs enclosed code from fleet root with fake wg on PATH"""
+        cwd = os.getcwd()
+        saved = {
+            key: os.environ.get(key)
+            for key in ("PATH", "FAKE_WG_DIR", "FAKE_WG_CONFIG_DIR", "FASTWG_SOCKET")
+        }
+        os.environ["PATH"] = self.bin_dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_WG_DIR"] = self.state_dir
+        os.environ["FAKE_WG_CONFIG_DIR"] = self.config_dir
+        os.environ["FASTWG_SOCKET"] = ""
+        os.chdir(self.root)
+        try:
+            yield self
+        finally:
+            os.chdir(cwd)
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    def calls(self) -> List[Dict]:
+        """Returns recorded fake wg invocations"""
+        try:
+            with open(os.path.join(self.state_dir, "calls.log")) as f:
+                return [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return []
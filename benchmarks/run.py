@@ -0,0 +1,339 @@
+"""
+Scale benchmarks of fastwg operations on synthetic fleets
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+from fastwg.core.database import Database
+from fastwg.core.monitor import Monitor
+from fastwg.core.wireguard import WireGuardManager
+
+from .fleet import Fleet
+
+DEFAULT_SIZES = (1000, 10000)
+
+# Allowed slowdown against baseline before an operation is reported
+DEFAULT_TOLERANCE = 0.25
+
+
+class Operation(NamedTuple):
+    """Benchmarked operation, setup runs untimed before every run"""
+
+    name: str
+    setup: Callable[["Context"], None]
+    run: Callable[["Context"], object]
+
+
+class Result(NamedTuple):
+    """Timings of one operation at one fleet size"""
+
+    seconds: float
+    min_seconds: float
+    peak_bytes: int
+
+
+class Context:
+    """Fleet with an open manager shared by all operations of one size"""
+
+    def __init__(self, fleet: Fleet) -> None:
+        self.fleet = fleet
+        self.db = Database(fleet.db_path)
+        self.manager = fleet.manager(self.db)
+        self.counter = 0
+        self.import_db: Optional[Database] = None
+        self.import_path = os.path.join(fleet.root, "import", "wg1.conf")
+
+    def next_name(self, prefix: str) -> str:
+        """Returns unused client name"""
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def close(self) -> None:
+        """Closes open databases"""
+        self.db.close()
+        if self.import_db:
+            self.import_db.close()
+
+
+def _noop(ctx: Context) -> None:
+    """Setup of operations that need none"""
+
+
+def _block_one(ctx: Context) -> None:
+    """Toggles one client so the next server config write has changes"""
+    client = f"client_{ctx.counter % ctx.fleet.size}"
+    ctx.counter += 1
+    found = ctx.db.get_client(client)
+    if found:
+        ctx.db.update_client_status(client, True, not found.is_blocked)
+
+
+def _fresh_import_db(ctx: Context) -> None:
+    """Replaces import database with an empty one"""
+    if ctx.import_db:
+        ctx.import_db.close()
+    path = os.path.join(ctx.fleet.root, "import", "import.db")
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+    ctx.import_db = Database(path)
+
+
+def _import_config(ctx: Context) -> object:
+    manager = WireGuardManager(config_dir=os.path.dirname(ctx.import_path))
+    assert ctx.import_db is not None
+    manager.db = ctx.import_db
+    return manager.import_existing_config(ctx.import_path)
+
+
+OPERATIONS = [
+    Operation(
+        "list_clients",
+        _noop,
+        lambda ctx: ctx.manager.list_clients(),
+    ),
+    Operation(
+        "list_clients_live",
+        _noop,
+        lambda ctx: ctx.manager.list_clients(live=True),
+    ),
+    Operation(
+        "monitor_tick",
+        _noop,
+        lambda ctx: Monitor(ctx.db).tick(),
+    ),
+    Operation(
+        "update_server_config",
+        _block_one,
+        lambda ctx: ctx.manager._update_server_config(restart=True),
+    ),
+    Operation(
+        "update_server_config_unchanged",
+        _noop,
+        lambda ctx: ctx.manager._update_server_config(restart=True),
+    ),
+    Operation(
+        "create_client",
+        _noop,
+        lambda ctx: ctx.manager.create_client(ctx.next_name("bench_")),
+    ),
+    Operation(
+        "create_clients_100",
+        _noop,
+        lambda ctx: ctx.manager.create_clients(
+            prefix=ctx.next_name("bulk_") + "_", count=100
+        ),
+    ),
+    Operation(
+        "import_existing_config",
+        _fresh_import_db,
+        _import_config,
+    ),
+]
+
+OPERATION_NAMES = [operation.name for operation in OPERATIONS]
+
+
+def measure(operation: Operation, ctx: Context, repeat: int) -> Result:
+    """Times operation repeat times, then measures its peak memory once
+
+    Output of the operation is discarded. Peak memory covers Python
+    allocations traced by tracemalloc, which slows code down, so it is
+    measured in a separate run.
+    """
+    timings = []
+    for _ in range(repeat):
+        operation.setup(ctx)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            operation.run(ctx)
+            timings.append(time.perf_counter() - start)
+
+    operation.setup(ctx)
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            operation.run(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(statistics.median(timings), min(timings), peak)
+
+
+def run_size(
+    size: int, operations: List[Operation], repeat: int, root: str
+) -> Dict[str, Result]:
+    """Builds fleet of size clients and benchmarks operations on it"""
+    fleet = Fleet(os.path.join(root, str(size)), size)
+    click.echo(f"Building fleet of {size} clients...", err=True)
+    start = time.perf_counter()
+    fleet.build()
+    click.echo(f"  built in {time.perf_counter() - start:.1f} s", err=True)
+
+    results: Dict[str, Result] = {}
+    with fleet.activate():
+        ctx = Context(fleet)
+        try:
+            os.makedirs(os.path.dirname(ctx.import_path), exist_ok=True)
+            if any(op.name == "import_existing_config" for op in operations):
+                fleet.write_import_config(ctx.import_path)
+            for operation in operations:
+                results[operation.name] = measure(operation, ctx, repeat)
+                click.echo(
+                    f"  {operation.name}: {results[operation.name].seconds * 1000:.1f} ms",
+                    err=True,
+                )
+        finally:
+            ctx.close()
+    return results
+
+
+def to_report(results: Dict[int, Dict[str, Result]], repeat: int) -> Dict:
+    """Builds JSON report of results"""
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {
+            str(size): {name: result._asdict() for name, result in by_name.items()}
+            for size, by_name in results.items()
+        },
+    }
+
+
+def compare(
+    report: Dict, baseline: Dict, tolerance: float
+) -> List[Tuple[str, str, float, float]]:
+    """Returns (size, operation, seconds, baseline seconds) slower than allowed"""
+    regressions = []
+    for size, by_name in report["results"].items():
+        for name, result in by_name.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base and result["seconds"] > base["seconds"] * (1 + tolerance):
+                regressions.append((size, name, result["seconds"], base["seconds"]))
+    return regressions
+
+
+def format_report(report: Dict, baseline: Optional[Dict]) -> str:
+    """Formats results as a table with change against baseline"""
+    from tabulate import tabulate
+
+    rows = []
+    for size, by_name in report["results"].items():
+        for name, result in by_name.items():
+            row = [
+                size,
+                name,
+                f"{result['seconds'] * 1000:.2f}",
+                f"{result['peak_bytes'] / 1024:.0f}",
+            ]
+            base = (baseline or {}).get("results", {}).get(size, {}).get(name)
+            if baseline is not None:
+                row.append(
+                    f"{(result['seconds'] / base['seconds'] - 1) * 100:+.0f}%"
+                    if base and base["seconds"]
+                    else "-"
+                )
+            rows.append(row)
+
+    headers = ["Peers", "Operation", "Median ms", "Peak KiB"]
+    if baseline is not None:
+        headers.append("vs baseline")
+    return str(tabulate(rows, headers=headers))
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default=",".join(map(str, DEFAULT_SIZES)),
+    help="Comma-separated fleet sizes, e.g. 1000,10000,100000",
+)
+@click.option(
+    "--ops",
+    default=",".join(OPERATION_NAMES),
+    help="Comma-separated operations to run",
+)
+@click.option("--repeat", type=int, default=3, help="Timed runs per operation")
+@click.option("--save", "save_path", default=None, help="Write JSON report to file")
+@click.option(
+    "--baseline", "baseline_path", default=None, help="JSON report to compare with"
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=DEFAULT_TOLERANCE,
+    help="Allowed slowdown against baseline, 0.25 is 25%",
+)
+@click.option("--keep", is_flag=True, help="Keep generated fleets")
+def main(
+    sizes: str,
+    ops: str,
+    repeat: int,
+    save_path: Optional[str],
+    baseline_path: Optional[str],
+    tolerance: float,
+    keep: bool,
+) -> None:
+    """Benchmark fastwg operations on synthetic fleets"""
+    names = [name.strip() for name in ops.split(",") if name.strip()]
+    unknown = set(names) - set(OPERATION_NAMES)
+    if unknown:
+        raise click.BadParameter(f"Unknown operations: {', '.join(sorted(unknown))}")
+    operations = [op for op in OPERATIONS if op.name in names]
+
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    root = tempfile.mkdtemp(prefix="fastwg-bench-")
+    try:
+        results = {
+            size: run_size(size, operations, repeat, root)
+            for size in (int(value) for value in sizes.split(","))
+        }
+    finally:
+        if keep:
+            click.echo(f"Fleets kept in {root}", err=True)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = to_report(results, repeat)
+    click.echo(format_report(report, baseline))
+
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, tolerance)
+        for size, name, seconds, base in regressions:
+            click.echo(
+                f"Regression: {name} at {size} peers took {seconds * 1000:.2f} ms, "
+                f"baseline {base * 1000:.2f} ms",
+                err=True,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Import time of the fastwg CLI, measured with `python -X importtime`
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_report(module: str = "fastwg.cli") -> List[Tuple[int, str]]:
+    """Returns `python -X importtime` rows as (cumulative_us, module) sorted desc"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+@click.command()
+@click.option("--module", default="fastwg.cli", help="Module to import")
+@click.option("--top", type=int, default=15, help="Slowest imports to show")
+@click.option(
+    "--budget",
+    type=int,
+    default=None,
+    help="Exit with code 1 when import takes longer, in microseconds",
+)
+def main(module: str, top: int, budget: Optional[int]) -> None:
+    """Report import time of the CLI and its slowest imports"""
+    report = import_report(module)
+    total = next(us for us, name in report if name == module)
+
+    for us, name in report[:top]:
+        click.echo(f"{us:>10} us  {name}")
+    click.echo(f"Total: {total / 1000:.1f} ms")
+
+    if budget is not None and total > budget:
+        click.echo(f"Import of {module} exceeds budget of {budget} us", err=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
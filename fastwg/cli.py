@@ -1,17 +1,54 @@
 #!/usr/bin/env python3
 
 import os
+import signal
 import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 import click
-from colorama import Fore, Style, init
-from tabulate import tabulate
 
-from .core.wireguard import WireGuardManager
+from .core.options import DEFAULT_TOP, PLACEMENT_POLICIES, TRACE_FORMATS
 from .utils.i18n import gettext as _
+from .utils.i18n import gettext_noop as N_
 
-# Initialize colorama for colored output
-init(autoreset=True)
+if TYPE_CHECKING:
+    from .core.daemon import RemoteManager
+    from .core.wireguard import WireGuardManager
+
+# Heavy modules (tabulate, cryptography via WireGuardManager, colorama,
+# tracing) are imported inside the commands that need them to keep startup fast
+
+# Output formats of list, all but table are streamed
+LIST_FORMATS = ("table", "plain", "csv", "json", "ndjson")
+
+# Fields list can be sorted by, see CLIENT_ORDER of the database
+LIST_SORT_KEYS = ("name", "ip_address", "created_at", "last_seen")
+
+# Long-running commands would grow the span tree without bound
+UNTRACED_COMMANDS = ("daemon", "exporter", "monitor")
+
+
+class _Palette:
+    """colorama Fore or Style, imported and initialized on first color used"""
+
+    _initialized = False
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __getattr__(self, attr: str) -> str:
+        import colorama
+
+        if not _Palette._initialized:
+            colorama.init(autoreset=True)
+            _Palette._initialized = True
+        value: str = getattr(getattr(colorama, self.name), attr)
+        return value
+
+
+Fore = _Palette("Fore")
+Style = _Palette("Style")
 
 
 def check_root_privileges() -> None:
@@ -24,30 +61,162 @@ def check_root_privileges() -> None:
         sys.exit(1)
 
 
-@click.group()
+def local_manager(config_dir: str = "/etc/wireguard") -> "WireGuardManager":
+    """Creates WireGuardManager of this process"""
+    from .core.wireguard import WireGuardManager
+
+    return WireGuardManager(config_dir)
+
+
+def get_manager() -> Union["WireGuardManager", "RemoteManager"]:
+    """Returns running daemon when available, local manager otherwise
+
+    Traced and profiled commands run in this process so spans cover the actual work.
+    """
+    from .core import profiling, tracing
+    from .core.daemon import RemoteManager
+
+    if tracing.enabled() or profiling.active():
+        return local_manager()
+    return RemoteManager.connect() or local_manager()
+
+
+def start_tracing(ctx: click.Context, trace_format: str) -> None:
+    """Traces invoked command and prints its span tree to stderr on exit"""
+    from .core import tracing
+
+    tracing.start(ctx.invoked_subcommand or "fastwg")
+
+    def report() -> None:
+        tracer = tracing.stop()
+        if tracer:
+            click.echo(tracer.render(trace_format), err=True, nl=False)
+
+    ctx.call_on_close(report)
+
+
+def start_profiling(
+    ctx: click.Context, path: Optional[str], memory: bool, top: int
+) -> None:
+    """Profiles invoked command and prints its summary to stderr on exit"""
+    from .core import profiling
+
+    profiler = profiling.CommandProfiler(
+        ctx.invoked_subcommand or "fastwg", path=path, memory=memory, top=top
+    )
+
+    def report() -> None:
+        click.echo(profiler.stop(), err=True, nl=False)
+
+    ctx.call_on_close(report)
+    profiler.start()
+
+
+def translate_option_help(command: click.Command, ctx: click.Context) -> None:
+    """Translates option help marked with N_, catalogs load only for --help"""
+    for param in command.get_params(ctx):
+        if isinstance(param, click.Option) and param.help:
+            param.help = _(param.help)
+
+
+class TranslatedCommand(click.Command):
+    """Command translating its option help when help is shown"""
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        translate_option_help(self, ctx)
+        super().format_help(ctx, formatter)
+
+
+class TranslatedGroup(click.Group):
+    """Group of translated commands translating its option help when shown"""
+
+    command_class = TranslatedCommand
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        translate_option_help(self, ctx)
+        super().format_help(ctx, formatter)
+
+
+@click.group(cls=TranslatedGroup)
 @click.version_option(version="1.0.5", prog_name="fastwg")
-def cli():
+@click.option(
+    "--trace",
+    is_flag=True,
+    help=N_("Print timings of queries, commands and file writes to stderr"),
+)
+@click.option(
+    "--trace-format",
+    type=click.Choice(TRACE_FORMATS),
+    default=None,
+    help=N_("Trace output format, implies --trace"),
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help=N_("Run command under cProfile and write a pstats file with a summary"),
+)
+@click.option(
+    "--profile-output",
+    default=None,
+    help=N_("pstats file path, implies --profile"),
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    help=N_("Also trace allocations with tracemalloc, implies --profile"),
+)
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=1),
+    default=DEFAULT_TOP,
+    help=N_("Number of functions and allocation sites in profile summary"),
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    trace: bool,
+    trace_format: Optional[str],
+    profile: bool,
+    profile_output: Optional[str],
+    profile_memory: bool,
+    profile_top: int,
+) -> None:
     """FastWG - Fast WireGuard server management"""
     check_root_privileges()
+    if profile or profile_output or profile_memory:
+        start_profiling(ctx, profile_output, profile_memory, profile_top)
+    if ctx.invoked_subcommand in UNTRACED_COMMANDS:
+        return
+    from .core import tracing
+
+    if trace or trace_format or tracing.env_format():
+        start_tracing(ctx, trace_format or tracing.env_format() or "text")
 
 
 @cli.command()
 @click.option(
     "--config-dir", default="/etc/wireguard", help="WireGuard configuration directory"
 )
-def scan(config_dir: str) -> None:
+@click.option(
+    "--force",
+    is_flag=True,
+    help=N_("Rescan configurations that did not change since last import"),
+)
+def scan(config_dir: str, force: bool) -> None:
     """Scan existing WireGuard configurations"""
     click.echo(
         f"{Fore.YELLOW}{_('Scanning existing configurations...')}{Style.RESET_ALL}"
     )
 
-    wg = WireGuardManager(config_dir)
-    existing_configs = wg.scan_existing_configs()
+    wg = local_manager(config_dir)
+    existing_configs = wg.scan_existing_configs(force=force)
 
     if not existing_configs:
-        click.echo(
-            f"{Fore.GREEN}{_('No existing configurations found')}{Style.RESET_ALL}"
-        )
+        if force:
+            message = _("No existing configurations found")
+        else:
+            message = _("No new or changed configurations found")
+        click.echo(f"{Fore.GREEN}{message}{Style.RESET_ALL}")
         return
 
     click.echo(
@@ -59,7 +228,7 @@ def scan(config_dir: str) -> None:
 
     if click.confirm(_("Import found configurations?")):
         for config in existing_configs:
-            if wg.import_existing_config(config["path"]):
+            if wg.import_existing_config(config["path"], config):
                 click.echo(
                     f"{Fore.GREEN}{_('✓ Imported: {}').format(config['filename'])}{Style.RESET_ALL}"
                 )
@@ -71,20 +240,32 @@ def scan(config_dir: str) -> None:
 
 @cli.command()
 @click.argument("name")
-def create(name: str) -> None:
+@click.option(
+    "--interface",
+    default=None,
+    help=N_("Interface of the client, picked by placement policy by default"),
+)
+@click.option(
+    "--placement",
+    type=click.Choice(PLACEMENT_POLICIES),
+    default=None,
+    help=N_("How to pick the interface when none is given"),
+)
+def create(name: str, interface: Optional[str], placement: Optional[str]) -> None:
     """Create new client"""
     click.echo(
         f"{Fore.YELLOW}{_('Creating client {}...').format(name)}{Style.RESET_ALL}"
     )
 
-    wg = WireGuardManager()
-    client = wg.create_client(name)
+    wg = get_manager()
+    client = wg.create_client(name, interface=interface, placement=placement)
 
     if client:
         click.echo(
             f"{Fore.GREEN}{_('✓ Client {} successfully created').format(name)}{Style.RESET_ALL}"
         )
         click.echo(f"  {_('IP address')}: {client.ip_address}")
+        click.echo(f"  {_('Interface')}: {client.interface}")
         click.echo(f"  {_('Configuration')}: ./wireguard/configs/{name}.conf")
     else:
         click.echo(
@@ -92,6 +273,69 @@ def create(name: str) -> None:
         )
 
 
+@cli.command()
+@click.argument("names", nargs=-1)
+@click.option(
+    "--prefix", default="client_", help=N_("Name prefix of generated clients")
+)
+@click.option(
+    "--count", type=int, default=0, help=N_("Number of clients to create with prefix")
+)
+@click.option(
+    "--workers", type=int, default=None, help=N_("Number of key generation processes")
+)
+@click.option(
+    "--interface",
+    default=None,
+    help=N_("Interface of the clients, spread by placement policy by default"),
+)
+@click.option(
+    "--placement",
+    type=click.Choice(PLACEMENT_POLICIES),
+    default=None,
+    help=N_("How to pick the interface when none is given"),
+)
+def create_many(
+    names: Tuple[str, ...],
+    prefix: str,
+    count: int,
+    workers: Optional[int],
+    interface: Optional[str],
+    placement: Optional[str],
+) -> None:
+    """Create many clients at once"""
+    if bool(names) == (count > 0):
+        click.echo(
+            f"{Fore.RED}{_('Specify either client names or --count')}{Style.RESET_ALL}"
+        )
+        sys.exit(1)
+
+    click.echo(f"{Fore.YELLOW}{_('Creating clients...')}{Style.RESET_ALL}")
+
+    wg = local_manager()
+    if names:
+        clients = wg.create_clients(
+            names=[*names], workers=workers, interface=interface, placement=placement
+        )
+    else:
+        clients = wg.create_clients(
+            prefix=prefix,
+            count=count,
+            workers=workers,
+            interface=interface,
+            placement=placement,
+        )
+
+    for client in clients:
+        click.echo(f"  {client.name}: {client.ip_address}")
+
+    requested = len(names) or count
+    color = Fore.GREEN if len(clients) == requested else Fore.RED
+    click.echo(
+        f"{color}{_('Clients created: {} of {}').format(len(clients), requested)}{Style.RESET_ALL}"
+    )
+
+
 @cli.command()
 @click.argument("name")
 def delete(name: str) -> None:
@@ -103,7 +347,7 @@ def delete(name: str) -> None:
         f"{Fore.YELLOW}{_('Deleting client {}...').format(name)}{Style.RESET_ALL}"
     )
 
-    wg = WireGuardManager()
+    wg = local_manager()
     if wg.delete_client(name):
         click.echo(
             f"{Fore.GREEN}{_('✓ Client {} successfully deleted').format(name)}{Style.RESET_ALL}"
@@ -122,7 +366,7 @@ def disable(name: str) -> None:
         f"{Fore.YELLOW}{_('Disabling client {}...').format(name)}{Style.RESET_ALL}"
     )
 
-    wg = WireGuardManager()
+    wg = get_manager()
     if wg.disable_client(name):
         click.echo(
             f"{Fore.GREEN}{_('✓ Client {} disabled').format(name)}{Style.RESET_ALL}"
@@ -141,7 +385,7 @@ def enable(name: str) -> None:
         f"{Fore.YELLOW}{_('Enabling client {}...').format(name)}{Style.RESET_ALL}"
     )
 
-    wg = WireGuardManager()
+    wg = get_manager()
     if wg.enable_client(name):
         click.echo(
             f"{Fore.GREEN}{_('✓ Client {} enabled').format(name)}{Style.RESET_ALL}"
@@ -156,7 +400,7 @@ def enable(name: str) -> None:
 @click.argument("name")
 def cat(name: str) -> None:
     """Show client configuration"""
-    wg_manager = WireGuardManager()
+    wg_manager = get_manager()
     config = wg_manager.get_client_config(name)
 
     if config:
@@ -171,96 +415,190 @@ def cat(name: str) -> None:
         )
 
 
+def client_status_text(client: Dict, color: bool) -> str:
+    """Formats client status words, colored for terminals"""
+
+    def paint(text: str, fore: str) -> str:
+        return f"{fore}{text}{Style.RESET_ALL}" if color else text
+
+    status = [
+        (
+            paint(_("Active"), Fore.GREEN)
+            if client["is_active"]
+            else paint(_("Inactive"), Fore.RED)
+        )
+    ]
+    if client["is_blocked"]:
+        status.append(paint(_("Blocked"), Fore.RED))
+    if client["is_connected"]:
+        status.append(paint(_("Connected"), Fore.GREEN))
+    else:
+        status.append(paint(_("Disconnected"), Fore.YELLOW))
+    return ", ".join(status)
+
+
 @cli.command()
 @click.option(
     "--all",
     "-a",
     is_flag=True,
-    help=_("Show all clients including inactive and blocked"),
+    help=N_("Show all clients including inactive and blocked"),
+)
+@click.option("--prefix", default=None, help=N_("Show clients whose name starts with"))
+@click.option("--subnet", default=None, help=N_("Show clients from subnet"))
+@click.option("--interface", default=None, help=N_("Show clients of interface"))
+@click.option("--limit", type=int, default=None, help=N_("Maximum number of clients"))
+@click.option("--offset", type=int, default=0, help=N_("Number of clients to skip"))
+@click.option(
+    "--live",
+    is_flag=True,
+    help=N_("Refresh connection state from running interface"),
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(LIST_FORMATS),
+    default="table",
+    help=N_("Output format, all but table are streamed"),
+)
+@click.option(
+    "--sort",
+    type=click.Choice(LIST_SORT_KEYS),
+    default="name",
+    help=N_("Sort clients by field"),
 )
-def list(all: bool) -> None:
+@click.option("--reverse", is_flag=True, help=N_("Sort in descending order"))
+def list(
+    all: bool,
+    prefix: Optional[str],
+    subnet: Optional[str],
+    interface: Optional[str],
+    limit: Optional[int],
+    offset: int,
+    live: bool,
+    output_format: str,
+    sort: str,
+    reverse: bool,
+) -> None:
     """Show list of all clients"""
-    wg_manager = WireGuardManager()
-    clients = wg_manager.list_clients()
+    import itertools
 
-    if not clients:
-        click.echo(f"{Fore.YELLOW}{_('No clients found')}{Style.RESET_ALL}")
-        return
-
-    # Filter clients based on --all flag
-    if not all:
-        # Show only active and connected clients by default
-        filtered_clients = [
-            client
-            for client in clients
-            if client["is_active"] and not client["is_blocked"]
-        ]
-        if not filtered_clients:
-            click.echo(
-                f"{Fore.YELLOW}{_('No active clients found. Use --all to show all clients.')}{Style.RESET_ALL}"
-            )
-            return
-    else:
-        filtered_clients = clients
-
-    # Prepare table data
-    table_data = []
-    for client in filtered_clients:
-        status = []
-        if client["is_active"]:
-            status.append(f"{Fore.GREEN}{_('Active')}{Style.RESET_ALL}")
-        else:
-            status.append(f"{Fore.RED}{_('Inactive')}{Style.RESET_ALL}")
+    from .utils.output import format_time
 
-        if client["is_blocked"]:
-            status.append(f"{Fore.RED}{_('Blocked')}{Style.RESET_ALL}")
+    filters: Dict[str, Any] = {
+        "status": None if all else "active",
+        "name_prefix": prefix,
+        "subnet": subnet,
+        "interface": interface,
+    }
+    query = dict(filters, limit=limit, offset=offset, order_by=sort, descending=reverse)
 
-        if client["is_connected"]:
-            status.append(f"{Fore.GREEN}{_('Connected')}{Style.RESET_ALL}")
+    # Show only active clients by default, filtering is done in the database
+    wg_manager: Union["WireGuardManager", "RemoteManager"]
+    try:
+        if output_format == "table":
+            wg_manager = get_manager()
+            rows = iter(wg_manager.list_clients(live=live, **query))
         else:
-            status.append(f"{Fore.YELLOW}{_('Disconnected')}{Style.RESET_ALL}")
+            # Streamed formats read straight from the local database cursor,
+            # the daemon would have to buffer the whole listing in one response
+            local = local_manager()
+            wg_manager = local
+            rows = local.iter_client_status(live=live, **query)
+        first = next(rows, None)
+    except ValueError as e:
+        click.echo(f"{Fore.RED}{_('Error')}: {e}{Style.RESET_ALL}")
+        return
 
-        status_str = ", ".join(status)
+    clients = itertools.chain([first] if first else [], rows)
+    out = sys.stdout
 
-        last_seen = (
-            client["last_seen"].strftime("%Y-%m-%d %H:%M:%S")
-            if client["last_seen"]
-            else _("Never")
-        )
-        created_at = (
-            client["created_at"].strftime("%Y-%m-%d %H:%M:%S")
-            if client["created_at"]
-            else _("Unknown")
-        )
+    if output_format in ("json", "ndjson", "csv"):
+        from .utils.output import write_csv, write_json, write_ndjson
 
-        table_data.append(
-            [client["name"], client["ip_address"], status_str, last_seen, created_at]
-        )
+        writers: Dict[str, Callable[..., int]] = {
+            "json": write_json,
+            "ndjson": write_ndjson,
+            "csv": write_csv,
+        }
+        writers[output_format](clients, out)
+        return
+
+    if first is None:
+        if all or not wg_manager.count_clients():
+            click.echo(f"{Fore.YELLOW}{_('No clients found')}{Style.RESET_ALL}")
+        else:
+            click.echo(
+                f"{Fore.YELLOW}{_('No active clients found. Use --all to show all clients.')}{Style.RESET_ALL}"
+            )
+        return
 
+    # Status is the last plain column, its width depends on color codes
+    color = out.isatty()
     headers = [
         _("Name"),
         _("IP Address"),
-        _("Status"),
         _("Last Connection"),
         _("Created"),
+        _("Status"),
     ]
-    click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+    def cells(client: Dict) -> List[str]:
+        return [
+            client["name"],
+            client["ip_address"],
+            format_time(client["last_seen"], _("Never")),
+            format_time(client["created_at"], _("Unknown")),
+            client_status_text(client, color),
+        ]
+
+    if output_format == "plain":
+        from .utils.output import write_plain
+
+        name_width = local.db.max_name_length(**filters)
+        write_plain(clients, out, headers, name_width, cells)
+        return
+
+    from tabulate import tabulate
+
+    # Keep the status column in the middle as in earlier releases
+    order = (0, 1, 4, 2, 3)
+    table_data = [[row[i] for i in order] for row in map(cells, clients)]
+    click.echo(
+        tabulate(table_data, headers=[headers[i] for i in order], tablefmt="grid")
+    )
 
 
 @cli.command()
-def status() -> None:
+@click.option("--interface", default=None, help=N_("Show only this interface"))
+def status(interface: Optional[str]) -> None:
     """Show WireGuard server status"""
+    from .core.live import LiveState
 
     # Check WireGuard status
     try:
-        import subprocess
+        live_state = LiveState.read()
 
-        result = subprocess.run(["wg", "show"], capture_output=True, text=True)
-
-        if result.returncode == 0:
+        if live_state is not None:
             click.echo(f"{Fore.GREEN}{_('✓ WireGuard is active')}{Style.RESET_ALL}")
             click.echo(f"\n{_('Active interfaces')}:")
-            click.echo(result.stdout)
+
+            now = datetime.now().timestamp()
+            for state in live_state.interfaces.values():
+                if interface and state.name != interface:
+                    continue
+                peers = 0
+                connected = 0
+                for peer in live_state.interface_peers(state.name):
+                    peers += 1
+                    if peer.latest_handshake and now - peer.latest_handshake < 3600:
+                        connected += 1
+
+                click.echo(f"interface: {state.name}")
+                click.echo(f"  {_('public key')}: {state.public_key}")
+                click.echo(f"  {_('listening port')}: {state.listen_port}")
+                click.echo(f"  {_('peers')}: {peers}")
+                click.echo(f"  {_('connected')}: {connected}")
         else:
             click.echo(f"{Fore.RED}{_('✗ WireGuard is not active')}{Style.RESET_ALL}")
     except FileNotFoundError:
@@ -268,30 +606,39 @@ def status() -> None:
 
 
 @cli.command()
-def start() -> None:
+@click.option(
+    "--interface", default=None, help=N_("Interface to act on, all by default")
+)
+def start(interface: Optional[str]) -> None:
     """Start WireGuard server"""
-    wg_manager = WireGuardManager()
-    if wg_manager.start_server():
+    wg_manager = local_manager()
+    if wg_manager.start_server(interface):
         click.echo(f"{Fore.GREEN}{_('✓ Server started successfully')}{Style.RESET_ALL}")
     else:
         click.echo(f"{Fore.RED}{_('✗ Failed to start server')}{Style.RESET_ALL}")
 
 
 @cli.command()
-def stop() -> None:
+@click.option(
+    "--interface", default=None, help=N_("Interface to act on, all by default")
+)
+def stop(interface: Optional[str]) -> None:
     """Stop WireGuard server"""
-    wg_manager = WireGuardManager()
-    if wg_manager.stop_server():
+    wg_manager = local_manager()
+    if wg_manager.stop_server(interface):
         click.echo(f"{Fore.GREEN}{_('✓ Server stopped successfully')}{Style.RESET_ALL}")
     else:
         click.echo(f"{Fore.RED}{_('✗ Failed to stop server')}{Style.RESET_ALL}")
 
 
 @cli.command()
-def restart() -> None:
+@click.option(
+    "--interface", default=None, help=N_("Interface to act on, all by default")
+)
+def restart(interface: Optional[str]) -> None:
     """Restart WireGuard server"""
-    wg_manager = WireGuardManager()
-    if wg_manager.restart_server():
+    wg_manager = local_manager()
+    if wg_manager.restart_server(interface):
         click.echo(
             f"{Fore.GREEN}{_('✓ Server restarted successfully')}{Style.RESET_ALL}"
         )
@@ -300,10 +647,18 @@ def restart() -> None:
 
 
 @cli.command()
-def reload() -> None:
+@click.option(
+    "--full",
+    is_flag=True,
+    help=N_("Restart the interface instead of applying peers live"),
+)
+@click.option(
+    "--interface", default=None, help=N_("Interface to act on, all by default")
+)
+def reload(full: bool, interface: Optional[str]) -> None:
     """Reload server configuration"""
-    wg_manager = WireGuardManager()
-    if wg_manager.reload_config():
+    wg_manager = local_manager()
+    if wg_manager.reload_config(live=not full, interface=interface):
         click.echo(
             f"{Fore.GREEN}{_('✓ Configuration reloaded successfully')}{Style.RESET_ALL}"
         )
@@ -313,12 +668,259 @@ def reload() -> None:
         )
 
 
+@cli.command()
+@click.option(
+    "--interface", default=None, help=N_("Interface to act on, all by default")
+)
+def sync(interface: Optional[str]) -> None:
+    """Sync running interface peers with database"""
+    wg_manager = local_manager()
+    if wg_manager.sync_peers(interface):
+        click.echo(f"{Fore.GREEN}{_('✓ Peers synchronized')}{Style.RESET_ALL}")
+    else:
+        click.echo(f"{Fore.RED}{_('✗ Failed to synchronize peers')}{Style.RESET_ALL}")
+
+
+@cli.command()
+@click.option(
+    "--batch",
+    "batch_size",
+    type=click.IntRange(min=1),
+    default=100,
+    help=N_("Clients moved per transaction and reload"),
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help=N_("Restart the interfaces instead of applying peers live"),
+)
+@click.option("--dry-run", is_flag=True, help=N_("Only show planned moves"))
+def rebalance(batch_size: int, full: bool, dry_run: bool) -> None:
+    """Move clients between interfaces to even out their counts"""
+    if not dry_run and not click.confirm(
+        _("Moved clients get new addresses and need their new configs. Continue?")
+    ):
+        return
+
+    wg_manager = local_manager()
+    if wg_manager.rebalance(batch_size=batch_size, live=not full, dry_run=dry_run):
+        click.echo(f"{Fore.GREEN}{_('✓ Rebalance finished')}{Style.RESET_ALL}")
+    else:
+        click.echo(f"{Fore.RED}{_('✗ Rebalance failed')}{Style.RESET_ALL}")
+
+
+@cli.command()
+@click.option(
+    "--fill",
+    "size",
+    type=int,
+    default=None,
+    help=N_("Pre-generate keypairs until the pool holds this many"),
+)
+@click.option(
+    "--workers", type=int, default=None, help=N_("Number of key generation processes")
+)
+def keypool(size: Optional[int], workers: Optional[int]) -> None:
+    """Show or fill pool of pre-generated keypairs"""
+    wg_manager = local_manager()
+    if size is not None:
+        added = wg_manager.fill_keypool(size, workers)
+        click.echo(
+            f"{Fore.GREEN}{_('✓ Keypairs generated: {}').format(added)}{Style.RESET_ALL}"
+        )
+    click.echo(f"{_('Keypairs in pool')}: {wg_manager.db.count_keypairs()}")
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_file",
+    default=None,
+    help=N_("UNIX socket path, defaults to FASTWG_SOCKET or /run/fastwg.sock"),
+)
+@click.option(
+    "--metrics-listen",
+    default=None,
+    help=N_("Also serve Prometheus metrics on HOST:PORT"),
+)
+def daemon(socket_file: Optional[str], metrics_listen: Optional[str]) -> None:
+    """Serve client commands from a long-running process"""
+    import threading
+
+    from .core.daemon import DaemonError, DaemonServer, socket_path
+    from .core.exporter import MetricsCollector, MetricsServer, parse_listen_address
+
+    path = socket_file or socket_path()
+    if not path:
+        click.echo(f"{Fore.RED}{_('Daemon socket path is not set')}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    try:
+        server = DaemonServer(local_manager(), path)
+    except DaemonError as e:
+        click.echo(f"{Fore.RED}{_('Error')}: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if metrics_listen:
+        # Operation timings of the daemon are exported from its own process
+        try:
+            metrics = MetricsServer(
+                MetricsCollector(server.manager.db),
+                parse_listen_address(metrics_listen),
+            )
+        except (OSError, ValueError) as e:
+            server.server_close()
+            click.echo(f"{Fore.RED}{_('Error')}: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        threading.Thread(target=metrics.serve_forever, daemon=True).start()
+
+    def stop(signum: int, frame: object) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    click.echo(
+        f"{Fore.GREEN}{_('Daemon listening on {}').format(path)}{Style.RESET_ALL}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@cli.command()
+@click.option(
+    "--interval", type=float, default=10.0, help=N_("Seconds between samples")
+)
+@click.option("--once", is_flag=True, help=N_("Take one sample and exit"))
+def monitor(interval: float, once: bool) -> None:
+    """Record peer handshakes and traffic counters"""
+    from .core.database import Database
+    from .core.monitor import Monitor
+
+    peer_monitor = Monitor(Database(), interval=interval)
+    try:
+        if once:
+            changed = peer_monitor.tick()
+            click.echo(
+                f"{Fore.GREEN}{_('✓ Peers updated: {}').format(changed)}{Style.RESET_ALL}"
+            )
+        else:
+            click.echo(
+                f"{Fore.YELLOW}{_('Monitoring peers every {} s...').format(interval)}{Style.RESET_ALL}"
+            )
+            peer_monitor.run()
+    except FileNotFoundError:
+        click.echo(f"{Fore.RED}{_('✗ WireGuard is not installed')}{Style.RESET_ALL}")
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option(
+    "--listen",
+    default="127.0.0.1:9586",
+    help=N_("Address to serve metrics on, HOST:PORT"),
+)
+@click.option(
+    "--textfile",
+    default=None,
+    help=N_("Write metrics to file for node_exporter textfile collector"),
+)
+@click.option(
+    "--interval", type=float, default=15.0, help=N_("Seconds metrics are cached for")
+)
+def exporter(listen: str, textfile: Optional[str], interval: float) -> None:
+    """Export Prometheus metrics of peers and fastwg"""
+    import time
+
+    from .core.database import Database
+    from .core.exporter import MetricsCollector, MetricsServer, parse_listen_address
+
+    collector = MetricsCollector(Database(), interval=interval)
+
+    def stop(signum: int, frame: object) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        if textfile:
+            click.echo(
+                f"{Fore.GREEN}{_('Writing metrics to {}').format(textfile)}{Style.RESET_ALL}"
+            )
+            while True:
+                collector.write_textfile(textfile)
+                time.sleep(interval)
+
+        try:
+            server = MetricsServer(collector, parse_listen_address(listen))
+        except (OSError, ValueError) as e:
+            click.echo(f"{Fore.RED}{_('Error')}: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+
+        click.echo(
+            f"{Fore.GREEN}{_('Serving metrics on http://{}/metrics').format(listen)}{Style.RESET_ALL}"
+        )
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+    except KeyboardInterrupt:
+        pass
+
+
+def format_bytes(size: int) -> str:
+    """Formats byte count with binary unit"""
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+@cli.command()
+@click.option("--days", type=float, default=7.0, help=N_("Period in days"))
+@click.option("--limit", type=int, default=20, help=N_("Number of peers to show"))
+def top(days: float, limit: int) -> None:
+    """Show peers with most traffic"""
+    from tabulate import tabulate
+
+    from .core.database import Database
+
+    now = int(datetime.now().timestamp())
+    rows = Database().top_traffic(now - int(days * 86400), now, limit)
+    if not rows:
+        click.echo(f"{Fore.YELLOW}{_('No traffic recorded')}{Style.RESET_ALL}")
+        return
+
+    table_data = [
+        [
+            row["name"] or row["public_key"],
+            format_bytes(row["rx_bytes"]),
+            format_bytes(row["tx_bytes"]),
+            format_bytes(row["rx_bytes"] + row["tx_bytes"]),
+        ]
+        for row in rows
+    ]
+    headers = [_("Name"), _("Received"), _("Sent"), _("Total")]
+    click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+
 @cli.command()
 @click.argument("host")
-def sethost(host: str) -> None:
+@click.option(
+    "--interface",
+    default=None,
+    help=N_("Interface to set host of, the first by default"),
+)
+def sethost(host: str, interface: Optional[str]) -> None:
     """Set external host (IP:port) for WireGuard server"""
-    wg_manager = WireGuardManager()
-    if wg_manager.set_host(host):
+    wg_manager = local_manager()
+    if wg_manager.set_host(host, interface):
         click.echo(f"{Fore.GREEN}{_('✓ Host set successfully')}{Style.RESET_ALL}")
     else:
         click.echo(f"{Fore.RED}{_('✗ Failed to set host')}{Style.RESET_ALL}")
@@ -335,7 +937,7 @@ def init_server(interface: str, port: int, network: str, dns: str) -> None:
         f"{Fore.YELLOW}{_('Initializing WireGuard server configuration...')}{Style.RESET_ALL}"
     )
 
-    wg_manager = WireGuardManager()
+    wg_manager = local_manager()
     if wg_manager.init_server_config(interface, port, network, dns):
         click.echo(
             f"{Fore.GREEN}{_('✓ Server configuration initialized successfully')}{Style.RESET_ALL}"
@@ -1,4 +1,16 @@
-from .database import Database
-from .wireguard import WireGuardManager
+from typing import Any
 
 __all__ = ["Database", "WireGuardManager"]
+
+
+def __getattr__(name: str) -> Any:
+    """Imports core classes on first access to keep CLI startup fast"""
+    if name == "Database":
+        from .database import Database
+
+        return Database
+    if name == "WireGuardManager":
+        from .wireguard import WireGuardManager
+
+        return WireGuardManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
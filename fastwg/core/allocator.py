@@ -0,0 +1,239 @@
+import ipaddress
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+
+class IPAllocator:
+    """Free-range IP allocator stored in SQLite
+
+    Every pool (a client network such as ``10.42.42.0/24``) keeps a sorted
+    list of free ``[start_ip, end_ip]`` ranges keyed by integer IPv4 address.
+    Picking the next free address is a single indexed lookup, and reserving
+    or releasing an address touches at most two ranges. All methods work on
+    the caller's connection and never commit, so they share the caller's
+    transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    @classmethod
+    def create_table(cls, conn: sqlite3.Connection) -> None:
+        """Creates allocator tables in database"""
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ip_pools (
+                network TEXT PRIMARY KEY,
+                first_ip INTEGER NOT NULL,
+                last_ip INTEGER NOT NULL
+            )
+        """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ip_pool_ranges (
+                pool TEXT NOT NULL,
+                start_ip INTEGER NOT NULL,
+                end_ip INTEGER NOT NULL,
+                PRIMARY KEY (pool, start_ip)
+            )
+        """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ip_pool_ranges_end
+            ON ip_pool_ranges (pool, end_ip)
+        """
+        )
+
+    @staticmethod
+    def to_int(ip_address: str) -> Optional[int]:
+        """Converts IPv4 address string to integer, None if invalid"""
+        try:
+            return int(ipaddress.IPv4Address(ip_address))
+        except (ipaddress.AddressValueError, ValueError):
+            return None
+
+    @staticmethod
+    def host_bounds(network: str) -> Tuple[int, int]:
+        """Returns first and last usable host of network as integers"""
+        net = ipaddress.IPv4Network(network, strict=False)
+        first = int(net.network_address)
+        last = int(net.broadcast_address)
+        if net.prefixlen < 31:
+            first += 1
+            last -= 1
+        return first, last
+
+    def has_pool(self, network: str) -> bool:
+        """Checks if pool is already initialized"""
+        cursor = self.conn.execute(
+            "SELECT 1 FROM ip_pools WHERE network = ?", (network,)
+        )
+        return cursor.fetchone() is not None
+
+    def init_pool(self, network: str, used_ips: Iterable[str]) -> None:
+        """Initializes pool with free ranges around already used addresses"""
+        first, last = self.host_bounds(network)
+
+        used = sorted(
+            {
+                ip
+                for ip in (self.to_int(addr) for addr in used_ips)
+                if ip is not None and first <= ip <= last
+            }
+        )
+
+        ranges: List[Tuple[str, int, int]] = []
+        start = first
+        for ip in used:
+            if ip > start:
+                ranges.append((network, start, ip - 1))
+            start = ip + 1
+        if start <= last:
+            ranges.append((network, start, last))
+
+        self.conn.execute(
+            "INSERT INTO ip_pools (network, first_ip, last_ip) VALUES (?, ?, ?)",
+            (network, first, last),
+        )
+        self.conn.executemany(
+            "INSERT INTO ip_pool_ranges (pool, start_ip, end_ip) VALUES (?, ?, ?)",
+            ranges,
+        )
+
+    def first_free(self, network: str) -> Optional[str]:
+        """Returns lowest free address of pool without reserving it"""
+        cursor = self.conn.execute(
+            """
+            SELECT start_ip FROM ip_pool_ranges
+            WHERE pool = ? ORDER BY start_ip LIMIT 1
+        """,
+            (network,),
+        )
+        row = cursor.fetchone()
+        if row:
+            return str(ipaddress.IPv4Address(row[0]))
+        return None
+
+    def first_free_many(self, network: str, count: int) -> List[str]:
+        """Returns lowest count free addresses of pool without reserving them"""
+        cursor = self.conn.execute(
+            """
+            SELECT start_ip, end_ip FROM ip_pool_ranges
+            WHERE pool = ? ORDER BY start_ip
+        """,
+            (network,),
+        )
+        addresses: List[str] = []
+        for start_ip, end_ip in cursor:
+            end = min(end_ip, start_ip + count - len(addresses) - 1)
+            addresses.extend(
+                str(ipaddress.IPv4Address(ip)) for ip in range(start_ip, end + 1)
+            )
+            if len(addresses) >= count:
+                break
+        return addresses
+
+    def free_count(self, network: str) -> int:
+        """Returns number of free addresses in pool"""
+        cursor = self.conn.execute(
+            "SELECT COALESCE(SUM(end_ip - start_ip + 1), 0) FROM ip_pool_ranges WHERE pool = ?",
+            (network,),
+        )
+        count: int = cursor.fetchone()[0]
+        return count
+
+    def _pools_for(self, ip: int) -> List[str]:
+        """Returns pools whose host range contains address"""
+        cursor = self.conn.execute(
+            "SELECT network FROM ip_pools WHERE first_ip <= ? AND last_ip >= ?",
+            (ip, ip),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def _range_containing(self, pool: str, ip: int) -> Optional[Tuple[int, int]]:
+        """Returns free range of pool containing address"""
+        cursor = self.conn.execute(
+            """
+            SELECT start_ip, end_ip FROM ip_pool_ranges
+            WHERE pool = ? AND start_ip <= ?
+            ORDER BY start_ip DESC LIMIT 1
+        """,
+            (pool, ip),
+        )
+        row = cursor.fetchone()
+        if row and row[1] >= ip:
+            return row[0], row[1]
+        return None
+
+    def reserve(self, ip_address: str) -> None:
+        """Marks address as used in every pool that contains it"""
+        ip = self.to_int(ip_address)
+        if ip is None:
+            return
+
+        for pool in self._pools_for(ip):
+            free_range = self._range_containing(pool, ip)
+            if not free_range:
+                continue
+
+            start, end = free_range
+            if start == end:
+                self.conn.execute(
+                    "DELETE FROM ip_pool_ranges WHERE pool = ? AND start_ip = ?",
+                    (pool, start),
+                )
+            elif ip == start:
+                self.conn.execute(
+                    "UPDATE ip_pool_ranges SET start_ip = ? WHERE pool = ? AND start_ip = ?",
+                    (ip + 1, pool, start),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE ip_pool_ranges SET end_ip = ? WHERE pool = ? AND start_ip = ?",
+                    (ip - 1, pool, start),
+                )
+                if ip < end:
+                    self.conn.execute(
+                        "INSERT INTO ip_pool_ranges (pool, start_ip, end_ip) VALUES (?, ?, ?)",
+                        (pool, ip + 1, end),
+                    )
+
+    def release(self, ip_address: str) -> None:
+        """Returns address to every pool that contains it"""
+        ip = self.to_int(ip_address)
+        if ip is None:
+            return
+
+        for pool in self._pools_for(ip):
+            if self._range_containing(pool, ip):
+                continue
+
+            left = self.conn.execute(
+                "SELECT start_ip FROM ip_pool_ranges WHERE pool = ? AND end_ip = ?",
+                (pool, ip - 1),
+            ).fetchone()
+            right = self.conn.execute(
+                "SELECT end_ip FROM ip_pool_ranges WHERE pool = ? AND start_ip = ?",
+                (pool, ip + 1),
+            ).fetchone()
+
+            if right:
+                self.conn.execute(
+                    "DELETE FROM ip_pool_ranges WHERE pool = ? AND start_ip = ?",
+                    (pool, ip + 1),
+                )
+
+            end = right[0] if right else ip
+            if left:
+                self.conn.execute(
+                    "UPDATE ip_pool_ranges SET end_ip = ? WHERE pool = ? AND start_ip = ?",
+                    (end, pool, left[0]),
+                )
+            else:
+                self.conn.execute(
+                    "INSERT INTO ip_pool_ranges (pool, start_ip, end_ip) VALUES (?, ?, ?)",
+                    (pool, ip, end),
+                )
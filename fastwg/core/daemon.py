@@ -0,0 +1,282 @@
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..models import Client
+from .metrics import operations
+
+if TYPE_CHECKING:
+    from .wireguard import WireGuardManager
+
+SOCKET_PATH = "/run/fastwg.sock"
+
+# Request operation -> WireGuardManager method
+OPERATIONS = {
+    "create": "create_client",
+    "list": "list_clients",
+    "enable": "enable_client",
+    "disable": "disable_client",
+    "cat": "get_client_config",
+    "count": "count_clients",
+}
+
+DATETIME_FIELDS = ("created_at", "last_seen")
+
+
+def socket_path() -> str:
+    """Returns daemon socket path, empty string disables the daemon"""
+    return os.environ.get("FASTWG_SOCKET", SOCKET_PATH)
+
+
+def _encode(value: Any) -> Any:
+    """Encodes values json cannot serialize"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Client):
+        return value.to_dict()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _decode_datetimes(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Restores datetime fields of decoded row"""
+    for field in DATETIME_FIELDS:
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+
+class DaemonError(Exception):
+    """Error reported by fastwg daemon"""
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests of one connection
+
+    The first request must be a hello carrying the client's working
+    directory; relative client and database paths only match when both
+    processes run from the same directory.
+    """
+
+    server: "DaemonServer"
+
+    # Requests are served one connection at a time, drop idle clients
+    timeout = 10
+
+    def handle(self) -> None:
+        try:
+            self._serve()
+        except OSError:
+            pass
+
+    def _serve(self) -> None:
+        greeted = False
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._send({"ok": False, "error": "Malformed request"})
+                return
+
+            if not greeted:
+                if request.get("op") != "hello" or not self.server.same_cwd(
+                    request.get("cwd", "")
+                ):
+                    self._send({"ok": False, "fallback": True})
+                    return
+                greeted = True
+                self._send({"ok": True, "result": os.getpid()})
+                continue
+
+            self._send(self.server.dispatch(request))
+
+    def _send(self, response: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(response, default=_encode).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serves warm WireGuardManager over a UNIX socket
+
+    The server is single-threaded: requests are handled one at a time on
+    the serving thread. Manager calls are also serialized by a lock, so the
+    manager and its in-memory indexes are never used concurrently even
+    from other threads of the daemon. The socket is created accessible to
+    its owner only.
+    """
+
+    def __init__(self, manager: "WireGuardManager", path: str) -> None:
+        self.manager = manager
+        self.path = path
+        self.cwd = os.path.realpath(os.getcwd())
+
+        if os.path.exists(path):
+            probe = DaemonClient.connect(path, check_cwd=False)
+            if probe:
+                probe.close()
+                raise DaemonError(f"Daemon is already running on {path}")
+            os.remove(path)
+
+        self._lock = threading.Lock()
+        # Socket is created with owner-only permissions, a chmod after bind
+        # would leave a window where other users can connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+        # Warm up client index before the first request
+        with self._lock:
+            manager._client_index()
+
+    def same_cwd(self, cwd: str) -> bool:
+        """Checks if client runs from daemon working directory"""
+        return bool(cwd) and os.path.realpath(cwd) == self.cwd
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs requested manager operation capturing its messages"""
+        method = OPERATIONS.get(request.get("op", ""))
+        if method is None:
+            return {"ok": False, "error": f"Unknown operation: {request.get('op')}"}
+
+        response: Dict[str, Any]
+        with self._lock, self.manager.collect_messages() as messages:
+            try:
+                with operations.timed(request["op"]):
+                    result = getattr(self.manager, method)(**request.get("args", {}))
+            except Exception as e:
+                response = {
+                    "ok": False,
+                    "error": str(e),
+                    "error_type": (
+                        "ValueError" if isinstance(e, ValueError) else type(e).__name__
+                    ),
+                }
+            else:
+                response = {"ok": True, "result": result}
+        response["output"] = "".join(f"{message}\n" for message in messages)
+        return response
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class DaemonClient:
+    """Connection to running fastwg daemon"""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.file = sock.makefile("rwb")
+
+    @classmethod
+    def connect(
+        cls, path: Optional[str] = None, check_cwd: bool = True
+    ) -> Optional["DaemonClient"]:
+        """Connects to daemon, None if it is not running or cannot serve us"""
+        path = socket_path() if path is None else path
+        if not path or not os.path.exists(path):
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            return None
+
+        client = cls(sock)
+        if not check_cwd:
+            return client
+
+        try:
+            client.call("hello", cwd=os.getcwd())
+        except (DaemonError, OSError):
+            client.close()
+            return None
+        return client
+
+    def call(self, op: str, **args: Any) -> Any:
+        """Sends request and returns its result, replaying captured output"""
+        request: Dict[str, Any] = {"op": op, "args": args}
+        if op == "hello":
+            request = {"op": op, **args}
+        self.file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self.file.flush()
+
+        line = self.file.readline()
+        if not line:
+            raise DaemonError("Daemon closed connection")
+
+        response = json.loads(line)
+        if response.get("output"):
+            sys.stdout.write(response["output"])
+        if response.get("fallback"):
+            raise DaemonError("Daemon cannot serve this working directory")
+        if not response["ok"]:
+            if response.get("error_type") == "ValueError":
+                raise ValueError(response["error"])
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def close(self) -> None:
+        """Closes connection"""
+        self.file.close()
+        self.sock.close()
+
+
+class RemoteManager:
+    """WireGuardManager subset served by running daemon"""
+
+    def __init__(self, client: DaemonClient) -> None:
+        self.client = client
+
+    @classmethod
+    def connect(cls) -> Optional["RemoteManager"]:
+        """Connects to running daemon, None if it is not available"""
+        client = DaemonClient.connect()
+        return cls(client) if client else None
+
+    def create_client(
+        self,
+        name: str,
+        interface: Optional[str] = None,
+        placement: Optional[str] = None,
+    ) -> Optional[Client]:
+        """Creates a new client"""
+        data = self.client.call(
+            "create", name=name, interface=interface, placement=placement
+        )
+        if data is None:
+            return None
+        _decode_datetimes(data)
+        return Client(**data)
+
+    def list_clients(self, **kwargs: Any) -> List[Dict]:
+        """Gets list of clients with connection information"""
+        return [_decode_datetimes(row) for row in self.client.call("list", **kwargs)]
+
+    def enable_client(self, name: str) -> bool:
+        """Unblocks a client"""
+        return bool(self.client.call("enable", name=name))
+
+    def disable_client(self, name: str) -> bool:
+        """Blocks a client"""
+        return bool(self.client.call("disable", name=name))
+
+    def get_client_config(self, name: str) -> Optional[str]:
+        """Gets client configuration"""
+        config: Optional[str] = self.client.call("cat", name=name)
+        return config
+
+    def count_clients(self, **kwargs: Any) -> int:
+        """Counts clients matching filters"""
+        return int(self.client.call("count", **kwargs))
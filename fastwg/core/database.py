@@ -1,93 +1,363 @@
+import ipaddress
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
-
-from ..models import Client, Server
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..models import Client, ConfigFingerprint, Server
+from . import tracing
+from .allocator import IPAllocator
+from .keypool import Keypair, KeyPool
+from .live import PeerState
+from .migrations import MIGRATIONS
+from .placement import InterfaceStats
+from .traffic import MAX_ROWS, TrafficDeltas, TrafficStore, counter_delta
+
+CLIENT_COLUMNS = (
+    "id",
+    "name",
+    "public_key",
+    "private_key",
+    "ip_address",
+    "created_at",
+    "is_active",
+    "is_blocked",
+    "last_seen",
+    "config_path",
+    "interface",
+)
+
+# Columns safe to show in listings
+LIST_COLUMNS = tuple(column for column in CLIENT_COLUMNS if column != "private_key")
+
+CLIENT_STATUSES = {
+    "active": "is_active AND NOT is_blocked",
+    "inactive": "NOT is_active",
+    "blocked": "is_blocked",
+}
+
+CLIENT_ORDER = {
+    "name": "name",
+    "ip_address": "ip_to_int(ip_address)",
+    "created_at": "created_at",
+    "last_seen": "last_seen",
+}
+
+SERVER_COLUMNS = (
+    "id, interface, private_key, public_key, address, port, dns, mtu,"
+    " config_path, external_ip"
+)
+
+# Live peer columns joined from peer_stats, which serves as presence table
+PRESENCE_COLUMNS = ("endpoint", "latest_handshake", "rx_bytes", "tx_bytes")
+
+# Tables whose row counts are exported as database size metrics, counted
+# on every scrape. Traffic keeps a row per peer and bucket, too many to count
+# that often, its growth shows in the database file size instead
+SIZED_TABLES = ("clients", "keypairs", "peer_stats")
+
+
+def _convert_client_value(column: str, value: Any) -> Any:
+    """Converts raw column value to Client field value"""
+    if column in ("is_active", "is_blocked"):
+        return bool(value)
+    if column == "created_at":
+        return datetime.fromisoformat(value) if value else datetime.now()
+    if column == "last_seen":
+        return datetime.fromisoformat(value) if value else None
+    if column in ("latest_handshake", "rx_bytes", "tx_bytes"):
+        # Peers never sampled have no presence row
+        return value or 0
+    return value
+
+
+def _statement(sql: str) -> str:
+    """Returns SQL collapsed to one line for span labels"""
+    return " ".join(sql.split())
+
+
+class _TracedCursor(sqlite3.Cursor):
+    """Cursor timing every statement as a tracing span"""
+
+    def execute(self, sql: str, parameters: Any = ()) -> "_TracedCursor":
+        with tracing.span("sql", statement=_statement(sql)):
+            super().execute(sql, parameters)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "_TracedCursor":
+        with tracing.span("sql", statement=_statement(sql), many=True):
+            super().executemany(sql, seq_of_parameters)
+        return self
+
+
+class _TracedConnection(sqlite3.Connection):
+    """Connection timing statements and commits as tracing spans
+
+    Only used while tracing is enabled, so untraced connections keep the
+    C implementation of every call.
+    """
+
+    def cursor(self, factory: Any = _TracedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        cursor: sqlite3.Cursor = self.cursor()
+        return cursor.execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        cursor: sqlite3.Cursor = self.cursor()
+        return cursor.executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        with tracing.span("sql", statement="COMMIT"):
+            super().commit()
+
+    def rollback(self) -> None:
+        with tracing.span("sql", statement="ROLLBACK"):
+            super().rollback()
 
 
 class Database:
-    """SQLite database management class"""
-
-    def __init__(self, db_path: str = "wireguard.db") -> None:
+    """SQLite database management class
+
+    Each thread reuses one long-lived connection configured with the
+    journal_mode, synchronous and cache_size pragmas. Writes run inside
+    `transaction()` scopes, which can be nested to group many writes into
+    a single commit.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "wireguard.db",
+        journal_mode: Optional[str] = None,
+        synchronous: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        traffic_max_rows: Optional[int] = None,
+    ) -> None:
         self.db_path = db_path
-        self._init_database()
-
-    def _init_database(self) -> None:
-        """Initializes database"""
-        conn = sqlite3.connect(self.db_path)
-
-        Client.create_table(conn)
-        Server.create_table(conn)
+        self.journal_mode = journal_mode or os.environ.get(
+            "FASTWG_DB_JOURNAL_MODE", "WAL"
+        )
+        self.synchronous = synchronous or os.environ.get(
+            "FASTWG_DB_SYNCHRONOUS", "NORMAL"
+        )
+        self.cache_size = cache_size or int(
+            os.environ.get("FASTWG_DB_CACHE_SIZE", "-8000")
+        )
+        self.traffic_max_rows = traffic_max_rows or int(
+            os.environ.get("FASTWG_TRAFFIC_MAX_ROWS", str(MAX_ROWS))
+        )
 
-        self._migrate_database(conn)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
 
-        conn.close()
+        self._init_database()
 
-    def _migrate_database(self, conn: sqlite3.Connection) -> None:
-        """Migrates database if needed"""
-        cursor = conn.cursor()
+    def _init_database(self) -> None:
+        """Brings schema up to date, a single pragma read when it already is"""
+        if self.schema_version() < len(MIGRATIONS):
+            self._migrate_database()
+
+    def schema_version(self) -> int:
+        """Returns number of migrations applied to database"""
+        version: int = (
+            self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+        )
+        return version
 
-        try:
-            cursor.execute("SELECT config_path FROM clients LIMIT 1")
-        except sqlite3.OperationalError:
+    def _migrate_database(self) -> None:
+        """Applies pending migrations, each in its own transaction"""
+        for number in range(self.schema_version() + 1, len(MIGRATIONS) + 1):
             try:
-                print("DB migration: adding config_path column...")
-                cursor.execute("ALTER TABLE clients ADD COLUMN config_path TEXT")
-                conn.commit()
-                print("✓ Migration completed")
+                with self.transaction() as conn:
+                    # Another process may have migrated while we waited for the lock
+                    if self.schema_version() >= number:
+                        continue
+                    MIGRATIONS[number - 1](conn)
+                    conn.execute(f"PRAGMA user_version = {number}")
             except sqlite3.OperationalError as e:
                 if "readonly" in str(e).lower():
                     print("Migration skipped (readonly DB)")
-                else:
-                    raise
-
+                    return
+                raise
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Gets database connection of current thread"""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only the owning thread queries the connection, but close()
+            # may run on another one
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                cached_statements=256,
+                check_same_thread=False,
+                factory=_TracedConnection if tracing.enabled() else sqlite3.Connection,
+            )
+            self._configure_connection(conn)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def thread_connection(self) -> Iterator[None]:
+        """Closes connection the current thread opens within the block
+
+        Short-lived worker threads wrap their task in it, so connections
+        are not kept open after the thread is gone.
+        """
+        opened = getattr(self._local, "conn", None) is None
         try:
-            cursor.execute("SELECT external_ip FROM server LIMIT 1")
-        except sqlite3.OperationalError:
+            yield
+        finally:
+            if opened:
+                self.close_thread_connection()
+
+    def close_thread_connection(self) -> None:
+        """Closes database connection of current thread"""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def _configure_connection(self, conn: sqlite3.Connection) -> None:
+        """Applies connection pragmas and registers SQL functions"""
+        conn.create_function("ip_to_int", 1, IPAllocator.to_int, deterministic=True)
+
+        for pragma in (
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA cache_size={int(self.cache_size)}",
+            "PRAGMA busy_timeout=5000",
+        ):
             try:
-                print("DB migration: adding external_ip column...")
-                cursor.execute("ALTER TABLE server ADD COLUMN external_ip TEXT")
-                conn.commit()
-                print("✓ external_ip migration completed")
-            except sqlite3.OperationalError as e:
-                if "readonly" in str(e).lower():
-                    print("external_ip migration skipped (readonly DB)")
-                else:
-                    raise
+                conn.execute(pragma)
+            except sqlite3.OperationalError:
+                # Readonly databases cannot switch journal mode
+                pass
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs enclosed writes in one transaction, nested scopes use savepoints"""
+        conn = self.get_connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
 
-    def get_connection(self):
-        """Gets database connection"""
-        return sqlite3.connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._local.depth = depth
+
+    def close(self) -> None:
+        """Closes all database connections"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
     def add_client(self, client: Client) -> bool:
         """Adds client to database"""
         try:
-            conn = self.get_connection()
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                client.interface = client.interface or self._default_interface(conn)
+
+                cursor.execute(
+                    """
+                INSERT INTO clients (name, public_key, private_key, ip_address, created_at, is_active, is_blocked, config_path, interface)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                    (
+                        client.name,
+                        client.public_key,
+                        client.private_key,
+                        client.ip_address,
+                        client.created_at,
+                        client.is_active,
+                        client.is_blocked,
+                        client.config_path,
+                        client.interface,
+                    ),
+                )
+
+                client.id = cursor.lastrowid
+                IPAllocator(conn).reserve(client.ip_address)
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def add_clients(self, clients: List[Client]) -> List[bool]:
+        """Adds many clients in one transaction, returns per-client result"""
+        with self.transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM clients")
+            last_id = cursor.fetchone()[0]
 
-            cursor.execute(
+            default_interface = self._default_interface(conn)
+            for client in clients:
+                client.interface = client.interface or default_interface
+
+            cursor.executemany(
                 """
-                INSERT INTO clients (name, public_key, private_key, ip_address, created_at, is_active, is_blocked, config_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT OR IGNORE INTO clients (name, public_key, private_key, ip_address, created_at, is_active, is_blocked, config_path, interface)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
                 (
-                    client.name,
-                    client.public_key,
-                    client.private_key,
-                    client.ip_address,
-                    client.created_at,
-                    client.is_active,
-                    client.is_blocked,
-                    client.config_path,
+                    (
+                        client.name,
+                        client.public_key,
+                        client.private_key,
+                        client.ip_address,
+                        client.created_at,
+                        client.is_active,
+                        client.is_blocked,
+                        client.config_path,
+                        client.interface,
+                    )
+                    for client in clients
                 ),
             )
 
-            client.id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+            cursor.execute("SELECT id, name FROM clients WHERE id > ?", (last_id,))
+            inserted: Dict[str, int] = {name: row_id for row_id, name in cursor}
+
+            allocator = IPAllocator(conn)
+            results = []
+            for client in clients:
+                row_id = inserted.pop(client.name, None)
+                if row_id is None:
+                    results.append(False)
+                    continue
+
+                client.id = row_id
+                allocator.reserve(client.ip_address)
+                results.append(True)
+
+        return results
 
     def get_client(self, name: str) -> Optional[Client]:
         """Gets client by name"""
@@ -96,14 +366,13 @@ class Database:
 
         cursor.execute(
             """
-            SELECT id, name, public_key, private_key, ip_address, created_at, is_active, is_blocked, last_seen, config_path
+            SELECT id, name, public_key, private_key, ip_address, created_at, is_active, is_blocked, last_seen, config_path, interface
             FROM clients WHERE name = ?
         """,
             (name,),
         )
 
         row = cursor.fetchone()
-        conn.close()
 
         if row:
             return Client(
@@ -117,6 +386,7 @@ class Database:
                 is_blocked=bool(row[7]),
                 last_seen=datetime.fromisoformat(row[8]) if row[8] else None,
                 config_path=row[9],
+                interface=row[10],
             )
         return None
 
@@ -127,7 +397,7 @@ class Database:
 
         cursor.execute(
             """
-            SELECT id, name, public_key, private_key, ip_address, created_at, is_active, is_blocked, last_seen, config_path
+            SELECT id, name, public_key, private_key, ip_address, created_at, is_active, is_blocked, last_seen, config_path, interface
             FROM clients ORDER BY name
         """
         )
@@ -148,118 +418,551 @@ class Database:
                     is_blocked=bool(row[7]),
                     last_seen=datetime.fromisoformat(row[8]) if row[8] else None,
                     config_path=row[9],
+                    interface=row[10],
                 )
             )
 
-        conn.close()
         return clients
 
+    def _client_filters(
+        self,
+        status: Optional[str],
+        name_prefix: Optional[str],
+        subnet: Optional[str],
+        interface: Optional[str] = None,
+    ) -> tuple:
+        """Builds WHERE clause and parameters for client queries"""
+        conditions: List[str] = []
+        params: List[Any] = []
+
+        if status:
+            if status not in CLIENT_STATUSES:
+                raise ValueError(f"Unknown client status: {status}")
+            conditions.append(CLIENT_STATUSES[status])
+
+        if name_prefix:
+            # Range scan keeps the name index usable, unlike LIKE
+            conditions.append("name >= ? AND name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+
+        if subnet:
+            network = ipaddress.IPv4Network(subnet, strict=False)
+            conditions.append("ip_to_int(ip_address) BETWEEN ? AND ?")
+            params.extend(
+                [int(network.network_address), int(network.broadcast_address)]
+            )
+
+        if interface:
+            conditions.append("interface = ?")
+            params.append(interface)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def iter_clients(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        order_by: str = "name",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        columns: Sequence[str] = LIST_COLUMNS,
+        presence: bool = False,
+        interface: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Streams clients as dicts of the requested columns
+
+        Filtering, ordering and pagination run in SQL, so only the
+        requested page and columns are read. private_key is not returned
+        unless explicitly requested. With presence, the last recorded live
+        peer state is joined by public key.
+        """
+        unknown = set(columns) - set(CLIENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown client columns: {', '.join(sorted(unknown))}")
+        if order_by not in CLIENT_ORDER:
+            raise ValueError(f"Unknown client order: {order_by}")
+
+        where, params = self._client_filters(status, name_prefix, subnet, interface)
+        selected = [f"clients.{column}" for column in columns]
+        source = "clients"
+        if presence:
+            columns = (*columns, *PRESENCE_COLUMNS)
+            selected += [f"peer_stats.{column}" for column in PRESENCE_COLUMNS]
+            source += (
+                " LEFT JOIN peer_stats ON peer_stats.public_key = clients.public_key"
+            )
+        query = (
+            f"SELECT {', '.join(selected)} FROM {source}{where}"
+            f" ORDER BY {CLIENT_ORDER[order_by]} {'DESC' if descending else 'ASC'}"
+        )
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit if limit is not None else -1, offset])
+
+        cursor = self.get_connection().execute(query, params)
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    column: _convert_client_value(column, value)
+                    for column, value in zip(columns, row)
+                }
+
+    def count_clients(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        interface: Optional[str] = None,
+    ) -> int:
+        """Counts clients matching filters"""
+        where, params = self._client_filters(status, name_prefix, subnet, interface)
+        cursor = self.get_connection().execute(
+            f"SELECT COUNT(*) FROM clients{where}", params
+        )
+        count: int = cursor.fetchone()[0]
+        return count
+
+    def max_name_length(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        interface: Optional[str] = None,
+    ) -> int:
+        """Returns length of longest client name matching filters"""
+        where, params = self._client_filters(status, name_prefix, subnet, interface)
+        cursor = self.get_connection().execute(
+            f"SELECT COALESCE(MAX(LENGTH(name)), 0) FROM clients{where}", params
+        )
+        length: int = cursor.fetchone()[0]
+        return length
+
     def delete_client(self, name: str) -> bool:
         """Deletes client by name"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("DELETE FROM clients WHERE name = ?", (name,))
-        deleted: bool = cursor.rowcount > 0
+            cursor.execute("SELECT ip_address FROM clients WHERE name = ?", (name,))
+            row = cursor.fetchone()
+
+            cursor.execute("DELETE FROM clients WHERE name = ?", (name,))
+            deleted: bool = cursor.rowcount > 0
+
+            if deleted and row:
+                IPAllocator(conn).release(row[0])
 
-        conn.commit()
-        conn.close()
         return deleted
 
+    def move_clients(self, addresses: Dict[str, str], interface: str) -> int:
+        """Moves clients to interface with new addresses in one transaction
+
+        Takes new address by client name, returns number of clients moved.
+        """
+        moved = 0
+        with self.transaction() as conn:
+            allocator = IPAllocator(conn)
+            for name, ip_address in addresses.items():
+                row = conn.execute(
+                    "SELECT ip_address FROM clients WHERE name = ?", (name,)
+                ).fetchone()
+                if not row:
+                    continue
+
+                conn.execute(
+                    "UPDATE clients SET interface = ?, ip_address = ? WHERE name = ?",
+                    (interface, ip_address, name),
+                )
+                allocator.release(row[0])
+                allocator.reserve(ip_address)
+                moved += 1
+        return moved
+
+    def get_free_ip(self, network: str, reserved: List[str]) -> Optional[str]:
+        """Gets lowest free IP address of network, initializing its pool if needed"""
+        return self._allocator(network, reserved).first_free(network)
+
+    def get_free_ips(self, network: str, count: int, reserved: List[str]) -> List[str]:
+        """Gets lowest count free IP addresses of network in one pass"""
+        return self._allocator(network, reserved).first_free_many(network, count)
+
+    def count_free_ips(self, network: str, reserved: List[str]) -> int:
+        """Counts free IP addresses of network"""
+        return self._allocator(network, reserved).free_count(network)
+
+    def _allocator(self, network: str, reserved: List[str]) -> IPAllocator:
+        """Returns allocator with pool of network initialized"""
+        conn = self.get_connection()
+        allocator = IPAllocator(conn)
+
+        if not allocator.has_pool(network):
+            with self.transaction():
+                if not allocator.has_pool(network):
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT ip_address FROM clients")
+                    used_ips = [row[0] for row in cursor.fetchall()]
+                    allocator.init_pool(network, used_ips + reserved)
+
+        return allocator
+
+    def add_keypairs(self, keypairs: List[Keypair]) -> None:
+        """Adds pre-generated keypairs to pool in one transaction"""
+        with self.transaction() as conn:
+            KeyPool(conn).push(keypairs)
+
+    def take_keypair(self) -> Optional[Keypair]:
+        """Atomically takes keypair out of pool, None if pool is empty"""
+        with self.transaction() as conn:
+            return KeyPool(conn).pop()
+
+    def take_keypairs(self, count: int) -> List[Keypair]:
+        """Atomically takes up to count keypairs out of pool"""
+        with self.transaction() as conn:
+            return KeyPool(conn).pop_many(count)
+
+    def data_version(self) -> int:
+        """Returns counter that changes when other connections commit"""
+        version: int = (
+            self.get_connection().execute("PRAGMA data_version").fetchone()[0]
+        )
+        return version
+
+    def table_rows(self) -> Dict[str, int]:
+        """Counts rows of tables that grow with clients"""
+        conn = self.get_connection()
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in SIZED_TABLES
+        }
+
+    def count_keypairs(self) -> int:
+        """Returns number of pre-generated keypairs in pool"""
+        return KeyPool(self.get_connection()).size()
+
     def update_client_status(
         self, name: str, is_active: bool, is_blocked: bool
     ) -> bool:
         """Updates client status"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(
-            """
-            UPDATE clients SET is_active = ?, is_blocked = ? WHERE name = ?
-        """,
-            (is_active, is_blocked, name),
-        )
+            cursor.execute(
+                """
+                UPDATE clients SET is_active = ?, is_blocked = ? WHERE name = ?
+            """,
+                (is_active, is_blocked, name),
+            )
 
-        updated: bool = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+            updated: bool = cursor.rowcount > 0
         return updated
 
     def update_client_last_seen(self, name: str, last_seen: datetime) -> bool:
         """Updates client last seen time"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(
-            """
-            UPDATE clients SET last_seen = ? WHERE name = ?
-        """,
-            (last_seen.isoformat(), name),
-        )
+            cursor.execute(
+                """
+                UPDATE clients SET last_seen = ? WHERE name = ?
+            """,
+                (last_seen.isoformat(), name),
+            )
 
-        updated: bool = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+            updated: bool = cursor.rowcount > 0
         return updated
 
+    def _existing_names(
+        self, conn: sqlite3.Connection, names: Iterable[str]
+    ) -> Set[str]:
+        """Returns which of the given client names exist"""
+        names = list(set(names))
+        existing: Set[str] = set()
+        # Stay below SQLite host parameter limit
+        for start in range(0, len(names), 500):
+            end = start + 500
+            chunk = names[start:end]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT name FROM clients WHERE name IN ({placeholders})", chunk
+            )
+            existing.update(row[0] for row in cursor)
+        return existing
+
+    def update_last_seen_many(self, last_seen: Dict[str, datetime]) -> List[bool]:
+        """Updates last seen time of many clients in one transaction"""
+        with self.transaction() as conn:
+            existing = self._existing_names(conn, last_seen)
+            conn.executemany(
+                "UPDATE clients SET last_seen = ? WHERE name = ?",
+                ((seen.isoformat(), name) for name, seen in last_seen.items()),
+            )
+        return [name in existing for name in last_seen]
+
+    def get_peer_stats(
+        self, public_keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, PeerState]:
+        """Gets last recorded live state of peers by public key, all by default"""
+        return self._stored_peer_states(self.get_connection(), public_keys)
+
+    def _stored_peer_states(
+        self, conn: sqlite3.Connection, public_keys: Optional[Iterable[str]]
+    ) -> Dict[str, PeerState]:
+        """Reads recorded peer states on given connection"""
+        query = (
+            "SELECT public_key, endpoint, latest_handshake, rx_bytes, tx_bytes "
+            "FROM peer_stats"
+        )
+        if public_keys is None:
+            chunks: List[List[str]] = [[]]
+        else:
+            keys = list(public_keys)
+            # Stay below SQLite host parameter limit
+            chunks = []
+            for start in range(0, len(keys), 500):
+                end = start + 500
+                chunks.append(keys[start:end])
+
+        states: Dict[str, PeerState] = {}
+        for chunk in chunks:
+            where = ""
+            if public_keys is not None:
+                where = f" WHERE public_key IN ({','.join('?' * len(chunk))})"
+            for row in conn.execute(query + where, chunk):
+                states[row[0]] = PeerState(
+                    interface="",
+                    public_key=row[0],
+                    endpoint=row[1],
+                    allowed_ips="",
+                    latest_handshake=row[2],
+                    rx_bytes=row[3],
+                    tx_bytes=row[4],
+                    persistent_keepalive=0,
+                )
+        return states
+
+    def record_peer_states(self, peers: Iterable[PeerState]) -> int:
+        """Stores sampled peer states, returns number of peers that changed
+
+        Stored state is read inside the write transaction, so traffic
+        deltas and client last seen times stay exact when the monitor,
+        `list --live` and sync refresh presence concurrently.
+        """
+        peers = list(peers)
+        timestamp = datetime.now()
+        now = timestamp.isoformat()
+        with self.transaction() as conn:
+            stored = self._stored_peer_states(conn, (p.public_key for p in peers))
+
+            changed: List[PeerState] = []
+            traffic: TrafficDeltas = {}
+            interface_traffic: Dict[str, int] = {}
+            last_seen: Dict[str, datetime] = {}
+            for peer in peers:
+                previous = stored.get(peer.public_key)
+                if not peer.differs(previous):
+                    continue
+
+                changed.append(peer)
+                # First sample of a peer is only a baseline, its counters
+                # cover the whole interface lifetime, not the last interval
+                if previous is not None:
+                    rx_bytes, tx_bytes = traffic[peer.public_key] = (
+                        counter_delta(peer.rx_bytes, previous.rx_bytes),
+                        counter_delta(peer.tx_bytes, previous.tx_bytes),
+                    )
+                    if peer.interface:
+                        interface_traffic[peer.interface] = (
+                            interface_traffic.get(peer.interface, 0)
+                            + rx_bytes
+                            + tx_bytes
+                        )
+                handshake_time = peer.handshake_time
+                if handshake_time and (
+                    previous is None
+                    or previous.latest_handshake != peer.latest_handshake
+                ):
+                    last_seen[peer.public_key] = handshake_time
+
+            if traffic:
+                TrafficStore(conn).record(traffic, int(timestamp.timestamp()))
+            if interface_traffic:
+                InterfaceStats(conn).add_traffic(
+                    interface_traffic, int(timestamp.timestamp())
+                )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO peer_stats
+                (public_key, endpoint, latest_handshake, rx_bytes, tx_bytes, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    (
+                        peer.public_key,
+                        peer.endpoint,
+                        peer.latest_handshake,
+                        peer.rx_bytes,
+                        peer.tx_bytes,
+                        now,
+                    )
+                    for peer in changed
+                ),
+            )
+            conn.executemany(
+                "UPDATE clients SET last_seen = ? WHERE public_key = ?",
+                ((seen.isoformat(), key) for key, seen in last_seen.items()),
+            )
+        return len(changed)
+
+    def prune_traffic(self, now: int) -> None:
+        """Drops traffic buckets past their retention or row cap"""
+        with self.transaction() as conn:
+            TrafficStore(conn).prune(now, self.traffic_max_rows)
+
+    def top_traffic(self, since: int, now: int, limit: int = 20) -> List[Dict]:
+        """Gets peers with most traffic since timestamp, biggest first"""
+        rows = TrafficStore(self.get_connection()).top(since, now, limit)
+        names: Dict[str, str] = {}
+        if rows:
+            placeholders = ",".join("?" * len(rows))
+            cursor = self.get_connection().execute(
+                f"SELECT public_key, name FROM clients WHERE public_key IN ({placeholders})",
+                [row[0] for row in rows],
+            )
+            names = dict(cursor.fetchall())
+
+        return [
+            {
+                "public_key": public_key,
+                "name": names.get(public_key),
+                "rx_bytes": rx_bytes,
+                "tx_bytes": tx_bytes,
+            }
+            for public_key, rx_bytes, tx_bytes in rows
+        ]
+
+    def set_status_many(
+        self, names: List[str], is_active: bool, is_blocked: bool
+    ) -> List[bool]:
+        """Updates status of many clients in one transaction"""
+        with self.transaction() as conn:
+            existing = self._existing_names(conn, names)
+            conn.executemany(
+                "UPDATE clients SET is_active = ?, is_blocked = ? WHERE name = ?",
+                ((is_active, is_blocked, name) for name in names),
+            )
+        return [name in existing for name in names]
+
     def save_server_config(self, server: Server) -> bool:
         """Saves server configuration"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            with self.transaction() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO server
+                # Updating in place keeps the id, which orders interfaces
+                cursor.execute(
+                    """
+                INSERT INTO server
                 (interface, private_key, public_key, address, port, dns, mtu, config_path, external_ip)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (interface) DO UPDATE SET
+                private_key = excluded.private_key, public_key = excluded.public_key,
+                address = excluded.address, port = excluded.port, dns = excluded.dns,
+                mtu = excluded.mtu, config_path = excluded.config_path,
+                external_ip = excluded.external_ip
             """,
-                (
-                    server.interface,
-                    server.private_key,
-                    server.public_key,
-                    server.address,
-                    server.port,
-                    server.dns,
-                    server.mtu,
-                    server.config_path,
-                    server.external_ip,
-                ),
-            )
+                    (
+                        server.interface,
+                        server.private_key,
+                        server.public_key,
+                        server.address,
+                        server.port,
+                        server.dns,
+                        server.mtu,
+                        server.config_path,
+                        server.external_ip,
+                    ),
+                )
 
-            server.id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+                cursor.execute(
+                    "SELECT id FROM server WHERE interface = ?", (server.interface,)
+                )
+                server.id = cursor.fetchone()[0]
+                # Clients added before any server existed belong to the first one
+                cursor.execute(
+                    "UPDATE clients SET interface = ? WHERE interface IS NULL",
+                    (self._default_interface(conn),),
+                )
             return True
         except Exception:
             return False
 
-    def get_server_config(self) -> Optional[Server]:
-        """Gets server configuration"""
+    def get_server_config(self, interface: Optional[str] = None) -> Optional[Server]:
+        """Gets server configuration of interface, the first one by default"""
         conn = self.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-            SELECT id, interface, private_key, public_key, address, port, dns, mtu, config_path, external_ip
-            FROM server LIMIT 1
-        """
+        if interface:
+            cursor.execute(
+                f"SELECT {SERVER_COLUMNS} FROM server WHERE interface = ?", (interface,)
+            )
+        else:
+            cursor.execute(f"SELECT {SERVER_COLUMNS} FROM server ORDER BY id LIMIT 1")
+
+        row = cursor.fetchone()
+        return Server(*row) if row else None
+
+    def get_server_configs(self) -> List[Server]:
+        """Gets server configurations of all interfaces, first one first"""
+        cursor = self.get_connection().execute(
+            f"SELECT {SERVER_COLUMNS} FROM server ORDER BY id"
+        )
+        return [Server(*row) for row in cursor]
+
+    def get_interface_stats(self, now: int) -> Dict[str, Tuple[int, float]]:
+        """Gets client count and recent traffic by interface"""
+        return InterfaceStats(self.get_connection()).read(now)
+
+    def _default_interface(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Returns interface of first server, None if there is none"""
+        row = conn.execute(
+            "SELECT interface FROM server ORDER BY id LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_config_fingerprints(self) -> Dict[str, ConfigFingerprint]:
+        """Gets fingerprints of imported configuration files by path"""
+        cursor = self.get_connection().execute(
+            "SELECT path, sha256, mtime_ns, size FROM config_fingerprints"
         )
+        return {row[0]: ConfigFingerprint(*row) for row in cursor}
 
+    def get_config_fingerprint(self, path: str) -> Optional[ConfigFingerprint]:
+        """Gets fingerprint of configuration file"""
+        cursor = self.get_connection().execute(
+            "SELECT path, sha256, mtime_ns, size FROM config_fingerprints WHERE path = ?",
+            (path,),
+        )
         row = cursor.fetchone()
-        conn.close()
+        return ConfigFingerprint(*row) if row else None
 
-        if row:
-            return Server(
-                id=row[0],
-                interface=row[1],
-                private_key=row[2],
-                public_key=row[3],
-                address=row[4],
-                port=row[5],
-                dns=row[6],
-                mtu=row[7],
-                config_path=row[8],
-                external_ip=row[9],
+    def save_config_fingerprint(self, fingerprint: ConfigFingerprint) -> bool:
+        """Saves fingerprint of imported or written configuration file"""
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO config_fingerprints (path, sha256, mtime_ns, size)
+                VALUES (?, ?, ?, ?)
+            """,
+                (
+                    fingerprint.path,
+                    fingerprint.sha256,
+                    fingerprint.mtime_ns,
+                    fingerprint.size,
+                ),
             )
-        return None
+        return True
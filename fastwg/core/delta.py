@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .live import PeerState
+
+
+class PeerSpec(NamedTuple):
+    """Desired state of WireGuard peer"""
+
+    public_key: str
+    allowed_ips: str
+
+
+def _normalize_allowed_ips(allowed_ips: str) -> str:
+    """Normalizes allowed IPs list for comparison"""
+    if allowed_ips in ("", "(none)"):
+        return ""
+    return ",".join(sorted(ip.strip() for ip in allowed_ips.split(",")))
+
+
+class PeerDelta:
+    """Set of peer changes to apply to a running interface"""
+
+    # Peers per `wg set` invocation, keeps command line well below ARG_MAX
+    BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        add: Optional[List[PeerSpec]] = None,
+        update: Optional[List[PeerSpec]] = None,
+        remove: Optional[List[str]] = None,
+    ) -> None:
+        self.add = add or []
+        self.update = update or []
+        self.remove = remove or []
+
+    @classmethod
+    def between(
+        cls, desired: Iterable[PeerSpec], live_peers: Iterable[PeerState]
+    ) -> "PeerDelta":
+        """Computes changes turning live peers into desired peers"""
+        live: Dict[str, str] = {
+            peer.public_key: _normalize_allowed_ips(peer.allowed_ips)
+            for peer in live_peers
+        }
+
+        delta = cls()
+        for spec in desired:
+            current = live.pop(spec.public_key, None)
+            if current is None:
+                delta.add.append(spec)
+            elif current != _normalize_allowed_ips(spec.allowed_ips):
+                delta.update.append(spec)
+
+        delta.remove.extend(live)
+        return delta
+
+    def is_empty(self) -> bool:
+        """Checks if delta has no changes"""
+        return not (self.add or self.update or self.remove)
+
+    def wg_set_commands(self, interface: str) -> List[List[str]]:
+        """Builds batched `wg set` commands applying the delta"""
+        args: List[List[str]] = []
+        for spec in self.add + self.update:
+            args.append(["peer", spec.public_key, "allowed-ips", spec.allowed_ips])
+        for public_key in self.remove:
+            args.append(["peer", public_key, "remove"])
+
+        commands = []
+        for start in range(0, len(args), self.BATCH_SIZE):
+            end = start + self.BATCH_SIZE
+            command = ["wg", "set", interface]
+            for peer_args in args[start:end]:
+                command.extend(peer_args)
+            commands.append(command)
+        return commands
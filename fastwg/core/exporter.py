@@ -0,0 +1,273 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .database import Database
+from .live import LiveState
+from .metrics import operations
+from .writer import AtomicWriter
+
+LISTEN_ADDRESS = ("127.0.0.1", 9586)
+
+# Peers with a handshake within this window are reported as connected
+CONNECTED_WINDOW = 3600
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Dict[str, str]
+Sample = Tuple[Labels, float]
+
+
+def _escape(value: str) -> str:
+    """Escapes label value for Prometheus text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Formats sample value, integers without exponent"""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_metric(
+    name: str, metric_type: str, help_text: str, samples: Iterable[Sample]
+) -> str:
+    """Formats one metric family in Prometheus text exposition format"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(v)}"' for key, v in labels.items())
+        series = f"{name}{{{label_text}}}" if label_text else name
+        lines.append(f"{series} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsCollector:
+    """Builds metrics page from one cached sample per interval
+
+    The page is rebuilt at most once per interval under a lock, so any
+    number of concurrent scrapers share a single `wg show all dump` call
+    and a single round of database reads.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        interval: float = 15.0,
+        read_state: Callable[[], Optional[LiveState]] = LiveState.read,
+    ) -> None:
+        self.db = db
+        self.interval = interval
+        self.read_state = read_state
+        self._lock = threading.Lock()
+        self._page: Optional[str] = None
+        self._collected_at = 0.0
+
+    def render(self) -> str:
+        """Returns metrics page, collecting it when cache is stale"""
+        with self._lock:
+            now = time.monotonic()
+            if self._page is None or now - self._collected_at >= self.interval:
+                self._page = self.collect()
+                self._collected_at = time.monotonic()
+            return self._page
+
+    def collect(self) -> str:
+        """Collects fresh metrics page"""
+        start = time.perf_counter()
+        try:
+            state = self.read_state()
+        except FileNotFoundError:
+            # wg is not installed
+            state = None
+
+        with operations.timed("exporter_database_read"):
+            names = {
+                row["public_key"]: row["name"]
+                for row in self.db.iter_clients(columns=("name", "public_key"))
+            }
+            table_rows = self.db.table_rows()
+
+        parts = self._peer_metrics(state, names)
+        parts.append(self._database_metrics(table_rows))
+        parts.append(self._operation_metrics())
+        parts.append(
+            format_metric(
+                "fastwg_up",
+                "gauge",
+                "Whether WireGuard state could be read",
+                [({}, 1 if state is not None else 0)],
+            )
+        )
+        parts.append(
+            format_metric(
+                "fastwg_scrape_duration_seconds",
+                "gauge",
+                "Time spent collecting metrics",
+                [({}, time.perf_counter() - start)],
+            )
+        )
+        return "".join(parts)
+
+    def _peer_metrics(
+        self, state: Optional[LiveState], names: Dict[str, str]
+    ) -> List[str]:
+        """Formats per-peer metric families"""
+        now = time.time()
+        handshake: List[Sample] = []
+        age: List[Sample] = []
+        received: List[Sample] = []
+        sent: List[Sample] = []
+        connected: List[Sample] = []
+
+        for peer in state.peers.values() if state else ():
+            labels = {
+                "interface": peer.interface,
+                "public_key": peer.public_key,
+                "name": names.get(peer.public_key, ""),
+            }
+            handshake.append((labels, peer.latest_handshake))
+            if peer.latest_handshake:
+                age.append((labels, max(0.0, now - peer.latest_handshake)))
+            received.append((labels, peer.rx_bytes))
+            sent.append((labels, peer.tx_bytes))
+            is_connected = (
+                peer.latest_handshake > 0
+                and now - peer.latest_handshake <= CONNECTED_WINDOW
+            )
+            connected.append((labels, 1 if is_connected else 0))
+
+        return [
+            format_metric(
+                "fastwg_peer_last_handshake_seconds",
+                "gauge",
+                "Unix time of latest handshake, 0 if peer never connected",
+                handshake,
+            ),
+            format_metric(
+                "fastwg_peer_handshake_age_seconds",
+                "gauge",
+                "Seconds since latest handshake",
+                age,
+            ),
+            format_metric(
+                "fastwg_peer_receive_bytes_total",
+                "counter",
+                "Bytes received from peer",
+                received,
+            ),
+            format_metric(
+                "fastwg_peer_transmit_bytes_total",
+                "counter",
+                "Bytes sent to peer",
+                sent,
+            ),
+            format_metric(
+                "fastwg_peer_connected",
+                "gauge",
+                "Whether peer had a handshake within the last hour",
+                connected,
+            ),
+        ]
+
+    def _database_metrics(self, table_rows: Dict[str, int]) -> str:
+        """Formats database file and table sizes"""
+        files: List[Sample] = []
+        for suffix, kind in (("", "main"), ("-wal", "wal")):
+            try:
+                files.append(
+                    ({"file": kind}, os.path.getsize(self.db.db_path + suffix))
+                )
+            except OSError:
+                pass
+
+        return format_metric(
+            "fastwg_database_size_bytes",
+            "gauge",
+            "Size of database files",
+            files,
+        ) + format_metric(
+            "fastwg_database_rows",
+            "gauge",
+            "Number of rows in database tables",
+            [({"table": table}, rows) for table, rows in table_rows.items()],
+        )
+
+    def _operation_metrics(self) -> str:
+        """Formats operation timings of this process as a summary"""
+        name = "fastwg_operation_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in fastwg operations",
+            f"# TYPE {name} summary",
+        ]
+        snapshot = sorted(operations.snapshot().items())
+        for operation, stats in snapshot:
+            labels = f'{{operation="{_escape(operation)}"}}'
+            lines.append(f"{name}_sum{labels} {_format_value(stats.total_seconds)}")
+            lines.append(f"{name}_count{labels} {stats.calls}")
+        return (
+            "\n".join(lines)
+            + "\n"
+            + format_metric(
+                "fastwg_operation_duration_max_seconds",
+                "gauge",
+                "Longest fastwg operation",
+                [
+                    ({"operation": operation}, stats.max_seconds)
+                    for operation, stats in snapshot
+                ],
+            )
+        )
+
+    def write_textfile(self, path: str) -> None:
+        """Writes metrics page for node_exporter textfile collector"""
+        with AtomicWriter(path, mode=0o644) as writer:
+            writer.write(self.render())
+            writer.commit()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves cached metrics page"""
+
+    server: "MetricsServer"
+
+    # Scrapes are served one at a time, drop stalled clients
+    timeout = 10
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = self.server.collector.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # Scrapes every few seconds would flood the output
+        pass
+
+
+class MetricsServer(HTTPServer):
+    """HTTP listener exposing metrics on /metrics
+
+    Requests are handled on one thread, so the database connection of the
+    collector is only used by that thread.
+    """
+
+    def __init__(
+        self, collector: MetricsCollector, address: Tuple[str, int] = LISTEN_ADDRESS
+    ) -> None:
+        self.collector = collector
+        super().__init__(address, _MetricsHandler)
+
+
+def parse_listen_address(value: str) -> Tuple[str, int]:
+    """Parses HOST:PORT or PORT, host defaults to localhost"""
+    host, _, port = value.rpartition(":")
+    return (host.strip("[]") or LISTEN_ADDRESS[0], int(port))
@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from .database import Database
+
+
+class ClientIndex:
+    """In-memory hash indexes of clients by public key, IP address and name"""
+
+    def __init__(self) -> None:
+        self.by_public_key: Dict[str, str] = {}
+        self.by_ip_address: Dict[str, str] = {}
+        self.names: Set[str] = set()
+
+    @classmethod
+    def load(cls, db: "Database") -> "ClientIndex":
+        """Builds index with one pass over clients table"""
+        index = cls()
+        for row in db.iter_clients(columns=("name", "public_key", "ip_address")):
+            index.add(row["name"], row["public_key"], row["ip_address"])
+        return index
+
+    def add(self, name: str, public_key: str, ip_address: str) -> None:
+        """Adds client to index"""
+        self.names.add(name)
+        self.by_public_key[public_key] = name
+        self.by_ip_address[ip_address] = name
+
+    def remove(self, name: str, public_key: str, ip_address: str) -> None:
+        """Removes client from index"""
+        self.names.discard(name)
+        if self.by_public_key.get(public_key) == name:
+            del self.by_public_key[public_key]
+        if self.by_ip_address.get(ip_address) == name:
+            del self.by_ip_address[ip_address]
+
+    def find(self, ip_address: str, public_key: str) -> Optional[str]:
+        """Finds name of client using IP address or public key"""
+        return self.by_ip_address.get(ip_address) or self.by_public_key.get(public_key)
+
+    def free_name(self, prefix: str, start: int = 1) -> int:
+        """Returns first counter from start giving an unused prefix name"""
+        counter = start
+        while f"{prefix}{counter}" in self.names:
+            counter += 1
+        return counter
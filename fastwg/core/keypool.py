@@ -0,0 +1,126 @@
+import base64
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+Keypair = Tuple[str, str]
+
+# Keypairs generated per process pool task
+CHUNK_SIZE = 256
+
+
+def generate_keypair() -> Keypair:
+    """Generates X25519 keypair as base64 (private_key, public_key)"""
+    # cryptography is slow to import, load it only when keys are needed
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import x25519
+
+    private_key = x25519.X25519PrivateKey.generate()
+    private_bytes = private_key.private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_bytes = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw, format=serialization.PublicFormat.Raw
+    )
+    return (
+        base64.b64encode(private_bytes).decode("utf-8"),
+        base64.b64encode(public_bytes).decode("utf-8"),
+    )
+
+
+def derive_public_key(private_key: str) -> str:
+    """Derives base64 public key from base64 private key"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import x25519
+
+    key = x25519.X25519PrivateKey.from_private_bytes(base64.b64decode(private_key))
+    public_bytes = key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw, format=serialization.PublicFormat.Raw
+    )
+    return base64.b64encode(public_bytes).decode("utf-8")
+
+
+def _generate_chunk(count: int) -> List[Keypair]:
+    """Generates chunk of keypairs in worker process"""
+    return [generate_keypair() for _ in range(count)]
+
+
+def generate_keypairs(count: int, workers: Optional[int] = None) -> List[Keypair]:
+    """Generates keypairs, spreading large batches over a process pool"""
+    workers = workers or os.cpu_count() or 1
+    if count <= CHUNK_SIZE or workers == 1:
+        return _generate_chunk(count)
+
+    chunks = [CHUNK_SIZE] * (count // CHUNK_SIZE)
+    if count % CHUNK_SIZE:
+        chunks.append(count % CHUNK_SIZE)
+
+    keypairs: List[Keypair] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk in pool.map(_generate_chunk, chunks):
+            keypairs.extend(chunk)
+    return keypairs
+
+
+class KeyPool:
+    """Pool of pre-generated keypairs stored in SQLite
+
+    Keypairs are handed out oldest first and deleted as they are taken.
+    Like IPAllocator, all methods work on the caller's connection and never
+    commit, so taking a keypair is atomic within the caller's transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    @classmethod
+    def create_table(cls, conn: sqlite3.Connection) -> None:
+        """Creates keypair pool table in database"""
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS keypairs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                private_key TEXT NOT NULL,
+                public_key TEXT UNIQUE NOT NULL
+            )
+        """
+        )
+
+    def push(self, keypairs: Iterable[Keypair]) -> None:
+        """Adds keypairs to pool"""
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO keypairs (private_key, public_key) VALUES (?, ?)",
+            keypairs,
+        )
+
+    def pop(self) -> Optional[Keypair]:
+        """Takes oldest keypair out of pool, None if pool is empty"""
+        cursor = self.conn.execute(
+            "SELECT id, private_key, public_key FROM keypairs ORDER BY id LIMIT 1"
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        self.conn.execute("DELETE FROM keypairs WHERE id = ?", (row[0],))
+        return row[1], row[2]
+
+    def pop_many(self, count: int) -> List[Keypair]:
+        """Takes up to count oldest keypairs out of pool"""
+        cursor = self.conn.execute(
+            "SELECT id, private_key, public_key FROM keypairs ORDER BY id LIMIT ?",
+            (count,),
+        )
+        rows = cursor.fetchall()
+        if rows:
+            self.conn.execute("DELETE FROM keypairs WHERE id <= ?", (rows[-1][0],))
+        return [(private_key, public_key) for _, private_key, public_key in rows]
+
+    def size(self) -> int:
+        """Returns number of keypairs in pool"""
+        count: int = self.conn.execute("SELECT COUNT(*) FROM keypairs").fetchone()[0]
+        return count
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from . import tracing
+from .metrics import operations
+
+
+class InterfaceState(NamedTuple):
+    """Live state of WireGuard interface"""
+
+    name: str
+    public_key: str
+    listen_port: int
+    fwmark: Optional[str]
+
+
+class PeerState(NamedTuple):
+    """Live state of WireGuard peer"""
+
+    interface: str
+    public_key: str
+    endpoint: Optional[str]
+    allowed_ips: str
+    latest_handshake: int
+    rx_bytes: int
+    tx_bytes: int
+    persistent_keepalive: int
+
+    @property
+    def handshake_time(self) -> Optional[datetime]:
+        """Latest handshake as datetime, None if peer never connected"""
+        if self.latest_handshake:
+            return datetime.fromtimestamp(self.latest_handshake)
+        return None
+
+    def differs(self, previous: Optional["PeerState"]) -> bool:
+        """Checks if sample differs from previous sample of the peer"""
+        if previous is None:
+            return True
+        return (
+            self.latest_handshake != previous.latest_handshake
+            or self.rx_bytes != previous.rx_bytes
+            or self.tx_bytes != previous.tx_bytes
+            or self.endpoint != previous.endpoint
+        )
+
+
+def _optional(value: str) -> Optional[str]:
+    """Converts wg dump placeholder values to None"""
+    return None if value in ("(none)", "off") else value
+
+
+def parse_dump(lines: Iterable[str]) -> Iterator[Union[InterfaceState, PeerState]]:
+    """Parses `wg show all dump` rows one by one
+
+    Interface rows have 5 tab-separated fields, peer rows have 9. Rows of
+    any other shape are skipped.
+    """
+    for line in lines:
+        fields = line.rstrip("\n").split("\t")
+
+        if len(fields) == 9:
+            yield PeerState(
+                interface=fields[0],
+                public_key=fields[1],
+                endpoint=_optional(fields[3]),
+                allowed_ips=fields[4],
+                latest_handshake=int(fields[5]),
+                rx_bytes=int(fields[6]),
+                tx_bytes=int(fields[7]),
+                persistent_keepalive=(int(fields[8]) if fields[8].isdigit() else 0),
+            )
+        elif len(fields) == 5:
+            yield InterfaceState(
+                name=fields[0],
+                public_key=fields[2],
+                listen_port=int(fields[3]) if fields[3].isdigit() else 0,
+                fwmark=_optional(fields[4]),
+            )
+
+
+class LiveState:
+    """Snapshot of running WireGuard interfaces and peers"""
+
+    def __init__(self) -> None:
+        self.interfaces: Dict[str, InterfaceState] = {}
+        self.peers: Dict[str, PeerState] = {}
+
+    @classmethod
+    def parse(cls, output: Union[str, Iterable[str]]) -> "LiveState":
+        """Builds snapshot from `wg show all dump` output"""
+        state = cls()
+        lines = output.splitlines() if isinstance(output, str) else output
+
+        for record in parse_dump(lines):
+            if isinstance(record, PeerState):
+                state.peers[record.public_key] = record
+            else:
+                state.interfaces[record.name] = record
+
+        return state
+
+    @classmethod
+    def read(cls) -> Optional["LiveState"]:
+        """Runs `wg show all dump` once, None if WireGuard is not active"""
+        with operations.timed("wg_show_dump"):
+            result = tracing.run(
+                ["wg", "show", "all", "dump"], capture_output=True, text=True
+            )
+        if result.returncode != 0:
+            return None
+        return cls.parse(result.stdout)
+
+    def interface_of(self, public_key: str) -> Optional[str]:
+        """Returns interface the peer is configured on"""
+        peer = self.peers.get(public_key)
+        return peer.interface if peer else None
+
+    def interface_peers(self, interface: str) -> Iterator[PeerState]:
+        """Iterates peers of interface"""
+        for peer in self.peers.values():
+            if peer.interface == interface:
+                yield peer
@@ -0,0 +1,48 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple
+
+
+class OperationStats(NamedTuple):
+    """Accumulated timings of one operation"""
+
+    calls: int
+    total_seconds: float
+    max_seconds: float
+
+
+class OperationTimer:
+    """Thread-safe registry of operation durations of this process"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, OperationStats] = {}
+
+    @contextmanager
+    def timed(self, operation: str) -> Iterator[None]:
+        """Measures duration of enclosed block, failures included"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, time.perf_counter() - start)
+
+    def record(self, operation: str, seconds: float) -> None:
+        """Adds one measured duration of operation"""
+        with self._lock:
+            stats = self._stats.get(operation, OperationStats(0, 0.0, 0.0))
+            self._stats[operation] = OperationStats(
+                stats.calls + 1,
+                stats.total_seconds + seconds,
+                max(stats.max_seconds, seconds),
+            )
+
+    def snapshot(self) -> Dict[str, OperationStats]:
+        """Returns copy of accumulated timings by operation"""
+        with self._lock:
+            return dict(self._stats)
+
+
+# Timings of this process, exported by `fastwg exporter`
+operations = OperationTimer()
@@ -0,0 +1,133 @@
+import sqlite3
+from typing import Callable, List
+
+from ..models import Client, ConfigFingerprint, Server
+from .allocator import IPAllocator
+from .keypool import KeyPool
+from .placement import InterfaceStats
+from .traffic import TrafficStore
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Checks if table has column"""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    """Creates clients and server tables"""
+    Client.create_table(conn)
+    Server.create_table(conn)
+
+
+def _add_client_config_path(conn: sqlite3.Connection) -> None:
+    """Adds config_path column to clients created by early versions"""
+    if not _has_column(conn, "clients", "config_path"):
+        conn.execute("ALTER TABLE clients ADD COLUMN config_path TEXT")
+
+
+def _add_server_external_ip(conn: sqlite3.Connection) -> None:
+    """Adds external_ip column to server created by early versions"""
+    if not _has_column(conn, "server", "external_ip"):
+        conn.execute("ALTER TABLE server ADD COLUMN external_ip TEXT")
+
+
+def _create_ip_allocator(conn: sqlite3.Connection) -> None:
+    """Creates free-range IP allocator tables"""
+    IPAllocator.create_table(conn)
+
+
+def _create_config_fingerprints(conn: sqlite3.Connection) -> None:
+    """Creates config fingerprints table"""
+    ConfigFingerprint.create_table(conn)
+
+
+def _create_keypairs(conn: sqlite3.Connection) -> None:
+    """Creates keypair pool table"""
+    KeyPool.create_table(conn)
+
+
+def _create_peer_stats(conn: sqlite3.Connection) -> None:
+    """Creates table of last sampled live peer state"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS peer_stats (
+            public_key TEXT PRIMARY KEY,
+            endpoint TEXT,
+            latest_handshake INTEGER NOT NULL DEFAULT 0,
+            rx_bytes INTEGER NOT NULL DEFAULT 0,
+            tx_bytes INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+    """
+    )
+
+
+def _create_traffic(conn: sqlite3.Connection) -> None:
+    """Creates per-peer traffic time series table"""
+    TrafficStore.create_table(conn)
+
+
+def _add_client_interface(conn: sqlite3.Connection) -> None:
+    """Binds clients to server interfaces
+
+    Existing clients are assigned to the interface whose network contains
+    their address, the rest to the first interface.
+    """
+    if not _has_column(conn, "clients", "interface"):
+        conn.execute("ALTER TABLE clients ADD COLUMN interface TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_clients_interface ON clients (interface, name)"
+    )
+
+    servers = conn.execute(
+        "SELECT interface, address FROM server ORDER BY id"
+    ).fetchall()
+    for interface, address in servers:
+        try:
+            first, last = IPAllocator.host_bounds(address)
+        except ValueError:
+            continue
+        conn.execute(
+            """
+            UPDATE clients SET interface = ?
+            WHERE interface IS NULL AND ip_to_int(ip_address) BETWEEN ? AND ?
+        """,
+            (interface, first, last),
+        )
+    if servers:
+        conn.execute(
+            "UPDATE clients SET interface = ? WHERE interface IS NULL",
+            (servers[0][0],),
+        )
+
+
+def _create_interface_stats(conn: sqlite3.Connection) -> None:
+    """Creates per-interface counters and counts existing clients"""
+    InterfaceStats.create_table(conn)
+    InterfaceStats(conn).recount()
+
+
+def _drop_minute_traffic(conn: sqlite3.Connection) -> None:
+    """Drops 1-minute traffic buckets, hours are the finest resolution now"""
+    conn.execute("DELETE FROM traffic WHERE resolution = 60")
+
+
+# Ordered schema migrations, the database schema version is the number of
+# applied steps. Append new steps only, never reorder or remove them.
+# Databases created before versioning are at version 0, so early steps
+# must tolerate schema objects that already exist.
+MIGRATIONS: List[Migration] = [
+    _create_base_tables,
+    _add_client_config_path,
+    _add_server_external_ip,
+    _create_ip_allocator,
+    _create_config_fingerprints,
+    _create_keypairs,
+    _create_peer_stats,
+    _create_traffic,
+    _add_client_interface,
+    _create_interface_stats,
+    _drop_minute_traffic,
+]
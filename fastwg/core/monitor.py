@@ -0,0 +1,77 @@
+import sqlite3
+import time
+from typing import Callable, Dict, Optional
+
+from .database import Database
+from .live import LiveState, PeerState
+from .metrics import operations
+from .traffic import HOUR
+
+
+class Monitor:
+    """Polls live WireGuard state and records peer changes in batches
+
+    Each tick reads `wg show all dump` once, diffs it against the previous
+    sample and writes only changed peers in a single transaction. The
+    recorded peer states double as the presence table read by `list`.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        interval: float = 10.0,
+        read_state: Callable[[], Optional[LiveState]] = LiveState.read,
+    ) -> None:
+        self.db = db
+        self.interval = interval
+        self.read_state = read_state
+        self._previous: Optional[Dict[str, PeerState]] = None
+        self._pruned_at = 0.0
+
+    def tick(self) -> int:
+        """Samples peers once, returns number of changed peers recorded"""
+        if self._previous is None:
+            # Continue from last recorded state after a restart
+            self._previous = self.db.get_peer_stats()
+
+        state = self.read_state()
+        if state is None:
+            return 0
+
+        sampled = [
+            peer
+            for public_key, peer in state.peers.items()
+            if peer.differs(self._previous.get(public_key))
+        ]
+        recorded = self.db.record_peer_states(sampled) if sampled else 0
+        self._previous.update((peer.public_key, peer) for peer in sampled)
+
+        now = time.time()
+        # Buckets are hourly, pruning more often would drop nothing new
+        if now - self._pruned_at >= HOUR:
+            self.db.prune_traffic(int(now))
+            self._pruned_at = now
+        return recorded
+
+    def run(self, iterations: Optional[int] = None) -> None:
+        """Ticks every interval until interrupted or iterations are done"""
+        count = 0
+        next_tick = time.monotonic()
+        while iterations is None or count < iterations:
+            try:
+                with operations.timed("monitor_tick"):
+                    self.tick()
+            except sqlite3.OperationalError as e:
+                # Database busy or locked, retry on next tick
+                print(f"Error recording peer state: {e}")
+            count += 1
+            if iterations is not None and count >= iterations:
+                break
+
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Tick took longer than interval, skip missed ticks
+                next_tick = time.monotonic()
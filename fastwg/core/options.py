@@ -0,0 +1,14 @@
+# Option values shared by the CLI and core modules. Dependency-free, so
+# the CLI builds its options without importing the modules that use them
+
+# Policies picking the interface of new clients:
+# peers - fewest clients, traffic - least recent traffic,
+# free - most free addresses, first - always the first interface
+PLACEMENT_POLICIES = ("peers", "traffic", "free", "first")
+
+DEFAULT_POLICY = "peers"
+
+TRACE_FORMATS = ("text", "json")
+
+# Functions and allocation sites shown in the profile summary
+DEFAULT_TOP = 25
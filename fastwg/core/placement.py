@@ -0,0 +1,211 @@
+import math
+import sqlite3
+from typing import Dict, List, NamedTuple, Tuple
+
+from .options import PLACEMENT_POLICIES
+from .traffic import HOUR
+
+# Recent traffic of an interface halves every this many seconds
+TRAFFIC_HALF_LIFE = HOUR
+
+
+class InterfaceLoad(NamedTuple):
+    """Load of one interface as seen by placement"""
+
+    interface: str
+    peers: int
+    traffic: float
+    free: int
+
+
+def decay(traffic: float, since: int, now: int) -> float:
+    """Returns recent traffic counter decayed from since to now"""
+    if now <= since:
+        return traffic
+    return traffic * math.pow(0.5, (now - since) / TRAFFIC_HALF_LIFE)
+
+
+class InterfaceStats:
+    """Per-interface counters stored in SQLite
+
+    Client counts are maintained by triggers on the clients table, so
+    inserts, deletes and moves keep them exact and placement never counts
+    clients. Recent traffic is a byte counter halving every
+    TRAFFIC_HALF_LIFE, fed by recorded peer samples. Like IPAllocator, all
+    methods work on the caller's connection and never commit.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    @classmethod
+    def create_table(cls, conn: sqlite3.Connection) -> None:
+        """Creates counters table and triggers keeping client counts"""
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interface_stats (
+                interface TEXT PRIMARY KEY,
+                peers INTEGER NOT NULL DEFAULT 0,
+                traffic REAL NOT NULL DEFAULT 0,
+                traffic_at INTEGER NOT NULL DEFAULT 0
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS interface_stats_insert
+            AFTER INSERT ON clients WHEN NEW.interface IS NOT NULL
+            BEGIN
+                INSERT INTO interface_stats (interface, peers) VALUES (NEW.interface, 1)
+                ON CONFLICT (interface) DO UPDATE SET peers = peers + 1;
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS interface_stats_delete
+            AFTER DELETE ON clients WHEN OLD.interface IS NOT NULL
+            BEGIN
+                UPDATE interface_stats SET peers = peers - 1
+                WHERE interface = OLD.interface;
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS interface_stats_move
+            AFTER UPDATE OF interface ON clients
+            WHEN OLD.interface IS NOT NEW.interface
+            BEGIN
+                UPDATE interface_stats SET peers = peers - 1
+                WHERE interface = OLD.interface;
+                INSERT INTO interface_stats (interface, peers)
+                SELECT NEW.interface, 1 WHERE NEW.interface IS NOT NULL
+                ON CONFLICT (interface) DO UPDATE SET peers = peers + 1;
+            END
+        """
+        )
+
+    def recount(self) -> None:
+        """Recounts clients of every interface from the clients table"""
+        self.conn.execute("UPDATE interface_stats SET peers = 0")
+        self.conn.execute(
+            """
+            INSERT INTO interface_stats (interface, peers)
+            SELECT interface, COUNT(*) FROM clients
+            WHERE interface IS NOT NULL GROUP BY interface
+            ON CONFLICT (interface) DO UPDATE SET peers = excluded.peers
+        """
+        )
+
+    def add_traffic(self, totals: Dict[str, int], timestamp: int) -> None:
+        """Adds bytes transferred per interface to decayed traffic counters"""
+        stored = {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute(
+                "SELECT interface, traffic, traffic_at FROM interface_stats"
+            )
+        }
+        rows = []
+        for interface, added in totals.items():
+            traffic, since = stored.get(interface, (0.0, timestamp))
+            rows.append(
+                (interface, decay(traffic, since, timestamp) + added, timestamp)
+            )
+        self.conn.executemany(
+            """
+            INSERT INTO interface_stats (interface, traffic, traffic_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT (interface) DO UPDATE SET
+                traffic = excluded.traffic, traffic_at = excluded.traffic_at
+        """,
+            rows,
+        )
+
+    def read(self, now: int) -> Dict[str, Tuple[int, float]]:
+        """Returns client count and recent traffic decayed to now by interface"""
+        return {
+            interface: (peers, decay(traffic, since, now))
+            for interface, peers, traffic, since in self.conn.execute(
+                "SELECT interface, peers, traffic, traffic_at FROM interface_stats"
+            )
+        }
+
+
+def place(loads: List[InterfaceLoad], policy: str, count: int = 1) -> List[str]:
+    """Returns target interface of each of count new clients
+
+    Clients are placed one at a time on the interface with the lowest score,
+    which is then charged with the new peer, so bulk creation spreads evenly
+    instead of filling the least loaded interface first. A new peer is
+    charged with the average traffic of existing ones. Full interfaces are
+    skipped, fewer targets than count are returned when all are full. Ties
+    go to the earlier interface.
+    """
+    if policy not in PLACEMENT_POLICIES:
+        raise ValueError(f"Unknown placement policy: {policy}")
+
+    peers = [load.peers for load in loads]
+    traffic = [load.traffic for load in loads]
+    free = [load.free for load in loads]
+    total_peers = sum(peers)
+    peer_traffic = sum(traffic) / total_peers if total_peers else 0.0
+
+    scores = {
+        "peers": lambda i: (peers[i], i),
+        "traffic": lambda i: (traffic[i], peers[i], i),
+        "free": lambda i: (-free[i], i),
+        "first": lambda i: (i,),
+    }
+    score = scores[policy]
+
+    targets: List[str] = []
+    for _ in range(count):
+        candidates = [i for i in range(len(loads)) if free[i] > 0]
+        if not candidates:
+            break
+        best = min(candidates, key=score)
+        peers[best] += 1
+        traffic[best] += peer_traffic
+        free[best] -= 1
+        targets.append(loads[best].interface)
+    return targets
+
+
+def plan_moves(loads: List[InterfaceLoad]) -> List[Tuple[str, str, int]]:
+    """Returns (source, target, count) client moves evening out peer counts
+
+    Every interface aims at an even share of all clients, capped by what its
+    pool can hold. Counts within one of the share are left alone, so a
+    balanced host yields no moves.
+    """
+    capacity = [load.peers + load.free for load in loads]
+    share = [0.0] * len(loads)
+    remaining = float(sum(load.peers for load in loads))
+    # Small pools are filled first, the rest is shared by larger ones
+    order = sorted(range(len(loads)), key=lambda i: capacity[i])
+    for position, i in enumerate(order):
+        share[i] = min(float(capacity[i]), remaining / (len(loads) - position))
+        remaining -= share[i]
+
+    surplus = {
+        load.interface: load.peers - math.ceil(share[i])
+        for i, load in enumerate(loads)
+        if load.peers > math.ceil(share[i])
+    }
+    deficit = {
+        load.interface: math.floor(share[i]) - load.peers
+        for i, load in enumerate(loads)
+        if load.peers < math.floor(share[i])
+    }
+
+    moves: List[Tuple[str, str, int]] = []
+    for source in sorted(surplus, key=lambda name: -surplus[name]):
+        for target in sorted(deficit, key=lambda name: -deficit[name]):
+            moved = min(surplus[source], deficit[target])
+            if moved <= 0:
+                continue
+            moves.append((source, target, moved))
+            surplus[source] -= moved
+            deficit[target] -= moved
+    return moves
@@ -0,0 +1,117 @@
+import io
+import os
+import time
+from typing import Any, Optional
+
+from .options import DEFAULT_TOP
+
+# Stack depth kept per allocation, deeper frames are merged
+ALLOCATION_FRAMES = 10
+
+_active: Optional["CommandProfiler"] = None
+
+
+def default_path(command: str) -> str:
+    """Returns pstats file name of command in the working directory"""
+    return f"fastwg-{command}-{time.strftime('%Y%m%d-%H%M%S')}.pstats"
+
+
+def active() -> bool:
+    """Whether a command of this process is being profiled"""
+    return _active is not None
+
+
+class CommandProfiler:
+    """Runs one command under cProfile and optionally tracemalloc
+
+    The pstats file can be loaded with `python -m pstats` or snakeviz. The
+    summary with top functions and allocation sites is written next to it
+    with a `.txt` suffix. Only the thread that started the profiler is
+    profiled; allocations are traced in all threads.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        path: Optional[str] = None,
+        memory: bool = False,
+        top: int = DEFAULT_TOP,
+    ) -> None:
+        self.command = command
+        self.path = path or default_path(command)
+        self.memory = memory
+        self.top = top
+        self._profile: Any = None
+        self._start = 0.0
+
+    def start(self) -> None:
+        """Starts collecting"""
+        global _active
+        # Imported here, profiling is rare and cProfile is not free to import
+        import cProfile
+
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start(ALLOCATION_FRAMES)
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        _active = self
+        self._profile.enable()
+
+    def stop(self) -> str:
+        """Stops collecting, writes pstats and summary files, returns summary"""
+        global _active
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start
+        _active = None
+
+        allocations = self._allocation_summary() if self.memory else ""
+        self._profile.dump_stats(self.path)
+
+        summary = (
+            f"Profile of `{self.command}`: {elapsed:.3f} s wall time\n"
+            f"pstats: {os.path.abspath(self.path)}\n\n"
+            + self._function_summary()
+            + allocations
+        )
+        with open(self.path + ".txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        return summary
+
+    def _function_summary(self) -> str:
+        """Formats top functions by cumulative and own time"""
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs()
+        stream.write(f"Top {self.top} functions by cumulative time\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+        stream.write(f"Top {self.top} functions by own time\n")
+        stats.sort_stats("tottime").print_stats(self.top)
+        return stream.getvalue()
+
+    def _allocation_summary(self) -> str:
+        """Formats peak traced memory and top allocation sites, stops tracing"""
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        lines = [
+            f"Allocations: {current / 1024:.0f} KiB live at exit, "
+            f"{peak / 1024:.0f} KiB peak",
+            f"Top {self.top} allocation sites by live size",
+        ]
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,165 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+# Span attributes are cut to this width in text output
+LABEL_WIDTH = 60
+
+
+class Span:
+    """Timed block with nested child spans"""
+
+    __slots__ = ("name", "attrs", "start", "duration", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.children: List["Span"] = []
+
+    def label(self) -> str:
+        """Returns name with attributes shortened to one line"""
+        if not self.attrs:
+            return self.name
+        text = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        text = " ".join(text.split())
+        if len(text) > LABEL_WIDTH:
+            text = text[: LABEL_WIDTH - 3] + "..."
+        return f"{self.name} {text}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns span tree as JSON-serializable dict"""
+        return {
+            "name": self.name,
+            "attrs": {key: str(value) for key, value in self.attrs.items()},
+            "duration_ms": round(self.duration * 1000, 3),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Tracer:
+    """Collects spans of one command into a tree
+
+    Every thread keeps its own stack of open spans. Spans opened on a
+    thread without open spans, such as workers of a thread pool, are
+    attached to the root.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.root = Span(name, {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """Times enclosed block as child of the innermost open span"""
+        stack: Optional[List[Span]] = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else self.root
+        span = Span(name, attrs)
+        with self._lock:
+            parent.children.append(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            stack.pop()
+
+    def finish(self) -> Span:
+        """Closes root span and returns it"""
+        self.root.duration = time.perf_counter() - self.root.start
+        return self.root
+
+    def render_text(self) -> str:
+        """Formats span tree with durations, one span per line"""
+        lines = [f"{self.root.duration * 1000:10.3f} ms  {self.root.label()}"]
+        self._render_children(self.root, "", lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_children(self, span: Span, prefix: str, lines: List[str]) -> None:
+        """Appends subtree lines, folding identical leaf siblings into one
+
+        A loop of the same query is shown once with its call count and
+        total duration instead of flooding the terminal.
+        """
+        groups: Dict[str, List[Span]] = {}
+        for child in span.children:
+            # Spans with children are kept apart to show their subtrees
+            key = str(id(child)) if child.children else child.label()
+            groups.setdefault(key, []).append(child)
+
+        items = list(groups.values())
+        for index, group in enumerate(items):
+            last = index == len(items) - 1
+            total = sum(child.duration for child in group)
+            label = group[0].label()
+            if len(group) > 1:
+                label = f"{label} (x{len(group)})"
+            branch = "└─ " if last else "├─ "
+            lines.append(f"{total * 1000:10.3f} ms  {prefix}{branch}{label}")
+            self._render_children(group[0], prefix + ("   " if last else "│  "), lines)
+
+    def render_json(self) -> str:
+        """Formats span tree as JSON"""
+        return json.dumps(self.root.to_dict(), indent=2, ensure_ascii=False) + "\n"
+
+    def render(self, trace_format: str) -> str:
+        """Formats span tree as text or json"""
+        return self.render_json() if trace_format == "json" else self.render_text()
+
+
+_tracer: Optional[Tracer] = None
+
+# Returned by span() while tracing is off, entering it costs one call
+_DISABLED: ContextManager[None] = nullcontext()
+
+
+def env_format() -> Optional[str]:
+    """Returns trace format requested by FASTWG_TRACE, None when unset"""
+    value = os.environ.get("FASTWG_TRACE", "").strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return None
+    return "json" if value == "json" else "text"
+
+
+def start(name: str) -> Tracer:
+    """Enables tracing of this process under root span name"""
+    global _tracer
+    _tracer = Tracer(name)
+    return _tracer
+
+
+def stop() -> Optional[Tracer]:
+    """Disables tracing and returns finished tracer"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer:
+        tracer.finish()
+    return tracer
+
+
+def enabled() -> bool:
+    """Whether spans are collected"""
+    return _tracer is not None
+
+
+def span(name: str, **attrs: Any) -> ContextManager[Any]:
+    """Times enclosed block when tracing is enabled"""
+    if _tracer is None:
+        return _DISABLED
+    return _tracer.span(name, **attrs)
+
+
+def run(args: List[str], **kwargs: Any) -> "subprocess.CompletedProcess[Any]":
+    """subprocess.run traced as a span named after the command"""
+    if _tracer is None:
+        return subprocess.run(args, **kwargs)
+    with _tracer.span("subprocess", command=" ".join(args)):
+        return subprocess.run(args, **kwargs)
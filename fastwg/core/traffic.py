@@ -0,0 +1,117 @@
+import sqlite3
+from typing import Dict, List, Tuple
+
+HOUR = 3600
+DAY = 86400
+
+# Bucket size in seconds -> how long buckets are kept. Hours are the finest
+# resolution, as `top` and placement read nothing shorter
+RETENTION = {
+    HOUR: 30 * DAY,
+    DAY: 365 * DAY,
+}
+
+# Rows kept per resolution at most, caps disk use of large fleets
+MAX_ROWS = 1_000_000
+
+# Public key -> (rx_bytes, tx_bytes) transferred since previous sample
+TrafficDeltas = Dict[str, Tuple[int, int]]
+
+
+def counter_delta(current: int, previous: int) -> int:
+    """Returns counter increase, treating a decrease as a counter reset"""
+    return current - previous if current >= previous else current
+
+
+class TrafficStore:
+    """Per-peer traffic time series stored in SQLite
+
+    Every sample is added to 1-hour and 1-day buckets at once, so rollups
+    never need a separate pass. Buckets older than their retention are
+    pruned, which bounds the table to a fixed number of rows per peer, and
+    the oldest buckets beyond max_rows are dropped as well.
+    Like IPAllocator, all methods work on the caller's connection and never
+    commit.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    @classmethod
+    def create_table(cls, conn: sqlite3.Connection) -> None:
+        """Creates traffic table in database"""
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS traffic (
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                public_key TEXT NOT NULL,
+                rx_bytes INTEGER NOT NULL DEFAULT 0,
+                tx_bytes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, bucket, public_key)
+            ) WITHOUT ROWID
+        """
+        )
+
+    def record(self, deltas: TrafficDeltas, timestamp: int) -> None:
+        """Adds traffic deltas sampled at timestamp to all rollups"""
+        rows = [
+            (resolution, timestamp - timestamp % resolution, key, rx, tx)
+            for resolution in RETENTION
+            for key, (rx, tx) in deltas.items()
+            if rx or tx
+        ]
+        self.conn.executemany(
+            """
+            INSERT INTO traffic (resolution, bucket, public_key, rx_bytes, tx_bytes)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (resolution, bucket, public_key) DO UPDATE SET
+                rx_bytes = rx_bytes + excluded.rx_bytes,
+                tx_bytes = tx_bytes + excluded.tx_bytes
+        """,
+            rows,
+        )
+
+    def prune(self, now: int, max_rows: int = MAX_ROWS) -> None:
+        """Drops buckets older than their retention or beyond max_rows"""
+        self.conn.executemany(
+            "DELETE FROM traffic WHERE resolution = ? AND bucket < ?",
+            ((resolution, now - kept) for resolution, kept in RETENTION.items()),
+        )
+        for resolution in RETENTION:
+            # Newest bucket not fitting in max_rows, whole buckets are dropped
+            row = self.conn.execute(
+                """
+                SELECT bucket FROM traffic WHERE resolution = ?
+                ORDER BY bucket DESC LIMIT 1 OFFSET ?
+            """,
+                (resolution, max_rows),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "DELETE FROM traffic WHERE resolution = ? AND bucket <= ?",
+                    (resolution, row[0]),
+                )
+
+    def top(self, since: int, now: int, limit: int) -> List[Tuple[str, int, int]]:
+        """Returns peers with most traffic since timestamp as (key, rx, tx)
+
+        Whole days are read from daily buckets and the part of the range
+        before the first whole day from hourly ones, so a peer contributes
+        at most 23 hourly rows plus one row per day.
+        """
+        since -= since % HOUR
+        first_day = since + (-since % DAY)
+        cursor = self.conn.execute(
+            """
+            SELECT public_key, SUM(rx_bytes) AS rx, SUM(tx_bytes) AS tx
+            FROM traffic
+            WHERE (resolution = ? AND bucket >= ? AND bucket < ?)
+               OR (resolution = ? AND bucket >= ? AND bucket <= ?)
+            GROUP BY public_key
+            ORDER BY rx + tx DESC
+            LIMIT ?
+        """,
+            (HOUR, since, min(first_day, now + 1), DAY, first_day, now, limit),
+        )
+        return [(row[0], row[1], row[2]) for row in cursor]
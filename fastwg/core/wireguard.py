@@ -1,122 +1,211 @@
-import base64
+import hashlib
 import ipaddress
 import os
-import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import x25519
+from ..models import Client, ConfigFingerprint, Server
+from . import tracing
+from .database import CLIENT_COLUMNS, Database
+from .delta import PeerDelta, PeerSpec
+from .index import ClientIndex
+from .keypool import Keypair, derive_public_key, generate_keypair, generate_keypairs
+from .live import LiveState
+from .options import DEFAULT_POLICY
+from .placement import InterfaceLoad, place, plan_moves
+from .writer import AtomicWriter
 
-from ..models import Client, Server
-from .database import Database
+T = TypeVar("T")
 
 
 class WireGuardManager:
-    """Main class for WireGuard server management"""
+    """Main class for WireGuard server management
+
+    The database is opened and directories are created on first use, so
+    commands that need neither start fast.
+    """
 
     def __init__(
         self, config_dir: str = "/etc/wireguard", keys_dir: str = "./wireguard/keys"
     ):
         self.config_dir = config_dir
         self.keys_dir = keys_dir
-        self.db = Database()
+        self._db: Optional[Database] = None
+        self._dirs_ready = False
+        # Keypairs kept pre-generated in the pool, 0 disables background refill
+        self.keypool_size = int(os.environ.get("FASTWG_KEYPOOL_SIZE", "0"))
+        self._keypool_refill: Optional[threading.Thread] = None
+        # Messages of interface workers, printed by the thread that started them
+        self._output = threading.local()
+        # Policy picking the interface of new clients, see PLACEMENT_POLICIES
+        self.placement = os.environ.get("FASTWG_PLACEMENT", DEFAULT_POLICY)
+        self._index: Optional[ClientIndex] = None
+        self._index_version: Optional[int] = None
+
+    @property
+    def db(self) -> Database:
+        """Database, opened on first access"""
+        if self._db is None:
+            self._db = Database()
+        return self._db
+
+    @db.setter
+    def db(self, db: Database) -> None:
+        self._db = db
+
+    def _ensure_dirs(self) -> None:
+        """Creates config and key directories before first write"""
+        if self._dirs_ready:
+            return
 
         try:
             os.makedirs(self.config_dir, exist_ok=True)
             os.makedirs(self.keys_dir, exist_ok=True)
             os.makedirs("./wireguard/configs", exist_ok=True)
         except PermissionError:
-            import tempfile
-
             temp_dir = tempfile.mkdtemp()
             self.config_dir = temp_dir
             self.keys_dir = os.path.join(temp_dir, "keys")
             os.makedirs(self.keys_dir, exist_ok=True)
             os.makedirs("./wireguard/configs", exist_ok=True)
+        self._dirs_ready = True
 
     def check_root_privileges(self) -> bool:
         """Checks for root privileges"""
         return os.geteuid() == 0
 
-    def _find_client_by_ip_and_key(
-        self, ip_address: str, public_key: str
-    ) -> Optional[Client]:
-        """Finds client by IP address and public key"""
-        all_clients = self.db.get_all_clients()
-        for client in all_clients:
-            if client.ip_address == ip_address or client.public_key == public_key:
-                return client
-        return None
+    def scan_existing_configs(self, force: bool = False) -> List[Dict]:
+        """Scans existing WireGuard configurations
+
+        Files are read and parsed on a thread pool. Files matching the
+        size and mtime, or the content hash, recorded when they were last
+        imported are skipped unless force is set.
+        """
+        if not os.path.exists(self.config_dir):
+            return []
+
+        fingerprints = {} if force else self.db.get_config_fingerprints()
+
+        candidates = []
+        for entry in os.scandir(self.config_dir):
+            if not entry.name.endswith(".conf") or not entry.is_file():
+                continue
+
+            known = fingerprints.get(entry.path)
+            if known:
+                stat = entry.stat()
+                if known.mtime_ns == stat.st_mtime_ns and known.size == stat.st_size:
+                    continue
+            candidates.append(entry.path)
+
+        if not candidates:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as pool:
+            configs = pool.map(self._read_config_file, candidates)
 
-    def scan_existing_configs(self) -> List[Dict]:
-        """Scans existing WireGuard configurations"""
         existing_configs = []
+        for config in configs:
+            if config is None:
+                continue
 
-        if os.path.exists(self.config_dir):
-            for filename in os.listdir(self.config_dir):
-                if filename.endswith(".conf"):
-                    config_path = os.path.join(self.config_dir, filename)
-                    try:
-                        with open(config_path, "r") as f:
-                            content = f.read()
-                            existing_configs.append(
-                                {
-                                    "path": config_path,
-                                    "content": content,
-                                    "filename": filename,
-                                }
-                            )
-                    except Exception as e:
-                        print(f"Error reading {config_path}: {e}")
-
-        return existing_configs
-
-    def import_existing_config(self, config_path: str) -> bool:
-        """Imports existing configuration"""
-        try:
-            with open(config_path, "r") as f:
-                content = f.read()
+            known = fingerprints.get(config["path"])
+            if known and known.sha256 == config["fingerprint"].sha256:
+                # Touched but unchanged, remember new mtime to skip it next time
+                self.db.save_config_fingerprint(config["fingerprint"])
+                continue
+            existing_configs.append(config)
 
-            lines = content.split("\n")
-            server_config: dict[str, str] = {}
-            clients: list[dict[str, str]] = []
+        return sorted(existing_configs, key=lambda config: config["filename"])
 
-            current_section = None
-            current_client: Optional[dict[str, str]] = None
+    def _read_config_file(self, config_path: str) -> Optional[Dict]:
+        """Reads, fingerprints and parses configuration file"""
+        try:
+            with open(config_path, "rb") as f:
+                data = f.read()
+                stat = os.fstat(f.fileno())
+        except Exception as e:
+            self._print(f"Error reading {config_path}: {e}")
+            return None
 
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+        content = data.decode("utf-8", errors="replace")
+        return {
+            "path": config_path,
+            "content": content,
+            "filename": os.path.basename(config_path),
+            "parsed": self._parse_config(content),
+            "fingerprint": ConfigFingerprint(
+                path=config_path,
+                sha256=hashlib.sha256(data).hexdigest(),
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            ),
+        }
+
+    def _parse_config(
+        self, content: str
+    ) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+        """Parses WireGuard config into interface settings and peers"""
+        server_config: dict[str, str] = {}
+        clients: list[dict[str, str]] = []
+
+        current_section = None
+        current_client: Optional[dict[str, str]] = None
+
+        for line in content.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith("[Interface]"):
+                current_section = "interface"
+                current_client = None
+            elif line.startswith("[Peer]"):
+                current_section = "peer"
+                current_client = {}
+                clients.append(current_client)
+            elif line.startswith("#"):
+                if current_section == "peer" and current_client is not None:
+                    comment = line[1:].strip()
+                    if (
+                        comment
+                        and not comment.startswith(" ")
+                        and not comment.startswith("\t")
+                    ):
+                        current_client["Name"] = comment
+            elif current_section == "interface":
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    server_config[key.strip()] = value.strip()
+            elif current_section == "peer" and current_client is not None:
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    current_client[key.strip()] = value.strip()
+
+        return server_config, clients
+
+    def import_existing_config(
+        self, config_path: str, config: Optional[Dict] = None
+    ) -> bool:
+        """Imports existing configuration
 
-                if line.startswith("[Interface]"):
-                    current_section = "interface"
-                    current_client = None
-                elif line.startswith("[Peer]"):
-                    current_section = "peer"
-                    current_client = {}
-                    clients.append(current_client)
-                elif line.startswith("#"):
-                    if current_section == "peer" and current_client is not None:
-                        comment = line[1:].strip()
-                        if (
-                            comment
-                            and not comment.startswith(" ")
-                            and not comment.startswith("\t")
-                        ):
-                            current_client["Name"] = comment
-                elif current_section == "interface":
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        server_config[key.strip()] = value.strip()
-                elif current_section == "peer" and current_client is not None:
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        current_client[key.strip()] = value.strip()
+        config is an entry returned by scan_existing_configs; without it
+        the file is read and parsed here.
+        """
+        try:
+            if config is None:
+                config = self._read_config_file(config_path)
+                if config is None:
+                    return False
+
+            server_config, clients = config["parsed"]
 
             if not server_config:
-                print("Interface section not found in config")
+                self._print("Interface section not found in config")
                 return False
 
             private_key = server_config.get("PrivateKey", "")
@@ -136,25 +225,28 @@ class WireGuardManager:
             )
 
             if not self.db.save_server_config(server):
-                print("Error saving server configuration")
+                self._print("Error saving server configuration")
                 return False
 
+            index = ClientIndex.load(self.db)
             host_counter = 1
+            new_clients: List[Client] = []
             for client_data in clients:
                 if "PublicKey" in client_data:
                     public_key = client_data["PublicKey"]
                     allowed_ips = client_data.get("AllowedIPs", "")
                     ip_address = allowed_ips.split("/")[0] if allowed_ips else ""
 
-                    existing_client = self._find_client_by_ip_and_key(
-                        ip_address, public_key
-                    )
-                    if existing_client:
-                        print(f"Client with IP {ip_address} already exists, skipping")
+                    if index.find(ip_address, public_key):
+                        self._print(
+                            f"Client with IP {ip_address} already exists, skipping"
+                        )
                         continue
 
+                    host_counter = index.free_name("host_", host_counter)
                     client_name = f"host_{host_counter}"
                     host_counter += 1
+                    index.add(client_name, public_key, ip_address)
 
                     if "PrivateKey" not in client_data:
                         private_key = self._generate_private_key()
@@ -172,33 +264,50 @@ class WireGuardManager:
                         is_blocked=False,
                         last_seen=None,
                         config_path=None,
+                        interface=server.interface,
                     )
 
-                    self.db.add_client(client)
-                    print(f"Imported client: {client_name} (IP: {ip_address})")
+                    new_clients.append(client)
+
+            if new_clients:
+                results = self.db.add_clients(new_clients)
+                for client, added in zip(new_clients, results):
+                    if added:
+                        self._print(
+                            f"Imported client: {client.name} (IP: {client.ip_address})"
+                        )
+                    else:
+                        self._print(
+                            f"Client with IP {client.ip_address} already exists, skipping"
+                        )
 
+            self.db.save_config_fingerprint(config["fingerprint"])
             return True
         except Exception as e:
-            print(f"Error importing configuration: {e}")
+            self._print(f"Error importing configuration: {e}")
             return False
 
-    def create_client(self, name: str) -> Optional[Client]:
-        """Creates a new client"""
+    def create_client(
+        self,
+        name: str,
+        interface: Optional[str] = None,
+        placement: Optional[str] = None,
+    ) -> Optional[Client]:
+        """Creates a new client on interface, picked by placement policy by default"""
         if self.db.get_client(name):
-            print(f"Client {name} already exists")
+            self._print(f"Client {name} already exists")
             return None
 
-        server_config = self.db.get_server_config()
+        if not interface:
+            targets = self._place(1, placement)
+            interface = targets[0] if targets else None
+        server_config = self._server_config(interface)
         if not server_config:
-            print(
-                "Server configuration not found. Run fastwg scan first to import existing configurations."
-            )
             return None
 
-        private_key = self._generate_private_key()
-        public_key = self._generate_public_key(private_key)
+        private_key, public_key = self._take_keypair()
 
-        ip_address = self._get_next_ip()
+        ip_address = self._get_next_ip(server_config)
 
         config_path = self._create_client_config(
             Client(
@@ -212,11 +321,13 @@ class WireGuardManager:
                 is_blocked=False,
                 last_seen=None,
                 config_path=None,
-            )
+                interface=server_config.interface,
+            ),
+            server_config,
         )
 
         if not config_path:
-            print(f"Error creating configuration for client {name}")
+            self._print(f"Error creating configuration for client {name}")
             return None
 
         client = Client(
@@ -230,30 +341,318 @@ class WireGuardManager:
             is_blocked=False,
             last_seen=None,
             config_path=config_path,
+            interface=server_config.interface,
         )
 
         if self.db.add_client(client):
-            self._update_server_config(restart=False)
+            if self._index is not None:
+                self._index.add(client.name, client.public_key, client.ip_address)
+            self._append_server_peer(server_config, client)
+            self._apply_peer_delta(
+                server_config.interface,
+                PeerDelta(add=[self._peer_spec(client.public_key, client.ip_address)]),
+            )
             return client
         else:
-            print(f"Error creating client {name}")
+            self._print(f"Error creating client {name}")
             return None
 
+    def create_clients(
+        self,
+        names: Optional[List[str]] = None,
+        prefix: str = "client_",
+        count: int = 0,
+        workers: Optional[int] = None,
+        interface: Optional[str] = None,
+        placement: Optional[str] = None,
+    ) -> List[Client]:
+        """Creates many clients at once on interface, spread by placement by default
+
+        Takes a list of names, or count names built from prefix skipping
+        names already in use. Keys are taken from the keypair pool and the
+        rest are generated across processes, IPs are allocated in one pass
+        per interface, clients are inserted in one transaction and their
+        configs written concurrently. Server configs are regenerated once
+        per interface at the end.
+        """
+        server_config = self._server_config(interface)
+        if not server_config:
+            return []
+
+        index = self._client_index()
+        if names is None:
+            names = []
+            counter = 1
+            for _ in range(count):
+                counter = index.free_name(prefix, counter)
+                names.append(f"{prefix}{counter}")
+                counter += 1
+
+        new_names: List[str] = []
+        pending = set()
+        for name in names:
+            if name in index.names or name in pending:
+                self._print(f"Client {name} already exists")
+                continue
+            pending.add(name)
+            new_names.append(name)
+
+        if not new_names:
+            return []
+
+        servers = {server_config.interface: server_config}
+        targets = [server_config.interface] * len(new_names)
+        placed = None if interface else self._place(len(new_names), placement)
+        if placed is not None:
+            if len(placed) < len(new_names):
+                self._print(
+                    f"Not enough free IP addresses on interfaces: "
+                    f"{len(placed)} free, {len(new_names)} requested"
+                )
+                return []
+            servers = {
+                server.interface: server for server in self.db.get_server_configs()
+            }
+            targets = placed
+
+        ip_addresses: Dict[str, str] = {}
+        for target in dict.fromkeys(targets):
+            if not servers[target].external_ip:
+                self._print("Error: server external IP not set")
+                self._print("Use command: fastwg sethost <ip:port>")
+                return []
+
+            group = [
+                name
+                for name, name_target in zip(new_names, targets)
+                if name_target == target
+            ]
+            network, reserved = self._client_network(servers[target])
+            free_ips = self.db.get_free_ips(network, len(group), reserved)
+            if len(free_ips) < len(group):
+                self._print(
+                    f"Not enough free IP addresses in network: "
+                    f"{len(free_ips)} free, {len(group)} requested"
+                )
+                return []
+            ip_addresses.update(zip(group, free_ips))
+
+        keypairs = self.db.take_keypairs(len(new_names))
+        keypairs.extend(generate_keypairs(len(new_names) - len(keypairs), workers))
+        self._schedule_keypool_refill()
+
+        created_at = datetime.now()
+        clients = [
+            Client(
+                id=None,
+                name=name,
+                public_key=public_key,
+                private_key=private_key,
+                ip_address=ip_addresses[name],
+                created_at=created_at,
+                is_active=True,
+                is_blocked=False,
+                last_seen=None,
+                config_path=f"./wireguard/configs/{name}.conf",
+                interface=target,
+            )
+            for name, (private_key, public_key), target in zip(
+                new_names, keypairs, targets
+            )
+        ]
+
+        with ThreadPoolExecutor(max_workers=min(8, len(clients))) as pool:
+            config_paths = list(
+                pool.map(
+                    lambda client: self._create_client_config(
+                        client, servers[client.interface]
+                    ),
+                    clients,
+                )
+            )
+
+        written = [
+            client for client, config_path in zip(clients, config_paths) if config_path
+        ]
+        results = self.db.add_clients(written)
+
+        created = []
+        for client, added in zip(written, results):
+            if added:
+                index.add(client.name, client.public_key, client.ip_address)
+                created.append(client)
+            else:
+                self._print(f"Error creating client {client.name}")
+                self._remove_client_files(client.name)
+
+        for target in dict.fromkeys(targets):
+            peers = [client for client in created if client.interface == target]
+            if not peers:
+                continue
+            self._update_server_config(restart=False, interface=target)
+            self._apply_peer_delta(
+                target,
+                PeerDelta(
+                    add=[
+                        self._peer_spec(client.public_key, client.ip_address)
+                        for client in peers
+                    ]
+                ),
+            )
+        return created
+
+    def _interface_loads(self, servers: List[Server]) -> List[InterfaceLoad]:
+        """Returns client counts, recent traffic and free addresses of interfaces"""
+        stats = self.db.get_interface_stats(int(datetime.now().timestamp()))
+        loads = []
+        for server in servers:
+            peers, traffic = stats.get(server.interface, (0, 0.0))
+            network, reserved = self._client_network(server)
+            free = self.db.count_free_ips(network, reserved)
+            loads.append(InterfaceLoad(server.interface, peers, traffic, free))
+        return loads
+
+    def _place(
+        self, count: int, placement: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """Picks interfaces of count new clients, None when there is no choice"""
+        policy = placement or self.placement
+        servers = self.db.get_server_configs()
+        if len(servers) <= 1 or policy == "first":
+            return None
+        return place(self._interface_loads(servers), policy, count)
+
+    def _client_index(self) -> ClientIndex:
+        """Returns in-memory client index, reloaded after writes by other processes
+
+        Writes made through this manager keep the cached index up to date.
+        """
+        version = self.db.data_version()
+        if self._index is None or version != self._index_version:
+            self._index = ClientIndex.load(self.db)
+            self._index_version = version
+        return self._index
+
+    def _server_config(self, interface: Optional[str] = None) -> Optional[Server]:
+        """Gets server config of interface for new clients, reporting if missing"""
+        server_config = self.db.get_server_config(interface)
+        if not server_config:
+            if interface:
+                self._print(f"Interface {interface} is not configured")
+            else:
+                self._print(
+                    "Server configuration not found. Run fastwg scan first to import existing configurations."
+                )
+        return server_config
+
+    def _server_configs(self, interface: Optional[str] = None) -> List[Server]:
+        """Gets server configs of interface, all interfaces by default"""
+        if interface:
+            server_config = self.db.get_server_config(interface)
+            servers = [server_config] if server_config else []
+        else:
+            servers = self.db.get_server_configs()
+        if not servers:
+            if interface:
+                self._print(f"Interface {interface} is not configured")
+            else:
+                self._print("Server configuration not found")
+        return servers
+
+    def _in_worker(self, task: Callable[..., T]) -> Callable[..., T]:
+        """Wraps task of a worker thread to close its database connection"""
+
+        def run(*args, **kwargs) -> T:
+            with self.db.thread_connection():
+                return task(*args, **kwargs)
+
+        return run
+
+    def _print(self, *values: object) -> None:
+        """Prints message, or keeps it while messages are collected"""
+        messages: Optional[List[str]] = getattr(self._output, "messages", None)
+        if messages is None:
+            print(*values)
+        else:
+            messages.append(" ".join(map(str, values)))
+
+    @contextmanager
+    def collect_messages(self) -> Iterator[List[str]]:
+        """Keeps messages of this thread in the yielded list instead of printing
+
+        Used by interface workers and the daemon, so output of one caller
+        never goes through a process-wide sys.stdout replacement.
+        """
+        previous = getattr(self._output, "messages", None)
+        messages: List[str] = []
+        self._output.messages = messages
+        try:
+            yield messages
+        finally:
+            self._output.messages = previous
+
+    def _for_each_interface(
+        self, servers: List[Server], action: Callable[[Server], bool]
+    ) -> bool:
+        """Runs action for every interface concurrently, True if all succeeded
+
+        Interfaces have separate config files, pools and peers, so their
+        regeneration and `wg` calls do not depend on each other. Workers
+        return what they would print, and the calling thread prints it per
+        interface in server order instead of interleaving lines.
+        """
+        if len(servers) <= 1:
+            return all([action(server) for server in servers])
+
+        def run(server: Server) -> Tuple[bool, List[str]]:
+            with self.collect_messages() as messages:
+                return action(server), messages
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(8, len(servers))) as pool:
+            for succeeded, messages in pool.map(self._in_worker(run), servers):
+                for message in messages:
+                    self._print(message)
+                results.append(succeeded)
+        return all(results)
+
+    def count_clients(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        interface: Optional[str] = None,
+    ) -> int:
+        """Counts clients matching filters"""
+        return self.db.count_clients(
+            status=status, name_prefix=name_prefix, subnet=subnet, interface=interface
+        )
+
+    def _remove_client_files(self, name: str) -> None:
+        """Removes config and key files of client"""
+        for path in (
+            f"./wireguard/configs/{name}.conf",
+            f"./wireguard/keys/{name}_private.key",
+            f"./wireguard/keys/{name}_public.key",
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+
     def delete_client(self, name: str) -> bool:
         """Deletes a client"""
         client = self.db.get_client(name)
         if not client:
-            print(f"Client {name} not found")
+            self._print(f"Client {name} not found")
             return False
 
-        self._remove_peer_from_wg(client.public_key)
-
         if self.db.delete_client(name):
+            if self._index is not None:
+                self._index.remove(client.name, client.public_key, client.ip_address)
             config_file = f"./wireguard/configs/{name}.conf"
             if os.path.exists(config_file):
                 os.remove(config_file)
 
-            self._update_server_config()
+            self._remove_server_peer(client)
             return True
         return False
 
@@ -261,24 +660,78 @@ class WireGuardManager:
         """Blocks a client"""
         client = self.db.get_client(name)
         if not client:
-            print(f"Client {name} not found")
+            self._print(f"Client {name} not found")
             return False
 
-        self._remove_peer_from_wg(client.public_key)
+        if not self.db.update_client_status(name, is_active=False, is_blocked=True):
+            return False
 
-        return self.db.update_client_status(name, is_active=False, is_blocked=True)
+        # Peer is removed even when already blocked, so repeating the
+        # command repairs a config or interface a failed attempt left behind
+        self._remove_server_peer(client)
+        return True
 
     def enable_client(self, name: str) -> bool:
         """Unblocks a client"""
         client = self.db.get_client(name)
         if not client:
-            print(f"Client {name} not found")
+            self._print(f"Client {name} not found")
             return False
 
-        if self.db.update_client_status(name, is_active=True, is_blocked=False):
-            self._update_server_config(restart=False)
-            return True
-        return False
+        if not self.db.update_client_status(name, is_active=True, is_blocked=False):
+            return False
+
+        # Peer is added even when already enabled, see disable_client
+        server_config = self.db.get_server_config(client.interface)
+        if server_config:
+            self._append_server_peer(server_config, client)
+            self._apply_peer_delta(
+                server_config.interface,
+                PeerDelta(add=[self._peer_spec(client.public_key, client.ip_address)]),
+            )
+        return True
+
+    def sync_peers(self, interface: Optional[str] = None) -> bool:
+        """Reconciles running interface peers with database, all by default
+
+        Live state is read once, deltas of interfaces are applied
+        concurrently.
+        """
+        servers = self._server_configs(interface)
+        if not servers:
+            return False
+
+        live_state = self._read_live_state()
+        if not live_state:
+            self._print("WireGuard is not running")
+            return False
+
+        self.refresh_presence(live_state)
+
+        def sync(server_config: Server) -> bool:
+            if server_config.interface not in live_state.interfaces:
+                self._print(f"Interface {server_config.interface} is not running")
+                return False
+
+            desired = (
+                self._peer_spec(row["public_key"], row["ip_address"])
+                for row in self.db.iter_clients(
+                    status="active",
+                    columns=("public_key", "ip_address"),
+                    interface=server_config.interface,
+                )
+            )
+            delta = PeerDelta.between(
+                desired, live_state.interface_peers(server_config.interface)
+            )
+
+            self._print(
+                f"{server_config.interface}: peers to add: {len(delta.add)}, "
+                f"update: {len(delta.update)}, remove: {len(delta.remove)}"
+            )
+            return self._apply_peer_delta(server_config.interface, delta)
+
+        return self._for_each_interface(servers, sync)
 
     def get_client_config(self, name: str) -> Optional[str]:
         """Gets client configuration"""
@@ -297,91 +750,184 @@ class WireGuardManager:
                 return f.read()
         return None
 
-    def list_clients(self) -> List[Dict]:
-        """Gets list of all clients with connection information"""
-        clients = self.db.get_all_clients()
-        active_connections = self._get_active_connections()
-
-        result = []
-        for client in clients:
-            is_connected = client.public_key in active_connections
-
-            if is_connected:
-                self.db.update_client_last_seen(client.name, datetime.now())
-                client.last_seen = datetime.now()
-
-            result.append(
-                {
-                    "name": client.name,
-                    "ip_address": client.ip_address,
-                    "is_active": client.is_active,
-                    "is_blocked": client.is_blocked,
-                    "is_connected": is_connected,
-                    "last_seen": client.last_seen,
-                    "created_at": client.created_at,
-                }
+    def list_clients(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        live: bool = False,
+        order_by: str = "name",
+        descending: bool = False,
+        interface: Optional[str] = None,
+    ) -> List[Dict]:
+        """Gets list of clients with connection information"""
+        return list(
+            self.iter_client_status(
+                status=status,
+                name_prefix=name_prefix,
+                subnet=subnet,
+                limit=limit,
+                offset=offset,
+                live=live,
+                order_by=order_by,
+                descending=descending,
+                interface=interface,
             )
+        )
 
-        return result
+    def iter_client_status(
+        self,
+        status: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        subnet: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        live: bool = False,
+        order_by: str = "name",
+        descending: bool = False,
+        interface: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """Streams clients with connection information from the database cursor
+
+        Connection state comes from the presence table kept by the monitor
+        and sync, so listing only reads the database. live refreshes it
+        from the running interface first.
+        """
+        if live:
+            self.refresh_presence()
+
+        for client in self.db.iter_clients(
+            status=status,
+            name_prefix=name_prefix,
+            subnet=subnet,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+            offset=offset,
+            presence=True,
+            interface=interface,
+        ):
+            handshake_time = (
+                datetime.fromtimestamp(client["latest_handshake"])
+                if client["latest_handshake"]
+                else None
+            )
+            yield {
+                "name": client["name"],
+                "ip_address": client["ip_address"],
+                "is_active": client["is_active"],
+                "is_blocked": client["is_blocked"],
+                "is_connected": self._is_peer_connected(
+                    handshake_time is not None, handshake_time
+                ),
+                "last_seen": client["last_seen"],
+                "created_at": client["created_at"],
+                "endpoint": client["endpoint"],
+                "rx_bytes": client["rx_bytes"],
+                "tx_bytes": client["tx_bytes"],
+                "interface": client["interface"],
+            }
+
+    def refresh_presence(self, live_state: Optional[LiveState] = None) -> int:
+        """Records live peer state in presence table, returns changed peers"""
+        if live_state is None:
+            live_state = self._read_live_state()
+        if not live_state:
+            return 0
+        return self.db.record_peer_states(live_state.peers.values())
 
     def _generate_private_key(self) -> str:
         """Generates WireGuard private key in base64"""
-        private_key = x25519.X25519PrivateKey.generate()
-        private_bytes = private_key.private_bytes(
-            encoding=serialization.Encoding.Raw,
-            format=serialization.PrivateFormat.Raw,
-            encryption_algorithm=serialization.NoEncryption(),
-        )
-        return base64.b64encode(private_bytes).decode("utf-8")
+        private_key, _ = generate_keypair()
+        return private_key
 
     def _generate_public_key(self, private_key_base64: str) -> str:
         """Generates public key from private key in base64"""
-        private_key_bytes = base64.b64decode(private_key_base64)
-        private_key = x25519.X25519PrivateKey.from_private_bytes(private_key_bytes)
-        public_key = private_key.public_key()
-        public_bytes = public_key.public_bytes(
-            encoding=serialization.Encoding.Raw, format=serialization.PublicFormat.Raw
+        return derive_public_key(private_key_base64)
+
+    def _take_keypair(self) -> Keypair:
+        """Takes pre-generated keypair from pool, generating one if it is empty"""
+        keypair = self.db.take_keypair()
+        self._schedule_keypool_refill()
+        return keypair or generate_keypair()
+
+    def fill_keypool(
+        self, size: Optional[int] = None, workers: Optional[int] = None
+    ) -> int:
+        """Tops up keypair pool to size, returns number of keypairs added"""
+        size = self.keypool_size if size is None else size
+        missing = size - self.db.count_keypairs()
+        added = 0
+        while added < missing:
+            keypairs = generate_keypairs(min(missing - added, 1024), workers)
+            self.db.add_keypairs(keypairs)
+            added += len(keypairs)
+        return added
+
+    def _schedule_keypool_refill(self) -> None:
+        """Refills keypair pool in background once it drops below half"""
+        if not self.keypool_size:
+            return
+        if self._keypool_refill and self._keypool_refill.is_alive():
+            return
+        if self.db.count_keypairs() >= self.keypool_size // 2:
+            return
+
+        self._keypool_refill = threading.Thread(
+            target=self._in_worker(self.fill_keypool),
+            kwargs={"workers": 1},
+            daemon=True,
         )
-        return base64.b64encode(public_bytes).decode("utf-8")
+        self._keypool_refill.start()
 
-    def _get_next_ip(self) -> str:
-        """Gets next available IP address"""
-        server_config = self.db.get_server_config()
-        if not server_config:
-            network = ipaddress.IPv4Network("10.0.0.0/24")
-        else:
-            server_network = ipaddress.IPv4Network(server_config.address, strict=False)
-            network = ipaddress.IPv4Network(
-                f"{server_network.network_address}/{server_network.prefixlen}"
-            )
+    def _get_next_ip(self, server_config: Optional[Server] = None) -> str:
+        """Gets next available IP address in pool of interface"""
+        network, reserved = self._client_network(
+            server_config or self.db.get_server_config()
+        )
 
-        existing_ips = set()
-        for client in self.db.get_all_clients():
-            existing_ips.add(client.ip_address)
+        ip_address = self.db.get_free_ip(network, reserved)
+        if not ip_address:
+            raise Exception("No free IP addresses in network")
 
-        if server_config:
-            server_ip = server_config.address.split("/")[0]
-            existing_ips.add(server_ip)
+        return ip_address
 
-        for ip in network.hosts():
-            ip_str = str(ip)
-            if ip_str not in existing_ips:
-                return ip_str
+    def _client_network(self, server_config: Optional[Server]) -> Tuple[str, List[str]]:
+        """Returns client network and addresses reserved in it"""
+        if not server_config:
+            return str(ipaddress.IPv4Network("10.0.0.0/24")), []
 
-        raise Exception("No free IP addresses in network")
+        network = ipaddress.IPv4Network(server_config.address, strict=False)
+        return str(network), [server_config.address.split("/")[0]]
 
-    def _update_server_config(self, restart: bool = False) -> bool:
-        """Updates server configuration"""
-        server_config = self.db.get_server_config()
+    def _update_server_config(
+        self, restart: bool = False, live: bool = True, interface: Optional[str] = None
+    ) -> bool:
+        """Updates server configuration of interface, the first one by default
+
+        With restart the new config is applied to the running interface:
+        live (via `wg syncconf`) when only peers changed, with a full
+        wg-quick restart when interface-level settings changed.
+
+        Peer sections are streamed to a temp file which replaces the config
+        atomically. When the content matches the previous write the file
+        is left untouched and the live reload is skipped; the interface is
+        only started if it is not running.
+        """
+        server_config = self.db.get_server_config(interface)
         if not server_config:
-            print("Server configuration not found")
+            self._print("Server configuration not found")
             return False
 
-        clients = [
-            c for c in self.db.get_all_clients() if c.is_active and not c.is_blocked
-        ]
+        clients = self.db.iter_clients(
+            status="active",
+            columns=("name", "public_key", "ip_address"),
+            interface=server_config.interface,
+        )
 
-        config_content = f"""[Interface]
+        interface_content = f"""[Interface]
 PrivateKey = {server_config.private_key}
 Address = {server_config.address}
 ListenPort = {server_config.port}
@@ -389,55 +935,161 @@ MTU = {server_config.mtu}
 
 """
 
-        for client in clients:
-            config_content += f"""[Peer]
-# {client.name}
-PublicKey = {client.public_key}
-AllowedIPs = {client.ip_address}/32
+        self._ensure_dirs()
+        config_path = os.path.join(self.config_dir, f"{server_config.interface}.conf")
 
-"""
+        with AtomicWriter(config_path) as writer:
+            with tracing.span("write_config", path=config_path):
+                writer.write(interface_content)
+                for client in clients:
+                    writer.write(
+                        self._peer_section(
+                            client["name"], client["public_key"], client["ip_address"]
+                        )
+                    )
 
-        config_path = os.path.join(self.config_dir, f"{server_config.interface}.conf")
-        with open(config_path, "w") as f:
-            f.write(config_content)
+            digest = writer.hexdigest()
+            if self._config_unchanged(config_path, digest):
+                if restart and not (live and self._is_running(server_config.interface)):
+                    return self._restart_wireguard(server_config.interface)
+                return True
+
+            previous_interface = self._read_interface_section(config_path)
+            with tracing.span("commit_config", path=config_path):
+                stat = writer.commit()
 
-        os.chmod(config_path, 0o600)
+        self.db.save_config_fingerprint(
+            ConfigFingerprint(
+                path=config_path,
+                sha256=digest,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+        )
 
         if restart:
-            if not self._restart_wireguard(server_config.interface):
-                print("✗ Error restarting WireGuard server")
+            interface_changed = previous_interface != self._interface_section(
+                interface_content
+            )
+            if live and not interface_changed:
+                applied = self._apply_wireguard_live(
+                    server_config.interface, config_path
+                )
+            else:
+                applied = self._restart_wireguard(server_config.interface)
+
+            if not applied:
+                self._print("✗ Error restarting WireGuard server")
                 return False
         return True
 
-    def _create_client_config(self, client: Client) -> str:
+    def _interface_section(self, content: str) -> str:
+        """Returns [Interface] section of config content"""
+        return content.split("[Peer]", 1)[0].strip()
+
+    def _read_interface_section(self, config_path: str) -> Optional[str]:
+        """Reads [Interface] section of existing config file"""
+        lines = []
+        try:
+            with open(config_path, "r") as f:
+                for line in f:
+                    if line.startswith("[Peer]"):
+                        break
+                    lines.append(line)
+        except OSError:
+            return None
+        return self._interface_section("".join(lines))
+
+    def _is_running(self, interface: str) -> bool:
+        """Checks if interface is up"""
+        live_state = self._read_live_state()
+        return bool(live_state and interface in live_state.interfaces)
+
+    def _config_unchanged(self, config_path: str, digest: str) -> bool:
+        """Checks if config file still holds content with given hash"""
+        fingerprint = self.db.get_config_fingerprint(config_path)
+        if not fingerprint or fingerprint.sha256 != digest:
+            return False
+
+        try:
+            stat = os.stat(config_path)
+        except OSError:
+            return False
+        # File edited or appended to outside of the last write
+        return (
+            stat.st_mtime_ns == fingerprint.mtime_ns
+            and stat.st_size == fingerprint.size
+        )
+
+    def _apply_wireguard_live(self, interface: str, config_path: str) -> bool:
+        """Applies peer changes to running interface without dropping sessions
+
+        Falls back to a full restart when the interface is not running or
+        the live update fails.
+        """
+        try:
+            live_state = LiveState.read()
+            if not live_state or interface not in live_state.interfaces:
+                return self._restart_wireguard(interface)
+
+            result_strip = tracing.run(
+                ["wg-quick", "strip", config_path], capture_output=True, text=True
+            )
+            if result_strip.returncode != 0:
+                self._print(f"Warning when stripping config: {result_strip.stderr}")
+                return self._restart_wireguard(interface)
+
+            # Stripped config holds the private key, so it is piped instead
+            # of being written to a temp file
+            result_sync = tracing.run(
+                ["wg", "syncconf", interface, "/dev/stdin"],
+                input=result_strip.stdout,
+                capture_output=True,
+                text=True,
+            )
+
+            if result_sync.returncode == 0:
+                return True
+
+            self._print(f"Warning when syncing interface: {result_sync.stderr}")
+            return self._restart_wireguard(interface)
+        except Exception as e:
+            self._print(f"Error applying WireGuard config: {e}")
+            return False
+
+    def _create_client_config(
+        self, client: Client, server_config: Optional[Server] = None
+    ) -> str:
         """Creates client configuration file and returns file path"""
-        server_config = self.db.get_server_config()
+        server_config = server_config or self.db.get_server_config(client.interface)
         if not server_config:
-            print("Server configuration not found")
+            self._print("Server configuration not found")
             return ""
 
         if not server_config.external_ip:
-            print("Error: server external IP not set")
-            print("Use command: fastwg sethost <ip:port>")
+            self._print("Error: server external IP not set")
+            self._print("Use command: fastwg sethost <ip:port>")
             return ""
 
         server_ip = server_config.external_ip
 
-        private_key_file = f"./wireguard/keys/{client.name}_private.key"
-        with open(private_key_file, "w") as f:
-            f.write(client.private_key)
-        os.chmod(private_key_file, 0o600)
+        self._ensure_dirs()
+        with tracing.span("write_client_files", client=client.name):
+            private_key_file = f"./wireguard/keys/{client.name}_private.key"
+            with open(private_key_file, "w") as f:
+                f.write(client.private_key)
+            os.chmod(private_key_file, 0o600)
 
-        public_key_file = f"./wireguard/keys/{client.name}_public.key"
-        with open(public_key_file, "w") as f:
-            f.write(client.public_key)
-        os.chmod(public_key_file, 0o644)
+            public_key_file = f"./wireguard/keys/{client.name}_public.key"
+            with open(public_key_file, "w") as f:
+                f.write(client.public_key)
+            os.chmod(public_key_file, 0o644)
 
-        if not server_config.public_key:
-            print("Error: server public key not found")
-            return ""
+            if not server_config.public_key:
+                self._print("Error: server public key not found")
+                return ""
 
-        config_content = f"""[Interface]
+            config_content = f"""[Interface]
 PrivateKey = {client.private_key}
 Address = {client.ip_address}/24
 DNS = {server_config.dns}
@@ -449,120 +1101,156 @@ AllowedIPs = 0.0.0.0/0
 PersistentKeepalive = 15
 """
 
-        config_file = f"./wireguard/configs/{client.name}.conf"
-        with open(config_file, "w") as f:
-            f.write(config_content)
+            config_file = f"./wireguard/configs/{client.name}.conf"
+            with open(config_file, "w") as f:
+                f.write(config_content)
 
-        os.chmod(config_file, 0o600)
+            os.chmod(config_file, 0o600)
 
         return config_file
 
-    def _remove_peer_from_wg(self, public_key: str):
-        """Removes peer from WireGuard interface"""
-        try:
-            result = subprocess.run(["wg", "show"], capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.split("\n")
-                current_interface = None
-
-                for line in lines:
-                    if line.startswith("interface:"):
-                        current_interface = line.split(":")[1].strip()
-                    elif line.startswith("peer:") and public_key in line:
-                        if current_interface:
-                            subprocess.run(
-                                [
-                                    "wg",
-                                    "set",
-                                    current_interface,
-                                    "peer",
-                                    public_key,
-                                    "remove",
-                                ]
-                            )
-                            break
-        except Exception as e:
-            print(f"Error removing peer: {e}")
-
-    def _get_active_connections(self) -> set:
-        """Gets list of active connections"""
-        active_peers = set()
-        try:
-            result = subprocess.run(["wg", "show"], capture_output=True, text=True)
-            if result.returncode == 0:
-                active_peers = self._parse_wg_show_output(result.stdout)
-        except Exception as e:
-            print(f"Error getting active connections: {e}")
-
-        return active_peers
-
-    def _parse_wg_show_output(self, output: str) -> set:
-        """Parses wg show output and returns active connections"""
-        import re
-        from datetime import datetime, timedelta
-
-        active_peers = set()
-        lines = output.split("\n")
-
-        current_peer = None
-        has_handshake = False
-        handshake_time = None
-
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith("peer:"):
-                if current_peer and self._is_peer_connected(
-                    has_handshake, handshake_time
-                ):
-                    active_peers.add(current_peer)
-
-                current_peer = line.split(":")[1].strip()
-                has_handshake = False
-                handshake_time = None
-
-            elif line.startswith("latest handshake:") and current_peer:
-                has_handshake = True
-                time_str = line.split(":", 1)[1].strip()
-                handshake_time = self._parse_handshake_time(time_str)
+    def _peer_spec(self, public_key: str, ip_address: str) -> PeerSpec:
+        """Returns desired server-side peer state of client"""
+        return PeerSpec(public_key, f"{ip_address}/32")
 
-        if current_peer and self._is_peer_connected(has_handshake, handshake_time):
-            active_peers.add(current_peer)
+    def _peer_section(self, name: str, public_key: str, ip_address: str) -> str:
+        """Returns server config [Peer] section of client"""
+        return f"""[Peer]
+# {name}
+PublicKey = {public_key}
+AllowedIPs = {ip_address}/32
 
-        return active_peers
+"""
 
-    def _parse_handshake_time(self, time_str: str) -> datetime:
-        """Parses handshake time string to datetime"""
-        import re
-        from datetime import datetime, timedelta
+    def _append_server_peer(self, server_config: Server, client: Client) -> None:
+        """Appends client peer to server config without regenerating it"""
+        self._edit_server_peers(server_config, add=client)
 
-        time_str = time_str.replace(" ago", "")
+    def _remove_server_peer(self, client: Client) -> None:
+        """Removes client peer from running interface and server config"""
+        server_config = self.db.get_server_config(client.interface)
+        if not server_config:
+            return
 
-        now = datetime.now()
+        self._apply_peer_delta(
+            server_config.interface, PeerDelta(remove=[client.public_key])
+        )
+        self._edit_server_peers(server_config, remove=client.public_key)
 
-        total_seconds = 0
+    def _edit_server_peers(
+        self,
+        server_config: Server,
+        add: Optional[Client] = None,
+        remove: Optional[str] = None,
+    ) -> None:
+        """Copies server config adding or dropping one peer section
+
+        The existing file is streamed through AtomicWriter instead of being
+        regenerated from the database, so a single peer change reads no
+        clients, and the config is replaced atomically with its fingerprint
+        kept current. Sections of an added peer already in the file are
+        dropped, so it never appears twice. A missing config is generated
+        from the database.
+        """
+        if add:
+            remove = add.public_key
+        self._ensure_dirs()
+        config_path = os.path.join(self.config_dir, f"{server_config.interface}.conf")
+        if not os.path.exists(config_path):
+            self._update_server_config(restart=False, interface=server_config.interface)
+            return
+
+        with AtomicWriter(config_path) as writer:
+            with tracing.span("write_config", path=config_path):
+                removed = False
+                last_line = ""
+                with open(config_path, encoding="utf-8") as f:
+                    for section in self._config_sections(f):
+                        if remove and self._is_peer_section(section, remove):
+                            removed = True
+                            continue
+                        writer.write("".join(section))
+                        last_line = section[-1]
+
+                if add:
+                    if last_line and last_line != "\n":
+                        writer.write("\n" if last_line.endswith("\n") else "\n\n")
+                    writer.write(
+                        self._peer_section(add.name, add.public_key, add.ip_address)
+                    )
+                elif not removed:
+                    return
+
+            digest = writer.hexdigest()
+            if self._config_unchanged(config_path, digest):
+                return
+            with tracing.span("commit_config", path=config_path):
+                stat = writer.commit()
+
+        self.db.save_config_fingerprint(
+            ConfigFingerprint(
+                path=config_path,
+                sha256=digest,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+        )
 
-        if "day" in time_str:
-            days_match = re.search(r"(\d+)\s+days?", time_str)
-            if days_match:
-                total_seconds += int(days_match.group(1)) * 24 * 3600
+    def _config_sections(self, lines: Iterator[str]) -> Iterator[List[str]]:
+        """Yields config lines grouped into sections, each from its header"""
+        section: List[str] = []
+        for line in lines:
+            if line.startswith("[") and section:
+                yield section
+                section = []
+            section.append(line)
+        if section:
+            yield section
+
+    def _is_peer_section(self, section: List[str], public_key: str) -> bool:
+        """Checks if config section is the [Peer] of given public key"""
+        if section[0].strip() != "[Peer]":
+            return False
+        for line in section[1:]:
+            name, _, value = line.partition("=")
+            if name.strip() == "PublicKey":
+                return value.strip() == public_key
+        return False
 
-        if "hour" in time_str:
-            hours_match = re.search(r"(\d+)\s+hours?", time_str)
-            if hours_match:
-                total_seconds += int(hours_match.group(1)) * 3600
+    def _apply_peer_delta(self, interface: str, delta: PeerDelta) -> bool:
+        """Applies peer delta to running interface with batched `wg set`"""
+        try:
+            for command in delta.wg_set_commands(interface):
+                result = tracing.run(command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    # Interface is not running, config file is applied on start
+                    if "No such device" not in result.stderr:
+                        self._print(f"Warning when updating peers: {result.stderr}")
+                    return False
+            return True
+        except Exception as e:
+            self._print(f"Error updating peers: {e}")
+            return False
 
-        if "minute" in time_str:
-            minutes_match = re.search(r"(\d+)\s+minutes?", time_str)
-            if minutes_match:
-                total_seconds += int(minutes_match.group(1)) * 60
+    def _read_live_state(self) -> Optional[LiveState]:
+        """Reads live WireGuard state, None if unavailable"""
+        try:
+            return LiveState.read()
+        except Exception as e:
+            self._print(f"Error getting active connections: {e}")
+            return None
 
-        if "second" in time_str:
-            seconds_match = re.search(r"(\d+)\s+seconds?", time_str)
-            if seconds_match:
-                total_seconds += int(seconds_match.group(1))
+    def _get_active_connections(self) -> set:
+        """Gets list of active connections"""
+        live_state = self._read_live_state()
+        if not live_state:
+            return set()
 
-        return now - timedelta(seconds=total_seconds)
+        return {
+            peer.public_key
+            for peer in live_state.peers.values()
+            if self._is_peer_connected(peer.latest_handshake > 0, peer.handshake_time)
+        }
 
     def _is_peer_connected(
         self, has_handshake: bool, handshake_time: Optional[datetime]
@@ -580,63 +1268,66 @@ PersistentKeepalive = 15
 
         return True
 
-    def start_server(self, interface: str = None) -> bool:
-        """Starts WireGuard server"""
+    def start_server(self, interface: Optional[str] = None) -> bool:
+        """Starts WireGuard server, all interfaces by default"""
         try:
             if not interface:
-                server_config = self.db.get_server_config()
-                if not server_config:
-                    print("Server configuration not found")
+                servers = self._server_configs()
+                if not servers:
                     return False
-                interface = server_config.interface
+                return self._for_each_interface(
+                    servers, lambda server: self.start_server(server.interface)
+                )
 
-            result = subprocess.run(
+            result = tracing.run(
                 ["wg-quick", "up", interface], capture_output=True, text=True
             )
             if result.returncode == 0:
-                print(f"✓ WireGuard server {interface} started")
+                self._print(f"✓ WireGuard server {interface} started")
                 return True
             else:
-                print(f"✗ Error starting WireGuard server: {result.stderr}")
+                self._print(f"✗ Error starting WireGuard server: {result.stderr}")
                 return False
         except Exception as e:
-            print(f"Error starting WireGuard: {e}")
+            self._print(f"Error starting WireGuard: {e}")
             return False
 
-    def stop_server(self, interface: str = None) -> bool:
-        """Stops WireGuard server"""
+    def stop_server(self, interface: Optional[str] = None) -> bool:
+        """Stops WireGuard server, all interfaces by default"""
         try:
             if not interface:
-                server_config = self.db.get_server_config()
-                if not server_config:
-                    print("Server configuration not found")
+                servers = self._server_configs()
+                if not servers:
                     return False
-                interface = server_config.interface
+                return self._for_each_interface(
+                    servers, lambda server: self.stop_server(server.interface)
+                )
 
-            result = subprocess.run(
+            result = tracing.run(
                 ["wg-quick", "down", interface], capture_output=True, text=True
             )
             if result.returncode == 0:
-                print(f"✓ WireGuard server {interface} stopped")
+                self._print(f"✓ WireGuard server {interface} stopped")
                 return True
             else:
-                print(f"✗ Error stopping WireGuard server: {result.stderr}")
+                self._print(f"✗ Error stopping WireGuard server: {result.stderr}")
                 return False
         except Exception as e:
-            print(f"Error stopping WireGuard: {e}")
+            self._print(f"Error stopping WireGuard: {e}")
             return False
 
-    def restart_server(self, interface: str = None) -> bool:
-        """Restarts WireGuard server"""
+    def restart_server(self, interface: Optional[str] = None) -> bool:
+        """Restarts WireGuard server, all interfaces by default"""
         try:
             if not interface:
-                server_config = self.db.get_server_config()
-                if not server_config:
-                    print("Server configuration not found")
+                servers = self._server_configs()
+                if not servers:
                     return False
-                interface = server_config.interface
+                return self._for_each_interface(
+                    servers, lambda server: self.restart_server(server.interface)
+                )
 
-            print(f"Restarting WireGuard server {interface}...")
+            self._print(f"Restarting WireGuard server {interface}...")
 
             if not self.stop_server(interface):
                 return False
@@ -648,30 +1339,135 @@ PersistentKeepalive = 15
             if not self.start_server(interface):
                 return False
 
-            print(f"✓ WireGuard server {interface} restarted")
+            self._print(f"✓ WireGuard server {interface} restarted")
             return True
         except Exception as e:
-            print(f"Error restarting WireGuard: {e}")
+            self._print(f"Error restarting WireGuard: {e}")
             return False
 
-    def reload_config(self) -> bool:
-        """Reloads server configuration with restart"""
+    def reload_config(self, live: bool = True, interface: Optional[str] = None) -> bool:
+        """Reloads server configuration, live when possible, all interfaces by default
+
+        Configs of interfaces are regenerated and applied concurrently.
+        """
         try:
-            server_config = self.db.get_server_config()
-            if not server_config:
-                print("Server configuration not found")
+            servers = self._server_configs(interface)
+            if not servers:
                 return False
 
-            if self._update_server_config(restart=True):
-                print("✓ Configuration reloaded successfully")
+            if self._for_each_interface(
+                servers,
+                lambda server: self._update_server_config(
+                    restart=True, live=live, interface=server.interface
+                ),
+            ):
+                self._print("✓ Configuration reloaded successfully")
                 return True
             else:
-                print("✗ Configuration reload failed")
+                self._print("✗ Configuration reload failed")
                 return False
         except Exception as e:
-            print(f"Error reloading configuration: {e}")
+            self._print(f"Error reloading configuration: {e}")
             return False
 
+    def rebalance(
+        self, batch_size: int = 100, live: bool = True, dry_run: bool = False
+    ) -> bool:
+        """Moves clients between interfaces until their client counts are even
+
+        Clients seen longest ago move first. Each batch is moved in one
+        transaction with new addresses from the pool of its target interface
+        and rewritten client configs, then both server configs are applied,
+        so an interrupted run leaves every interface consistent. Moved
+        clients cannot connect until they get their new config.
+        """
+        servers = self._server_configs()
+        if not servers:
+            return False
+
+        loads = self._interface_loads(servers)
+        moves = plan_moves(loads)
+        if not moves:
+            self._print("Interfaces are balanced")
+            return True
+
+        for source, target, count in moves:
+            self._print(f"{source} -> {target}: {count} clients")
+        if dry_run:
+            return True
+
+        by_interface = {server.interface: server for server in servers}
+        # Free addresses counted once, then kept up to date as batches move
+        free = {load.interface: load.free for load in loads}
+        for source, target, count in moves:
+            clients = [
+                Client(**row)
+                for row in self.db.iter_clients(
+                    interface=source,
+                    order_by="last_seen",
+                    limit=count,
+                    columns=CLIENT_COLUMNS,
+                )
+            ]
+            for start in range(0, len(clients), batch_size):
+                end = start + batch_size
+                batch = clients[start:end]
+                if free[target] < len(batch):
+                    self._print(
+                        f"Not enough free IP addresses on {target}: "
+                        f"{free[target]} free, {len(batch)} requested"
+                    )
+                    return False
+                if not self._move_clients(
+                    batch, by_interface[source], by_interface[target], live
+                ):
+                    self._print(f"✗ Failed to move clients from {source} to {target}")
+                    return False
+                free[target] -= len(batch)
+                free[source] += len(batch)
+                self._print(
+                    f"{source} -> {target}: moved {start + len(batch)}/{len(clients)}"
+                )
+        return True
+
+    def _move_clients(
+        self, clients: List[Client], source: Server, target: Server, live: bool
+    ) -> bool:
+        """Moves clients to target interface and applies both server configs"""
+        network, reserved = self._client_network(target)
+        ip_addresses = self.db.get_free_ips(network, len(clients), reserved)
+        if len(ip_addresses) < len(clients):
+            self._print(
+                f"Not enough free IP addresses in network: "
+                f"{len(ip_addresses)} free, {len(clients)} requested"
+            )
+            return False
+
+        self.db.move_clients(
+            {client.name: ip for client, ip in zip(clients, ip_addresses)},
+            target.interface,
+        )
+        for client, ip_address in zip(clients, ip_addresses):
+            if self._index is not None:
+                self._index.remove(client.name, client.public_key, client.ip_address)
+                self._index.add(client.name, client.public_key, ip_address)
+            client.ip_address = ip_address
+            client.interface = target.interface
+
+        with ThreadPoolExecutor(max_workers=min(8, len(clients) or 1)) as pool:
+            list(
+                pool.map(
+                    lambda client: self._create_client_config(client, target), clients
+                )
+            )
+
+        return self._for_each_interface(
+            [source, target],
+            lambda server: self._update_server_config(
+                restart=True, live=live, interface=server.interface
+            ),
+        )
+
     def init_server_config(
         self,
         interface: str = "wg0",
@@ -679,13 +1475,30 @@ PersistentKeepalive = 15
         network: str = "10.42.42.0/24",
         dns: str = "8.8.8.8",
     ) -> bool:
-        """Initializes WireGuard server configuration"""
+        """Initializes WireGuard server configuration of interface
+
+        Every interface gets its own network, which must not overlap the
+        networks of other interfaces, and its own listen port.
+        """
         try:
-            existing_config = self.db.get_server_config()
+            existing_config = self.db.get_server_config(interface)
             if existing_config:
-                print("Server configuration already exists")
+                self._print("Server configuration already exists")
                 return False
 
+            new_network = ipaddress.IPv4Network(network, strict=False)
+            for other in self.db.get_server_configs():
+                other_network = ipaddress.IPv4Network(other.address, strict=False)
+                if new_network.overlaps(other_network):
+                    self._print(
+                        f"Network {network} overlaps network {other.address} "
+                        f"of interface {other.interface}"
+                    )
+                    return False
+                if other.port == port:
+                    self._print(f"Port {port} is used by interface {other.interface}")
+                    return False
+
             private_key = self._generate_private_key()
             public_key = self._generate_public_key(private_key)
 
@@ -696,6 +1509,7 @@ ListenPort = {port}
 DNS = {dns}
 """
 
+            self._ensure_dirs()
             config_path = os.path.join(self.config_dir, f"{interface}.conf")
             with open(config_path, "w") as f:
                 f.write(server_config_content)
@@ -716,21 +1530,21 @@ DNS = {dns}
             )
 
             if self.db.save_server_config(server):
-                print(f"✓ Server configuration created: {config_path}")
+                self._print(f"✓ Server configuration created: {config_path}")
                 return True
             else:
-                print("✗ Error saving to database")
+                self._print("✗ Error saving to database")
                 return False
 
         except Exception as e:
-            print(f"Error creating server configuration: {e}")
+            self._print(f"Error creating server configuration: {e}")
             return False
 
-    def set_host(self, host: str) -> bool:
-        """Sets external host (IP:port) of server"""
+    def set_host(self, host: str, interface: Optional[str] = None) -> bool:
+        """Sets external host (IP:port) of interface, the first one by default"""
         try:
             if ":" not in host:
-                print("Error: format must be IP:port (e.g., 192.168.1.1:51820)")
+                self._print("Error: format must be IP:port (e.g., 192.168.1.1:51820)")
                 return False
 
             external_ip, port_str = host.split(":", 1)
@@ -740,7 +1554,7 @@ DNS = {dns}
             try:
                 ipaddress.ip_address(external_ip)
             except ValueError:
-                print(f"Error: invalid IP address: {external_ip}")
+                self._print(f"Error: invalid IP address: {external_ip}")
                 return False
 
             try:
@@ -748,46 +1562,46 @@ DNS = {dns}
                 if port < 1 or port > 65535:
                     raise ValueError("Port out of range")
             except ValueError:
-                print(f"Error: invalid port: {port_str}")
+                self._print(f"Error: invalid port: {port_str}")
                 return False
 
-            server_config = self.db.get_server_config()
+            server_config = self.db.get_server_config(interface)
             if not server_config:
-                print("Server configuration not found")
+                self._print("Server configuration not found")
                 return False
 
             server_config.external_ip = external_ip
             server_config.port = port
             if self.db.save_server_config(server_config):
-                print(f"✓ Server external host set: {external_ip}:{port}")
+                self._print(f"✓ Server external host set: {external_ip}:{port}")
                 return True
             else:
-                print("✗ Error saving external host")
+                self._print("✗ Error saving external host")
                 return False
         except Exception as e:
-            print(f"Error setting external host: {e}")
+            self._print(f"Error setting external host: {e}")
             return False
 
     def _restart_wireguard(self, interface: str) -> bool:
         """Restarts WireGuard interface (internal method)"""
         try:
-            result_down = subprocess.run(
+            result_down = tracing.run(
                 ["wg-quick", "down", interface], capture_output=True, text=True
             )
             if (
                 result_down.returncode != 0
                 and "is not a WireGuard interface" not in result_down.stderr
             ):
-                print(f"Warning when stopping interface: {result_down.stderr}")
+                self._print(f"Warning when stopping interface: {result_down.stderr}")
 
-            result_up = subprocess.run(
+            result_up = tracing.run(
                 ["wg-quick", "up", interface], capture_output=True, text=True
             )
             if result_up.returncode == 0:
                 return True
             else:
-                print(f"✗ Error starting WireGuard interface: {result_up.stderr}")
+                self._print(f"✗ Error starting WireGuard interface: {result_up.stderr}")
                 return False
         except Exception as e:
-            print(f"Error restarting WireGuard: {e}")
+            self._print(f"Error restarting WireGuard: {e}")
             return False
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import tempfile
+from types import TracebackType
+from typing import IO, Optional, Type
+
+
+class AtomicWriter:
+    """Streams text to a temp file next to target and atomically replaces it
+
+    Content is hashed while written, so callers can compare it with the
+    previous write and discard the temp file instead of committing it.
+    """
+
+    def __init__(self, path: str, mode: int = 0o600) -> None:
+        self.path = path
+        self.mode = mode
+        self.temp_path: Optional[str] = None
+        self._file: Optional[IO[str]] = None
+        self._hash = hashlib.sha256()
+
+    def __enter__(self) -> "AtomicWriter":
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.discard()
+
+    def write(self, text: str) -> None:
+        """Writes chunk of content"""
+        assert self._file is not None
+        self._file.write(text)
+        self._hash.update(text.encode("utf-8"))
+
+    def hexdigest(self) -> str:
+        """Returns SHA-256 of content written so far"""
+        return self._hash.hexdigest()
+
+    def commit(self) -> os.stat_result:
+        """Flushes content to disk and renames temp file over target"""
+        assert self._file is not None and self.temp_path is not None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        os.fchmod(self._file.fileno(), self.mode)
+        self._file.close()
+        self._file = None
+
+        os.replace(self.temp_path, self.path)
+        self.temp_path = None
+        self._fsync_directory()
+        return os.stat(self.path)
+
+    def discard(self) -> None:
+        """Drops temp file leaving target untouched"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.temp_path is not None:
+            try:
+                os.remove(self.temp_path)
+            except FileNotFoundError:
+                pass
+            self.temp_path = None
+
+    def _fsync_directory(self) -> None:
+        """Persists rename in parent directory"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -1,4 +1,5 @@
 from .client import Client
+from .fingerprint import ConfigFingerprint
 from .server import Server
 
-__all__ = ["Client", "Server"]
+__all__ = ["Client", "ConfigFingerprint", "Server"]
@@ -18,6 +18,8 @@ class Client:
     is_blocked: bool
     last_seen: Optional[datetime]
     config_path: Optional[str]
+    # Server interface the client is a peer of, None binds it to the first one
+    interface: Optional[str] = None
 
     @classmethod
     def create_table(cls, conn: sqlite3.Connection) -> None:
@@ -35,11 +37,11 @@ class Client:
                 is_active BOOLEAN DEFAULT TRUE,
                 is_blocked BOOLEAN DEFAULT FALSE,
                 last_seen TIMESTAMP,
-                config_path TEXT
+                config_path TEXT,
+                interface TEXT
             )
         """
         )
-        conn.commit()
 
     def to_dict(self) -> dict[str, Any]:
         """Converts client to dictionary"""
@@ -54,4 +56,5 @@ class Client:
             "is_blocked": self.is_blocked,
             "last_seen": self.last_seen.isoformat() if self.last_seen else None,
             "config_path": self.config_path,
+            "interface": self.interface,
         }
@@ -0,0 +1,38 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class ConfigFingerprint:
+    """Fingerprint of imported or written WireGuard configuration file"""
+
+    path: str
+    sha256: str
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def create_table(cls, conn: sqlite3.Connection) -> None:
+        """Creates config fingerprints table in database"""
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS config_fingerprints (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converts fingerprint to dictionary"""
+        return {
+            "path": self.path,
+            "sha256": self.sha256,
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+        }
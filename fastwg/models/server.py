@@ -38,7 +38,6 @@ class Server:
             )
         """
         )
-        conn.commit()
 
     def to_dict(self) -> dict[str, Any]:
         """Converts server to dictionary"""
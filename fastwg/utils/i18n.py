@@ -61,25 +61,38 @@ class I18nManager:
         return singular if n == 1 else plural
 
 
-# Global instance
-_i18n = I18nManager()
+# Global instance, created on first translation
+_i18n: Optional[I18nManager] = None
+
+
+def _get_i18n() -> I18nManager:
+    """Get global i18n manager, loading catalogs on first use"""
+    global _i18n
+    if _i18n is None:
+        _i18n = I18nManager()
+    return _i18n
 
 
 def gettext(message: str) -> str:
     """Get translated message"""
-    return _i18n.gettext(message)
+    return _get_i18n().gettext(message)
+
+
+def gettext_noop(message: str) -> str:
+    """Marks message for translation when it is shown, without loading catalogs"""
+    return message
 
 
 def ngettext(singular: str, plural: str, n: int) -> str:
     """Get translated message with plural forms"""
-    return _i18n.ngettext(singular, plural, n)
+    return _get_i18n().ngettext(singular, plural, n)
 
 
 def set_language(language: str) -> None:
     """Set current language"""
-    _i18n.set_language(language)
+    _get_i18n().set_language(language)
 
 
 def get_current_language() -> str:
     """Get current language"""
-    return _i18n.current_language
+    return _get_i18n().current_language
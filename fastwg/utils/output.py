@@ -0,0 +1,117 @@
+"""
+Streaming renderers for client listings
+"""
+
+import csv
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Sequence, TextIO
+
+# Machine-readable fields of a listed client, in output order
+FIELDS = (
+    "name",
+    "ip_address",
+    "is_active",
+    "is_blocked",
+    "is_connected",
+    "last_seen",
+    "created_at",
+    "endpoint",
+    "rx_bytes",
+    "tx_bytes",
+    "interface",
+)
+
+# Widest values of fixed-size plain columns
+IP_WIDTH = len("255.255.255.255")
+TIME_WIDTH = len("2024-01-15 14:30:25")
+
+Row = Dict[str, Any]
+
+
+def _encode(value: Any) -> Any:
+    """Encodes datetimes for json"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _record(row: Row) -> Row:
+    """Selects machine-readable fields of row"""
+    return {field: row.get(field) for field in FIELDS}
+
+
+def write_json(rows: Iterable[Row], out: TextIO) -> int:
+    """Writes rows as one JSON array without building it in memory"""
+    count = 0
+    out.write("[")
+    for row in rows:
+        out.write(",\n" if count else "\n")
+        out.write(json.dumps(_record(row), default=_encode, ensure_ascii=False))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_ndjson(rows: Iterable[Row], out: TextIO) -> int:
+    """Writes one JSON object per line"""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(_record(row), default=_encode, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(rows: Iterable[Row], out: TextIO) -> int:
+    """Writes rows as CSV with a header line"""
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in _record(row).values()
+            ]
+        )
+        count += 1
+    return count
+
+
+def format_time(value: Any, missing: str) -> str:
+    """Formats datetime for tables"""
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else missing
+
+
+def write_plain(
+    rows: Iterable[Row],
+    out: TextIO,
+    headers: Sequence[str],
+    name_width: int,
+    cells: Callable[[Row], List[str]],
+) -> int:
+    """Writes aligned columns, one line per row as it arrives
+
+    Column widths are known upfront, name from the longest stored name and
+    the rest from value formats, so nothing is buffered. The last column is
+    left unpadded and may contain color codes.
+    """
+    widths = [
+        max(len(headers[0]), name_width),
+        max(len(headers[1]), IP_WIDTH),
+        max(len(headers[2]), TIME_WIDTH),
+        max(len(headers[3]), TIME_WIDTH),
+    ]
+    end = len(widths)
+
+    def line(values: Sequence[str]) -> str:
+        padded = [value.ljust(width) for value, width in zip(values, widths)]
+        return "  ".join(padded + list(values[end:])).rstrip() + "\n"
+
+    out.write(line(headers))
+    count = 0
+    for row in rows:
+        out.write(line(cells(row)))
+        count += 1
+    return count
@@ -12,7 +12,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/wolfDiesel/fast-wireguard",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: System Administrators",
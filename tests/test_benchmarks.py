@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from benchmarks.fleet import Fleet
+from benchmarks.run import compare, main
+from benchmarks.startup import import_report
+from fastwg.core.live import LiveState
+
+
+class TestFakeWg(unittest.TestCase):
+    """Tests for fake wg/wg-quick used by benchmarks"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.fleet = Fleet(self.temp_dir, 10).build()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wg(self, *args):
+        with self.fleet.activate():
+            return subprocess.run(list(args), capture_output=True, text=True)
+
+    def test_dump_lists_fleet_peers(self):
+        """Test: fleet interface is running with all clients as peers"""
+        with self.fleet.activate():
+            state = LiveState.read()
+
+        self.assertIn("wg0", state.interfaces)
+        self.assertEqual(len(state.peers), 10)
+
+    def test_set_adds_and_removes_peers(self):
+        """Test: wg set changes peers and is recorded in call log"""
+        peer = next(iter(self._dump_keys()))
+
+        self._wg("wg", "set", "wg0", "peer", "new=", "allowed-ips", "10.9.9.9/32")
+        self._wg("wg", "set", "wg0", "peer", peer, "remove")
+        calls = [call["args"][0] for call in self.fleet.calls()]
+
+        keys = self._dump_keys()
+        self.assertIn("new=", keys)
+        self.assertNotIn(peer, keys)
+        self.assertEqual(calls[-2:], ["set", "set"])
+
+    def test_down_and_scripted_failure(self):
+        """Test: wg-quick down stops interface, FAKE_WG_FAIL fails commands"""
+        self.assertEqual(self._wg("wg-quick", "down", "wg0").returncode, 0)
+        self.assertEqual(self._dump_keys(), set())
+
+        os.environ["FAKE_WG_FAIL"] = "up"
+        try:
+            result = self._wg("wg-quick", "up", "wg0")
+        finally:
+            del os.environ["FAKE_WG_FAIL"]
+        self.assertEqual(result.returncode, 1)
+
+    def _dump_keys(self):
+        result = self._wg("wg", "show", "all", "dump")
+        return set(LiveState.parse(result.stdout).peers)
+
+
+class TestBenchmarkRun(unittest.TestCase):
+    """Tests for benchmark runner and baseline comparison"""
+
+    def test_run_saves_report_and_detects_regressions(self):
+        """Test: small run writes report usable as baseline"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "report.json")
+            result = CliRunner().invoke(
+                main,
+                [
+                    "--sizes",
+                    "20",
+                    "--ops",
+                    "list_clients,update_server_config,create_client",
+                    "--repeat",
+                    "1",
+                    "--save",
+                    path,
+                ],
+            )
+            self.assertEqual(result.exit_code, 0, result.output)
+            with open(path) as f:
+                report = json.load(f)
+
+        results = report["results"]["20"]
+        self.assertEqual(
+            set(results), {"list_clients", "update_server_config", "create_client"}
+        )
+        self.assertGreater(results["list_clients"]["peak_bytes"], 0)
+
+        self.assertEqual(compare(report, report, 0.25), [])
+        faster = {
+            "results": {"20": {"list_clients": {"seconds": 1e-9, "peak_bytes": 0}}}
+        }
+        self.assertEqual(
+            [name for _, name, _, _ in compare(report, faster, 0.25)], ["list_clients"]
+        )
+
+
+class TestStartupReport(unittest.TestCase):
+    """Tests for CLI import time report"""
+
+    def test_report_lists_cli_and_its_imports(self):
+        """Test: report has the CLI module and what it imports, slowest first"""
+        report = import_report()
+
+        names = [name for _, name in report]
+        self.assertIn("fastwg.cli", names)
+        self.assertIn("click", names)
+        self.assertEqual(report, sorted(report, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastwg.core.database import Database
+from fastwg.core.keypool import generate_keypair
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Server
+
+
+class TestBulkCreate(unittest.TestCase):
+    """Tests for creating many clients at once"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = Database(os.path.join(self.temp_dir, "test.db"))
+        self.wg_manager.db.save_server_config(
+            Server(
+                id=None,
+                interface="wg0",
+                private_key="server_private=",
+                public_key="server_public=",
+                address="10.42.42.1/24",
+                port=51820,
+                dns="8.8.8.8",
+                mtu=1420,
+                config_path=os.path.join(self.temp_dir, "wg0.conf"),
+                external_ip="192.168.1.1",
+            )
+        )
+
+        self.commands = []
+        patcher = patch("subprocess.run", side_effect=self._run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.wg_manager.db.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, cmd, *args, **kwargs):
+        self.commands.append(cmd)
+        result = MagicMock()
+        result.returncode = 0
+        result.stderr = ""
+        result.stdout = ""
+        return result
+
+    def test_create_named_clients(self):
+        """Test: named clients get sequential IPs, configs and one peer update"""
+        clients = self.wg_manager.create_clients(names=["alice", "bob", "carol"])
+
+        self.assertEqual(
+            [(c.name, c.ip_address) for c in clients],
+            [("alice", "10.42.42.2"), ("bob", "10.42.42.3"), ("carol", "10.42.42.4")],
+        )
+        for client in clients:
+            self.assertTrue(os.path.exists(client.config_path))
+            self.assertIsNotNone(self.wg_manager.db.get_client(client.name))
+
+        with open(os.path.join(self.temp_dir, "wg0.conf")) as f:
+            self.assertEqual(f.read().count("[Peer]"), 3)
+        wg_set = [cmd for cmd in self.commands if cmd[:2] == ["wg", "set"]]
+        self.assertEqual(len(wg_set), 1)
+
+    def test_create_with_prefix_skips_used_names(self):
+        """Test: prefix names skip names that already exist"""
+        self.wg_manager.create_clients(names=["user2"])
+
+        clients = self.wg_manager.create_clients(prefix="user", count=3)
+
+        self.assertEqual([c.name for c in clients], ["user1", "user3", "user4"])
+        self.assertEqual(
+            [c.ip_address for c in clients], ["10.42.42.3", "10.42.42.4", "10.42.42.5"]
+        )
+
+    def test_existing_and_duplicate_names_skipped(self):
+        """Test: names already in use are not created again"""
+        self.wg_manager.create_clients(names=["alice"])
+
+        clients = self.wg_manager.create_clients(names=["alice", "bob", "bob"])
+
+        self.assertEqual([c.name for c in clients], ["bob"])
+
+    def test_keys_taken_from_pool_first(self):
+        """Test: pooled keypairs are used before generating new ones"""
+        keypair = generate_keypair()
+        self.wg_manager.db.add_keypairs([keypair])
+
+        clients = self.wg_manager.create_clients(names=["alice", "bob"])
+
+        self.assertEqual((clients[0].private_key, clients[0].public_key), keypair)
+        self.assertNotEqual(clients[1].public_key, keypair[1])
+        self.assertEqual(self.wg_manager.db.count_keypairs(), 0)
+
+    def test_not_enough_addresses(self):
+        """Test: nothing is created when network cannot fit all clients"""
+        clients = self.wg_manager.create_clients(prefix="user", count=300)
+
+        self.assertEqual(clients, [])
+        self.assertEqual(self.wg_manager.db.count_clients(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import tempfile
 import os
 from datetime import datetime
 
+from fastwg.core.index import ClientIndex
 from fastwg.core.wireguard import WireGuardManager
 from fastwg.models import Client, Server
 
@@ -52,9 +53,10 @@ AllowedIPs = 10.42.42.5/32
         with open(config_file, "w") as f:
             f.write(test_config_content)
 
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(return_value=None)
         self.wg_manager.db.save_server_config = MagicMock(return_value=True)
-        self.wg_manager.db.add_client = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
+        )
 
         result = self.wg_manager.import_existing_config(config_file)
 
@@ -62,16 +64,17 @@ AllowedIPs = 10.42.42.5/32
 
         self.wg_manager.db.save_server_config.assert_called_once()
 
-        self.assertEqual(self.wg_manager.db.add_client.call_count, 2)
+        self.wg_manager.db.add_clients.assert_called_once()
 
-        calls = self.wg_manager.db.add_client.call_args_list
+        added_clients = self.wg_manager.db.add_clients.call_args[0][0]
+        self.assertEqual(len(added_clients), 2)
 
-        first_client = calls[0][0][0]
+        first_client = added_clients[0]
         self.assertEqual(first_client.name, "host_1")
         self.assertEqual(first_client.public_key, "peer1_public_key")
         self.assertEqual(first_client.ip_address, "10.42.42.6")
 
-        second_client = calls[1][0][0]
+        second_client = added_clients[1]
         self.assertEqual(second_client.name, "host_2")
         self.assertEqual(second_client.public_key, "peer2_public_key")
         self.assertEqual(second_client.ip_address, "10.42.42.5")
@@ -101,11 +104,17 @@ AllowedIPs = 10.42.42.6/32
             config_path=None,
         )
 
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(
-            return_value=existing_client
-        )
+        self.wg_manager.db.iter_clients.return_value = [
+            {
+                "name": existing_client.name,
+                "public_key": existing_client.public_key,
+                "ip_address": existing_client.ip_address,
+            }
+        ]
         self.wg_manager.db.save_server_config = MagicMock(return_value=True)
-        self.wg_manager.db.add_client = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
+        )
 
         config_file = os.path.join(self.temp_dir, "wg0.conf")
         with open(config_file, "w") as f:
@@ -117,7 +126,7 @@ AllowedIPs = 10.42.42.6/32
 
         self.wg_manager.db.save_server_config.assert_called_once()
 
-        self.wg_manager.db.add_client.assert_not_called()
+        self.wg_manager.db.add_clients.assert_not_called()
 
     def test_import_config_mixed_scenario(self):
         """Test: mixed scenario - new and existing clients"""
@@ -148,16 +157,17 @@ AllowedIPs = 10.42.42.7/32
             config_path=None,
         )
 
-        def mock_find_client(ip, key):
-            if key == "existing_peer_key":
-                return existing_client
-            return None
-
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(
-            side_effect=mock_find_client
-        )
+        self.wg_manager.db.iter_clients.return_value = [
+            {
+                "name": existing_client.name,
+                "public_key": existing_client.public_key,
+                "ip_address": existing_client.ip_address,
+            }
+        ]
         self.wg_manager.db.save_server_config = MagicMock(return_value=True)
-        self.wg_manager.db.add_client = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
+        )
 
         config_file = os.path.join(self.temp_dir, "wg0.conf")
         with open(config_file, "w") as f:
@@ -169,9 +179,9 @@ AllowedIPs = 10.42.42.7/32
 
         self.wg_manager.db.save_server_config.assert_called_once()
 
-        self.wg_manager.db.add_client.assert_called_once()
+        self.wg_manager.db.add_clients.assert_called_once()
 
-        added_client = self.wg_manager.db.add_client.call_args[0][0]
+        (added_client,) = self.wg_manager.db.add_clients.call_args[0][0]
         self.assertEqual(added_client.name, "host_1")
         self.assertEqual(added_client.public_key, "new_peer_key")
         self.assertEqual(added_client.ip_address, "10.42.42.7")
@@ -191,9 +201,10 @@ PublicKey = valid_peer_key
 AllowedIPs = 10.42.42.7/32
 """
 
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(return_value=None)
         self.wg_manager.db.save_server_config = MagicMock(return_value=True)
-        self.wg_manager.db.add_client = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
+        )
 
         config_file = os.path.join(self.temp_dir, "wg0.conf")
         with open(config_file, "w") as f:
@@ -203,9 +214,9 @@ AllowedIPs = 10.42.42.7/32
 
         self.assertTrue(result)
 
-        self.wg_manager.db.add_client.assert_called_once()
+        self.wg_manager.db.add_clients.assert_called_once()
 
-        added_client = self.wg_manager.db.add_client.call_args[0][0]
+        (added_client,) = self.wg_manager.db.add_clients.call_args[0][0]
         self.assertEqual(added_client.public_key, "valid_peer_key")
 
     def test_import_config_with_peer_without_allowed_ips(self):
@@ -219,9 +230,10 @@ ListenPort = 51820
 PublicKey = peer_key
 """
 
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(return_value=None)
         self.wg_manager.db.save_server_config = MagicMock(return_value=True)
-        self.wg_manager.db.add_client = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
+        )
 
         config_file = os.path.join(self.temp_dir, "wg0.conf")
         with open(config_file, "w") as f:
@@ -231,8 +243,8 @@ PublicKey = peer_key
 
         self.assertTrue(result)
 
-        self.wg_manager.db.add_client.assert_called_once()
-        added_client = self.wg_manager.db.add_client.call_args[0][0]
+        self.wg_manager.db.add_clients.assert_called_once()
+        (added_client,) = self.wg_manager.db.add_clients.call_args[0][0]
         self.assertEqual(added_client.ip_address, "")
 
     def test_import_config_without_interface_section(self):
@@ -263,7 +275,6 @@ AllowedIPs = 10.42.42.6/32
 """
 
         self.wg_manager.db.save_server_config = MagicMock(return_value=False)
-        self.wg_manager._find_client_by_ip_and_key = MagicMock(return_value=None)
 
         config_file = os.path.join(self.temp_dir, "wg0.conf")
         with open(config_file, "w") as f:
@@ -273,48 +284,63 @@ AllowedIPs = 10.42.42.6/32
 
         self.assertFalse(result)
 
-    def test_find_client_by_ip_and_key(self):
-        """Test: find client by IP and public key"""
-        client1 = Client(
-            id=1,
-            name="client1",
-            public_key="key1",
-            private_key="private1",
-            ip_address="10.42.42.6",
-            created_at=datetime.now(),
-            is_active=True,
-            is_blocked=False,
-            last_seen=None,
-            config_path=None,
-        )
+    def test_import_config_skips_duplicates_and_used_names(self):
+        """Test: duplicates inside one config and taken host names are skipped"""
+        test_config_content = """[Interface]
+PrivateKey = server_private_key
+Address = 10.42.42.0/24
+ListenPort = 51820
 
-        client2 = Client(
-            id=2,
-            name="client2",
-            public_key="key2",
-            private_key="private2",
-            ip_address="10.42.42.7",
-            created_at=datetime.now(),
-            is_active=True,
-            is_blocked=False,
-            last_seen=None,
-            config_path=None,
-        )
+[Peer]
+PublicKey = peer1_key
+AllowedIPs = 10.42.42.6/32
 
-        self.wg_manager.db.get_all_clients = MagicMock(return_value=[client1, client2])
+[Peer]
+PublicKey = peer1_key
+AllowedIPs = 10.42.42.7/32
+
+[Peer]
+PublicKey = peer2_key
+AllowedIPs = 10.42.42.6/32
 
-        found_client = self.wg_manager._find_client_by_ip_and_key(
-            "10.42.42.6", "different_key"
+[Peer]
+PublicKey = peer3_key
+AllowedIPs = 10.42.42.8/32
+"""
+
+        self.wg_manager.db.iter_clients.return_value = [
+            {"name": "host_1", "public_key": "old_key", "ip_address": "10.42.42.2"}
+        ]
+        self.wg_manager.db.save_server_config = MagicMock(return_value=True)
+        self.wg_manager.db.add_clients = MagicMock(
+            side_effect=lambda clients: [True] * len(clients)
         )
-        self.assertEqual(found_client, client1)
 
-        found_client = self.wg_manager._find_client_by_ip_and_key(
-            "different_ip", "key2"
+        config_file = os.path.join(self.temp_dir, "wg0.conf")
+        with open(config_file, "w") as f:
+            f.write(test_config_content)
+
+        self.assertTrue(self.wg_manager.import_existing_config(config_file))
+
+        self.wg_manager.db.iter_clients.assert_called_once()
+        added_clients = self.wg_manager.db.add_clients.call_args[0][0]
+        self.assertEqual(
+            [(c.name, c.public_key) for c in added_clients],
+            [("host_2", "peer1_key"), ("host_3", "peer3_key")],
         )
-        self.assertEqual(found_client, client2)
 
-        found_client = self.wg_manager._find_client_by_ip_and_key("10.42.42.8", "key3")
-        self.assertIsNone(found_client)
+    def test_client_index_find(self):
+        """Test: find client by IP and public key"""
+        index = ClientIndex()
+        index.add("client1", "key1", "10.42.42.6")
+        index.add("client2", "key2", "10.42.42.7")
+
+        self.assertEqual(index.find("10.42.42.6", "different_key"), "client1")
+        self.assertEqual(index.find("different_ip", "key2"), "client2")
+        self.assertIsNone(index.find("10.42.42.8", "key3"))
+
+        index.remove("client1", "key1", "10.42.42.6")
+        self.assertIsNone(index.find("10.42.42.6", "key1"))
 
 
 if __name__ == "__main__":
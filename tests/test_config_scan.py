@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from fastwg.core.database import Database
+from fastwg.core.wireguard import WireGuardManager
+
+CONFIG = """[Interface]
+PrivateKey = server_private_key
+Address = 10.42.42.1/24
+ListenPort = 51820
+
+[Peer]
+# {name}
+PublicKey = {name}_key=
+AllowedIPs = 10.42.42.{host}/32
+"""
+
+
+class TestConfigScan(unittest.TestCase):
+    """Tests for fingerprint-cached configuration scanning"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = Database(os.path.join(self.temp_dir, "test.db"))
+        self.wg_manager._generate_public_key = MagicMock(return_value="server_key=")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.wg_manager.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, filename, name, host):
+        path = os.path.join(self.temp_dir, filename)
+        with open(path, "w") as f:
+            f.write(CONFIG.format(name=name, host=host))
+        return path
+
+    def _import_all(self, force=False):
+        configs = self.wg_manager.scan_existing_configs(force=force)
+        for config in configs:
+            self.wg_manager.import_existing_config(config["path"], config)
+        return [config["filename"] for config in configs]
+
+    def test_scan_parses_files_in_order(self):
+        """Test: scan returns parsed configs sorted by filename"""
+        self._write("wg1.conf", "bob", 3)
+        self._write("wg0.conf", "alice", 2)
+
+        configs = self.wg_manager.scan_existing_configs()
+
+        self.assertEqual([c["filename"] for c in configs], ["wg0.conf", "wg1.conf"])
+        _, clients = configs[0]["parsed"]
+        self.assertEqual(clients[0]["PublicKey"], "alice_key=")
+
+    def test_unchanged_files_skipped_on_rescan(self):
+        """Test: imported files are not read again until they change"""
+        self._write("wg0.conf", "alice", 2)
+        self.assertEqual(self._import_all(), ["wg0.conf"])
+
+        self.assertEqual(self._import_all(), [])
+
+        self._write("wg0.conf", "carol", 4)
+        self.assertEqual(self._import_all(), ["wg0.conf"])
+
+    def test_touched_file_with_same_content_skipped(self):
+        """Test: file with new mtime but same content is skipped"""
+        path = self._write("wg0.conf", "alice", 2)
+        self._import_all()
+
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertEqual(self._import_all(), [])
+        fingerprint = self.wg_manager.db.get_config_fingerprints()[path]
+        self.assertEqual(fingerprint.mtime_ns, stat.st_mtime_ns + 10**9)
+
+    def test_force_rescans_everything(self):
+        """Test: force flag ignores stored fingerprints"""
+        self._write("wg0.conf", "alice", 2)
+        self._import_all()
+
+        self.assertEqual(self._import_all(force=True), ["wg0.conf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
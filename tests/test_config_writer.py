@@ -0,0 +1,67 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from fastwg.core.writer import AtomicWriter
+
+
+class TestAtomicWriter(unittest.TestCase):
+    """Tests for atomic config file writer"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "wg0.conf")
+        with open(self.path, "w") as f:
+            f.write("old\n")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_commit_replaces_target(self):
+        """Test: committed content replaces target with restricted mode"""
+        with AtomicWriter(self.path) as writer:
+            writer.write("[Interface]\n")
+            writer.write("[Peer]\n")
+            writer.commit()
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "[Interface]\n[Peer]\n")
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        self.assertEqual(os.listdir(self.temp_dir), ["wg0.conf"])
+
+    def test_uncommitted_write_is_discarded(self):
+        """Test: target is untouched when writer exits without commit"""
+        with AtomicWriter(self.path) as writer:
+            writer.write("new\n")
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old\n")
+        self.assertEqual(os.listdir(self.temp_dir), ["wg0.conf"])
+
+    def test_error_keeps_target(self):
+        """Test: exception while streaming leaves target intact"""
+        with self.assertRaises(RuntimeError):
+            with AtomicWriter(self.path) as writer:
+                writer.write("partial")
+                raise RuntimeError("failed")
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old\n")
+        self.assertEqual(os.listdir(self.temp_dir), ["wg0.conf"])
+
+    def test_hexdigest_matches_content(self):
+        """Test: digest is SHA-256 of streamed content"""
+        import hashlib
+
+        with AtomicWriter(self.path) as writer:
+            writer.write("a")
+            writer.write("b")
+            self.assertEqual(writer.hexdigest(), hashlib.sha256(b"ab").hexdigest())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastwg.core.daemon import DaemonClient, DaemonError, DaemonServer, RemoteManager
+from fastwg.core.database import Database
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Server
+
+
+class TestDaemon(unittest.TestCase):
+    """Tests for UNIX socket daemon serving client commands"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = Database(os.path.join(self.temp_dir, "test.db"))
+        self.wg_manager.db.save_server_config(
+            Server(
+                id=None,
+                interface="wg0",
+                private_key="server_private=",
+                public_key="server_public=",
+                address="10.42.42.1/24",
+                port=51820,
+                dns="8.8.8.8",
+                mtu=1420,
+                config_path=os.path.join(self.temp_dir, "wg0.conf"),
+                external_ip="192.168.1.1",
+            )
+        )
+
+        result = MagicMock(returncode=1, stdout="", stderr="No such device")
+        patcher = patch("subprocess.run", return_value=result)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.socket_path = os.path.join(self.temp_dir, "fastwg.sock")
+        self.server = DaemonServer(self.wg_manager, self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+        self.remote = RemoteManager(DaemonClient.connect(self.socket_path))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.remote.client.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.wg_manager.db.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_create_and_list_through_daemon(self):
+        """Test: clients created through daemon are listed with datetimes"""
+        client = self.remote.create_client("alice")
+
+        self.assertEqual(client.ip_address, "10.42.42.2")
+        self.assertIsNotNone(self.wg_manager.db.get_client("alice"))
+
+        clients = self.remote.list_clients(status=None)
+        self.assertEqual([c["name"] for c in clients], ["alice"])
+        self.assertEqual(clients[0]["created_at"].date(), client.created_at.date())
+        self.assertEqual(self.remote.count_clients(), 1)
+
+    def test_disable_enable_and_cat(self):
+        """Test: status changes and config reads are served by daemon"""
+        self.remote.create_client("alice")
+
+        self.assertTrue(self.remote.disable_client("alice"))
+        self.assertTrue(self.wg_manager.db.get_client("alice").is_blocked)
+        self.assertTrue(self.remote.enable_client("alice"))
+        self.assertIn("[Peer]", self.remote.get_client_config("alice"))
+
+    def test_manager_messages_are_forwarded(self):
+        """Test: messages printed by manager reach the CLI process"""
+        with patch("sys.stdout.write") as write:
+            self.assertFalse(self.remote.disable_client("missing"))
+
+        write.assert_called_once_with("Client missing not found\n")
+
+    def test_manager_calls_keep_stdout_and_hold_lock(self):
+        """Test: requests run under the lock without replacing sys.stdout"""
+        seen = []
+
+        def count_clients(**kwargs):
+            seen.append((sys.stdout, self.server._lock.locked()))
+            return 0
+
+        stdout = sys.stdout
+        with patch.object(self.wg_manager, "count_clients", side_effect=count_clients):
+            self.assertEqual(self.remote.count_clients(), 0)
+
+        self.assertEqual(seen, [(stdout, True)])
+
+    def test_socket_is_created_owner_only(self):
+        """Test: socket has owner-only permissions from bind on"""
+        modes = []
+        bind = DaemonServer.server_bind
+
+        def server_bind(server):
+            bind(server)
+            modes.append(stat.S_IMODE(os.stat(server.server_address).st_mode))
+
+        umask = os.umask(0o002)
+        try:
+            with patch.object(DaemonServer, "server_bind", server_bind):
+                server = DaemonServer(
+                    self.wg_manager, os.path.join(self.temp_dir, "other.sock")
+                )
+            server.server_close()
+        finally:
+            self.assertEqual(os.umask(umask), 0o002)
+
+        self.assertEqual(modes, [0o600])
+
+    def test_invalid_subnet_raises_value_error(self):
+        """Test: filter errors are raised as ValueError on client side"""
+        with self.assertRaises(ValueError):
+            self.remote.list_clients(subnet="not-a-subnet")
+
+    def test_index_follows_writes_of_other_connections(self):
+        """Test: warm client index is reloaded after another process writes"""
+        other = Database(os.path.join(self.temp_dir, "test.db"))
+        try:
+            other.get_connection().execute(
+                "INSERT INTO clients (name, public_key, private_key, ip_address) "
+                "VALUES ('bob', 'bob_key=', 'bob_private=', '10.42.42.9')"
+            )
+        finally:
+            other.close()
+
+        self.assertIn("bob", self.wg_manager._client_index().names)
+
+    def test_other_working_directory_is_not_served(self):
+        """Test: clients from another directory fall back to local manager"""
+        self.remote.client.close()
+        os.chdir(self.cwd)
+        try:
+            self.assertIsNone(DaemonClient.connect(self.socket_path))
+        finally:
+            os.chdir(self.temp_dir)
+
+    def test_second_daemon_refused(self):
+        """Test: daemon does not start when one is already running"""
+        self.remote.client.close()
+        with self.assertRaises(DaemonError):
+            DaemonServer(self.wg_manager, self.socket_path)
+
+    def test_missing_socket(self):
+        """Test: no daemon socket means no remote manager"""
+        self.assertIsNone(
+            DaemonClient.connect(os.path.join(self.temp_dir, "missing.sock"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
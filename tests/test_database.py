@@ -3,6 +3,7 @@
 import os
 import sys
 import tempfile
+import threading
 
 # Add project modules path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -29,6 +30,7 @@ class TestDatabase(unittest.TestCase):
     def tearDown(self):
         """Cleanup after each test"""
         # Remove temporary database
+        self.db.close()
         os.unlink(self.temp_db.name)
 
     def test_add_and_get_client(self):
@@ -220,6 +222,167 @@ class TestDatabase(unittest.TestCase):
         server = self.db.get_server_config()
         self.assertIsNone(server)
 
+    def _client(self, name, ip_address, public_key):
+        """Builds test client"""
+        return Client(
+            id=None,
+            name=name,
+            public_key=public_key,
+            private_key="priv",
+            ip_address=ip_address,
+            created_at=datetime.now(),
+            is_active=True,
+            is_blocked=False,
+            last_seen=None,
+            config_path=None,
+        )
+
+    def test_connection_is_reused_with_pragmas(self):
+        """Test that one configured connection is reused"""
+        conn = self.db.get_connection()
+
+        self.assertIs(self.db.get_connection(), conn)
+        self.assertEqual(
+            conn.execute("PRAGMA journal_mode").fetchone()[0].lower(), "wal"
+        )
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -8000)
+
+    def test_thread_connection_closes_only_opened_one(self):
+        """Test that scoped connection is closed, an existing one is kept"""
+        conn = self.db.get_connection()
+        with self.db.thread_connection():
+            self.db.get_all_clients()
+        self.assertIs(self.db.get_connection(), conn)
+
+        def work():
+            with self.db.thread_connection():
+                self.db.get_all_clients()
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        self.assertEqual(self.db._connections, [conn])
+
+    def test_transaction_groups_writes(self):
+        """Test that nested writes are committed together"""
+        with self.db.transaction():
+            self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+            self.db.add_client(self._client("client2", "10.0.0.3", "key2"))
+            self.assertTrue(self.db.get_connection().in_transaction)
+
+        self.assertFalse(self.db.get_connection().in_transaction)
+        self.assertEqual(len(self.db.get_all_clients()), 2)
+
+    def test_transaction_rollback(self):
+        """Test that failed transaction discards all grouped writes"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+                raise RuntimeError("abort")
+
+        self.assertIsNone(self.db.get_client("client1"))
+
+    def test_failed_nested_write_keeps_outer_transaction(self):
+        """Test that duplicate insert inside transaction keeps earlier writes"""
+        with self.db.transaction():
+            self.assertTrue(
+                self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+            )
+            self.assertFalse(
+                self.db.add_client(self._client("client1", "10.0.0.3", "key2"))
+            )
+
+        self.assertIsNotNone(self.db.get_client("client1"))
+        self.assertEqual(len(self.db.get_all_clients()), 1)
+
+    def test_add_clients_bulk(self):
+        """Test bulk insert returns per-client result and reserves IPs"""
+        self.db.add_client(self._client("existing", "10.0.0.2", "key0"))
+
+        clients = [
+            self._client("client1", "10.0.0.3", "key1"),
+            self._client("existing", "10.0.0.4", "key2"),
+            self._client("client3", "10.0.0.2", "key3"),
+            self._client("client4", "10.0.0.5", "key4"),
+        ]
+        results = self.db.add_clients(clients)
+
+        self.assertEqual(results, [True, False, False, True])
+        self.assertIsNotNone(clients[0].id)
+        self.assertEqual(self.db.get_client("client4").ip_address, "10.0.0.5")
+        self.assertEqual(len(self.db.get_all_clients()), 3)
+
+    def test_update_last_seen_many(self):
+        """Test bulk last seen update"""
+        self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+        self.db.add_client(self._client("client2", "10.0.0.3", "key2"))
+        seen = datetime(2024, 1, 1, 12, 0, 0)
+
+        results = self.db.update_last_seen_many(
+            {"client1": seen, "missing": seen, "client2": seen}
+        )
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual(self.db.get_client("client1").last_seen, seen)
+        self.assertEqual(self.db.get_client("client2").last_seen, seen)
+
+    def test_set_status_many(self):
+        """Test bulk status update"""
+        self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+        self.db.add_client(self._client("client2", "10.0.0.3", "key2"))
+
+        results = self.db.set_status_many(
+            ["client1", "client2", "missing"], is_active=False, is_blocked=True
+        )
+
+        self.assertEqual(results, [True, True, False])
+        self.assertTrue(self.db.get_client("client1").is_blocked)
+        self.assertFalse(self.db.get_client("client2").is_active)
+
+    def test_iter_clients_filters_and_pagination(self):
+        """Test filtered, ordered and paginated client streaming"""
+        self.db.add_clients(
+            [
+                self._client("office-1", "10.0.0.10", "key1"),
+                self._client("office-2", "10.0.0.2", "key2"),
+                self._client("home-1", "10.0.1.5", "key3"),
+                self._client("office-3", "10.0.0.3", "key4"),
+            ]
+        )
+        self.db.update_client_status("office-3", is_active=False, is_blocked=True)
+
+        names = [
+            row["name"]
+            for row in self.db.iter_clients(status="active", name_prefix="office")
+        ]
+        self.assertEqual(names, ["office-1", "office-2"])
+
+        rows = self.db.iter_clients(subnet="10.0.0.0/24", order_by="ip_address")
+        self.assertEqual(
+            [row["ip_address"] for row in rows], ["10.0.0.2", "10.0.0.3", "10.0.0.10"]
+        )
+
+        page = self.db.iter_clients(order_by="name", descending=True, limit=2, offset=1)
+        self.assertEqual([row["name"] for row in page], ["office-2", "office-1"])
+
+        self.assertEqual(self.db.count_clients(status="blocked"), 1)
+        self.assertEqual(self.db.count_clients(subnet="10.0.1.0/24"), 1)
+
+    def test_iter_clients_projection(self):
+        """Test that listings skip private key and convert values"""
+        self.db.add_client(self._client("client1", "10.0.0.2", "key1"))
+
+        (row,) = self.db.iter_clients()
+        self.assertNotIn("private_key", row)
+        self.assertIs(row["is_active"], True)
+        self.assertIsInstance(row["created_at"], datetime)
+
+        (row,) = self.db.iter_clients(columns=("name", "private_key"))
+        self.assertEqual(row, {"name": "client1", "private_key": "priv"})
+
+        with self.assertRaises(ValueError):
+            list(self.db.iter_clients(columns=("name; DROP TABLE clients",)))
+
     def test_client_to_dict(self):
         """Test client serialization to dictionary"""
         client = Client(
@@ -0,0 +1,187 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from fastwg.core.database import Database
+from fastwg.core.exporter import (
+    MetricsCollector,
+    MetricsServer,
+    format_metric,
+    parse_listen_address,
+)
+from fastwg.core.live import LiveState
+from fastwg.core.metrics import OperationTimer
+from fastwg.models import Client
+
+
+def dump(handshake):
+    """Builds `wg show all dump` output with one peer"""
+    return (
+        "wg0\tserver_private=\tserver_public=\t51820\toff\n"
+        f"wg0\talice_key=\t(none)\t1.2.3.4:5000\t10.42.42.2/32\t{handshake}\t100\t200\toff"
+    )
+
+
+class TestExporter(unittest.TestCase):
+    """Tests for Prometheus metrics exporter"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.temp_dir, "test.db"))
+        self.db.add_client(
+            Client(
+                id=None,
+                name="alice",
+                public_key="alice_key=",
+                private_key="alice_private=",
+                ip_address="10.42.42.2",
+                created_at=datetime.now(),
+                is_active=True,
+                is_blocked=False,
+                last_seen=None,
+                config_path=None,
+            )
+        )
+        self.reads = 0
+        self.handshake = int(time.time()) - 30
+        self.collector = MetricsCollector(self.db, interval=60, read_state=self._read)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read(self):
+        self.reads += 1
+        return LiveState.parse(dump(self.handshake))
+
+    def test_peer_metrics(self):
+        """Test: peer counters and connection state are exported with names"""
+        page = self.collector.render()
+
+        labels = 'interface="wg0",public_key="alice_key=",name="alice"'
+        self.assertIn(f"fastwg_peer_receive_bytes_total{{{labels}}} 100", page)
+        self.assertIn(f"fastwg_peer_transmit_bytes_total{{{labels}}} 200", page)
+        self.assertIn(f"fastwg_peer_connected{{{labels}}} 1", page)
+        self.assertIn(
+            f"fastwg_peer_last_handshake_seconds{{{labels}}} {self.handshake}", page
+        )
+        self.assertIn("fastwg_peer_handshake_age_seconds{", page)
+        self.assertIn('fastwg_database_rows{table="clients"} 1', page)
+        self.assertNotIn('fastwg_database_rows{table="traffic"}', page)
+        self.assertIn('fastwg_database_size_bytes{file="main"}', page)
+        self.assertIn("fastwg_up 1", page)
+
+    def test_never_connected_peer(self):
+        """Test: peer without handshake is disconnected and has no age"""
+        self.handshake = 0
+
+        page = self.collector.render()
+
+        self.assertIn('fastwg_peer_connected{interface="wg0"', page)
+        self.assertIn('name="alice"} 0\n', page)
+        self.assertNotIn("fastwg_peer_handshake_age_seconds{", page)
+
+    def test_inactive_wireguard(self):
+        """Test: exporter reports down when state cannot be read"""
+        collector = MetricsCollector(self.db, read_state=lambda: None)
+
+        page = collector.render()
+
+        self.assertIn("fastwg_up 0", page)
+        self.assertNotIn("fastwg_peer_receive_bytes_total{", page)
+
+    def test_page_cached_within_interval(self):
+        """Test: repeated and concurrent scrapes share one wg dump"""
+        threads = [threading.Thread(target=self.collector.render) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.collector.render()
+
+        self.assertEqual(self.reads, 1)
+
+    def test_page_refreshed_after_interval(self):
+        """Test: stale page is collected again"""
+        self.collector.interval = 0
+
+        self.collector.render()
+        self.collector.render()
+
+        self.assertEqual(self.reads, 2)
+
+    def test_http_server(self):
+        """Test: /metrics is served over HTTP, other paths are not found"""
+        server = MetricsServer(self.collector, ("127.0.0.1", 0))
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}/other")
+            error.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.assertIn("fastwg_peer_connected{", body)
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertEqual(error.exception.code, 404)
+
+    def test_textfile(self):
+        """Test: textfile is written with readable permissions"""
+        path = os.path.join(self.temp_dir, "fastwg.prom")
+
+        self.collector.write_textfile(path)
+
+        with open(path) as f:
+            self.assertIn("fastwg_up 1", f.read())
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+
+
+class TestMetricsFormat(unittest.TestCase):
+    """Tests for text format helpers and operation timings"""
+
+    def test_label_escaping(self):
+        """Test: quotes, backslashes and newlines in labels are escaped"""
+        text = format_metric("m", "gauge", "Help", [({"name": 'a"b\\c\nd'}, 1.5)])
+
+        self.assertEqual(
+            text, '# HELP m Help\n# TYPE m gauge\nm{name="a\\"b\\\\c\\nd"} 1.5\n'
+        )
+
+    def test_operation_timer(self):
+        """Test: timings accumulate per operation, failures included"""
+        timer = OperationTimer()
+        with timer.timed("create"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with timer.timed("create"):
+                raise RuntimeError
+
+        stats = timer.snapshot()["create"]
+        self.assertEqual(stats.calls, 2)
+        self.assertGreaterEqual(stats.max_seconds, 0)
+
+    def test_parse_listen_address(self):
+        """Test: port alone listens on localhost"""
+        self.assertEqual(parse_listen_address("9586"), ("127.0.0.1", 9586))
+        self.assertEqual(parse_listen_address("0.0.0.0:9100"), ("0.0.0.0", 9100))
+        with self.assertRaises(ValueError):
+            parse_listen_address("localhost:http")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+import ipaddress
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from benchmarks.fleet import Fleet
+from fastwg.core import migrations
+from fastwg.core.database import Database
+from fastwg.core.live import LiveState
+from fastwg.models import Client, Server
+
+
+def make_server(interface, address, port):
+    return Server(
+        id=None,
+        interface=interface,
+        private_key=f"{interface}_private=",
+        public_key=f"{interface}_public=",
+        address=address,
+        port=port,
+        dns="8.8.8.8",
+        mtu=1420,
+        config_path=f"/etc/wireguard/{interface}.conf",
+        external_ip="203.0.113.1",
+    )
+
+
+def make_client(name, ip_address, interface=None):
+    return Client(
+        id=None,
+        name=name,
+        public_key=f"{name}_key=",
+        private_key=f"{name}_private=",
+        ip_address=ip_address,
+        created_at=datetime.now(),
+        is_active=True,
+        is_blocked=False,
+        last_seen=None,
+        config_path=None,
+        interface=interface,
+    )
+
+
+class TestInterfaceDatabase(unittest.TestCase):
+    """Tests for clients bound to server interfaces"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "wireguard.db")
+        self.db = Database(self.db_path)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_clients_default_to_first_interface(self):
+        """Test: clients without interface belong to the first server"""
+        self.db.add_client(make_client("early", "10.1.0.5"))
+        self.db.save_server_config(make_server("wg0", "10.1.0.1/24", 51820))
+        self.db.save_server_config(make_server("wg1", "10.2.0.1/24", 51821))
+        self.db.add_client(make_client("alice", "10.1.0.2"))
+        self.db.add_client(make_client("bob", "10.2.0.2", "wg1"))
+
+        self.assertEqual(self.db.get_client("early").interface, "wg0")
+        self.assertEqual(self.db.get_client("alice").interface, "wg0")
+        self.assertEqual(self.db.get_client("bob").interface, "wg1")
+        self.assertEqual(self.db.count_clients(interface="wg0"), 2)
+        names = [row["name"] for row in self.db.iter_clients(interface="wg1")]
+        self.assertEqual(names, ["bob"])
+
+    def test_server_update_keeps_order(self):
+        """Test: updating first server does not make it the last one"""
+        self.db.save_server_config(make_server("wg0", "10.1.0.1/24", 51820))
+        self.db.save_server_config(make_server("wg1", "10.2.0.1/24", 51821))
+
+        server = self.db.get_server_config()
+        first_id = server.id
+        server.external_ip = "198.51.100.7"
+        self.assertTrue(self.db.save_server_config(server))
+
+        self.assertEqual(self.db.get_server_config().interface, "wg0")
+        self.assertEqual(self.db.get_server_config().id, first_id)
+        self.assertEqual(self.db.get_server_config("wg1").port, 51821)
+        self.assertIsNone(self.db.get_server_config("wg9"))
+        self.assertEqual(
+            [server.interface for server in self.db.get_server_configs()],
+            ["wg0", "wg1"],
+        )
+
+    def test_migration_assigns_interfaces_by_network(self):
+        """Test: existing clients are bound to the interface of their network"""
+        self.db.save_server_config(make_server("wg0", "10.1.0.1/24", 51820))
+        self.db.save_server_config(make_server("wg1", "10.2.0.1/24", 51821))
+        self.db.add_client(make_client("alice", "10.1.0.2"))
+        self.db.add_client(make_client("bob", "10.2.0.2"))
+        self.db.add_client(make_client("carol", "192.168.5.5"))
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE clients SET interface = NULL")
+            version = migrations.MIGRATIONS.index(migrations._add_client_interface)
+            conn.execute(f"PRAGMA user_version = {version}")
+        self.db.close()
+
+        self.db = Database(self.db_path)
+        self.assertEqual(self.db.get_client("alice").interface, "wg0")
+        self.assertEqual(self.db.get_client("bob").interface, "wg1")
+        self.assertEqual(self.db.get_client("carol").interface, "wg0")
+
+
+class TestInterfaceManager(unittest.TestCase):
+    """Tests for managing several interfaces against fake wg"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.fleet = Fleet(self.temp_dir, 10).build()
+        self.activation = self.fleet.activate()
+        self.activation.__enter__()
+        self.db = Database(self.fleet.db_path)
+        self.manager = self.fleet.manager(self.db)
+        with redirect_stdout(StringIO()):
+            self.assertTrue(
+                self.manager.init_server_config("wg1", 51821, "10.99.0.0/24")
+            )
+            self.manager.set_host("203.0.113.1:51821", "wg1")
+            self.manager.start_server("wg1")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        self.activation.__exit__(None, None, None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _peers(self, interface):
+        return {peer.public_key for peer in LiveState.read().interface_peers(interface)}
+
+    def _config_peers(self, interface):
+        with open(os.path.join(self.fleet.config_dir, f"{interface}.conf")) as f:
+            return f.read().count("[Peer]")
+
+    def test_clients_use_pool_and_config_of_interface(self):
+        """Test: clients get addresses and peers on their own interface only"""
+        with redirect_stdout(StringIO()):
+            alice = self.manager.create_client("alice", interface="wg1")
+            created = self.manager.create_clients(
+                prefix="bulk_", count=3, interface="wg1"
+            )
+            bob = self.manager.create_client("bob", placement="first")
+
+        wg1 = ipaddress.IPv4Network("10.99.0.0/24")
+        self.assertEqual(alice.interface, "wg1")
+        self.assertIn(ipaddress.IPv4Address(alice.ip_address), wg1)
+        self.assertTrue(
+            all(ipaddress.IPv4Address(c.ip_address) in wg1 for c in created)
+        )
+        self.assertEqual(bob.interface, "wg0")
+        self.assertNotIn(ipaddress.IPv4Address(bob.ip_address), wg1)
+
+        self.assertEqual(self._config_peers("wg1"), 4)
+        self.assertEqual(self._config_peers("wg0"), 11)
+        self.assertIn(alice.public_key, self._peers("wg1"))
+        self.assertNotIn(alice.public_key, self._peers("wg0"))
+
+        with redirect_stdout(StringIO()):
+            self.assertTrue(self.manager.disable_client("alice"))
+        self.assertEqual(self._config_peers("wg1"), 3)
+        self.assertNotIn(alice.public_key, self._peers("wg1"))
+        self.assertEqual(self.manager.count_clients(interface="wg1"), 4)
+
+    def test_reload_and_sync_cover_all_interfaces(self):
+        """Test: reload and sync act on every interface, output kept in order"""
+        with redirect_stdout(StringIO()):
+            self.manager.create_client("alice", interface="wg1")
+        # Interface lost its peers, e.g. after a manual wg set
+        with open(os.path.join(self.fleet.state_dir, "wg1.dump")) as f:
+            header = f.readline()
+        with open(os.path.join(self.fleet.state_dir, "wg1.dump"), "w") as f:
+            f.write(header)
+
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertTrue(self.manager.sync_peers())
+        self.assertEqual(len(self._peers("wg1")), 1)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(
+            lines,
+            [
+                "wg0: peers to add: 0, update: 0, remove: 0",
+                "wg1: peers to add: 1, update: 0, remove: 0",
+            ],
+        )
+
+        with redirect_stdout(StringIO()):
+            self.assertTrue(self.manager.reload_config(live=False))
+        downs = [
+            call["args"][1]
+            for call in self.fleet.calls()
+            if call["tool"] == "wg-quick" and call["args"][0] == "down"
+        ]
+        self.assertEqual(sorted(downs[-2:]), ["wg0", "wg1"])
+
+    def test_interface_workers_keep_global_stdout(self):
+        """Test: workers hand messages back instead of replacing sys.stdout"""
+        seen = []
+
+        def apply(interface, delta):
+            seen.append(sys.stdout)
+            return True
+
+        output = StringIO()
+        with redirect_stdout(output), patch.object(
+            self.manager, "_apply_peer_delta", side_effect=apply
+        ):
+            self.assertTrue(self.manager.sync_peers())
+
+        self.assertEqual(seen, [output, output])
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "wg0: peers to add: 0, update: 0, remove: 0",
+                "wg1: peers to add: 0, update: 0, remove: 0",
+            ],
+        )
+
+    def test_interface_workers_close_connections(self):
+        """Test: repeated batches over interfaces keep connection count flat"""
+        with redirect_stdout(StringIO()):
+            self.assertTrue(self.manager.sync_peers())
+            connections = len(self.db._connections)
+            for _ in range(3):
+                self.assertTrue(self.manager.sync_peers())
+                self.assertTrue(self.manager.reload_config(live=True))
+
+        self.assertEqual(len(self.db._connections), connections)
+
+    def test_unknown_interface_and_overlapping_network(self):
+        """Test: unknown interfaces and overlapping networks are rejected"""
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertIsNone(self.manager.create_client("alice", interface="wg7"))
+            self.assertFalse(self.manager.reload_config(interface="wg7"))
+            self.assertFalse(
+                self.manager.init_server_config("wg2", 51822, "10.99.0.128/25")
+            )
+            self.assertFalse(
+                self.manager.init_server_config("wg2", 51821, "10.98.0.0/24")
+            )
+        self.assertIn("Interface wg7 is not configured", output.getvalue())
+        self.assertIn("overlaps", output.getvalue())
+        self.assertIn("Port 51821 is used by interface wg1", output.getvalue())
+        self.assertIsNone(self.db.get_server_config("wg2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,7 @@ from unittest.mock import patch
 # Add the project root to the path
 sys.path.insert(0, ".")
 
+from fastwg.core.database import Database
 from fastwg.core.wireguard import WireGuardManager
 from fastwg.models import Server
 
@@ -23,14 +24,11 @@ class TestIPAllocation(unittest.TestCase):
         self.temp_db.close()
 
         # Create WireGuardManager with temporary database
-        with patch("fastwg.core.database.Database") as mock_db_class:
-            mock_db_instance = mock_db_class.return_value
-            temp_dir = tempfile.mkdtemp()
-            self.wg_manager = WireGuardManager(
-                config_dir=temp_dir, keys_dir=os.path.join(temp_dir, "keys")
-            )
-            # Set the database instance
-            self.wg_manager.db = mock_db_instance
+        temp_dir = tempfile.mkdtemp()
+        self.wg_manager = WireGuardManager(
+            config_dir=temp_dir, keys_dir=os.path.join(temp_dir, "keys")
+        )
+        self.wg_manager.db = Database(db_path=self.temp_db.name)
 
     def tearDown(self):
         """Clean up test environment"""
@@ -59,32 +57,26 @@ class TestIPAllocation(unittest.TestCase):
         with patch.object(
             self.wg_manager.db, "get_server_config", return_value=server_config
         ):
-            with patch.object(self.wg_manager.db, "get_all_clients", return_value=[]):
-                # Should not raise ValueError
-                next_ip = self.wg_manager._get_next_ip()
-
-                # Should return a valid IP from the network
-                self.assertTrue(next_ip.startswith("10.42.42."))
-                self.assertNotEqual(next_ip, "10.42.42.1")  # Should not be server IP
-                self.assertNotEqual(
-                    next_ip, "10.42.42.0"
-                )  # Should not be network address
-                self.assertNotEqual(next_ip, "10.42.42.255")  # Should not be broadcast
+            # Should not raise ValueError
+            next_ip = self.wg_manager._get_next_ip()
+
+            # Should return a valid IP from the network
+            self.assertTrue(next_ip.startswith("10.42.42."))
+            self.assertNotEqual(next_ip, "10.42.42.1")  # Should not be server IP
+            self.assertNotEqual(next_ip, "10.42.42.0")  # Should not be network address
+            self.assertNotEqual(next_ip, "10.42.42.255")  # Should not be broadcast
 
     def test_get_next_ip_without_server_config(self):
         """Test IP allocation when no server config exists"""
         # Mock database methods
         with patch.object(self.wg_manager.db, "get_server_config", return_value=None):
-            with patch.object(self.wg_manager.db, "get_all_clients", return_value=[]):
-                # Should use default network
-                next_ip = self.wg_manager._get_next_ip()
+            # Should use default network
+            next_ip = self.wg_manager._get_next_ip()
 
-                # Should return a valid IP from default network
-                self.assertTrue(next_ip.startswith("10.0.0."))
-                self.assertNotEqual(
-                    next_ip, "10.0.0.0"
-                )  # Should not be network address
-                self.assertNotEqual(next_ip, "10.0.0.255")  # Should not be broadcast
+            # Should return a valid IP from default network
+            self.assertTrue(next_ip.startswith("10.0.0."))
+            self.assertNotEqual(next_ip, "10.0.0.0")  # Should not be network address
+            self.assertNotEqual(next_ip, "10.0.0.255")  # Should not be broadcast
 
     def test_get_next_ip_avoids_existing_ips(self):
         """Test that IP allocation avoids existing client IPs"""
@@ -105,14 +97,14 @@ class TestIPAllocation(unittest.TestCase):
             external_ip="192.168.1.1",
         )
 
-        # Mock existing clients
+        # Existing clients
         existing_clients = [
             Client(
                 id=1,
                 name="client1",
                 public_key="key1",
                 private_key="priv1",
-                ip_address="10.42.42.10",
+                ip_address="10.42.42.2",
                 is_active=True,
                 is_blocked=False,
                 created_at=datetime.now(),
@@ -124,7 +116,7 @@ class TestIPAllocation(unittest.TestCase):
                 name="client2",
                 public_key="key2",
                 private_key="priv2",
-                ip_address="10.42.42.20",
+                ip_address="10.42.42.3",
                 is_active=True,
                 is_blocked=False,
                 created_at=datetime.now(),
@@ -133,20 +125,63 @@ class TestIPAllocation(unittest.TestCase):
             ),
         ]
 
+        for client in existing_clients:
+            self.wg_manager.db.add_client(client)
+
         # Mock database methods
         with patch.object(
             self.wg_manager.db, "get_server_config", return_value=server_config
         ):
-            with patch.object(
-                self.wg_manager.db, "get_all_clients", return_value=existing_clients
-            ):
-                next_ip = self.wg_manager._get_next_ip()
-
-                # Should not return existing IPs
-                self.assertNotEqual(next_ip, "10.42.42.10")
-                self.assertNotEqual(next_ip, "10.42.42.20")
-                # Should return a valid IP from the network
-                self.assertTrue(next_ip.startswith("10.42.42."))
+            next_ip = self.wg_manager._get_next_ip()
+
+            # Should not return existing IPs
+            self.assertNotEqual(next_ip, "10.42.42.2")
+            self.assertNotEqual(next_ip, "10.42.42.3")
+            # Should return the first free IP from the network
+            self.assertEqual(next_ip, "10.42.42.4")
+
+    def test_get_next_ip_reuses_deleted_ip(self):
+        """Test that IP of deleted client becomes available again"""
+        from fastwg.models import Client
+        from datetime import datetime
+
+        server_config = Server(
+            id=1,
+            interface="wg0",
+            private_key="test_private_key",
+            public_key="test_public_key",
+            address="10.42.42.1/24",
+            port=51820,
+            dns="8.8.8.8",
+            mtu=1420,
+            config_path="/etc/wireguard/wg0.conf",
+            external_ip="192.168.1.1",
+        )
+
+        with patch.object(
+            self.wg_manager.db, "get_server_config", return_value=server_config
+        ):
+            for index in range(3):
+                ip_address = self.wg_manager._get_next_ip()
+                self.wg_manager.db.add_client(
+                    Client(
+                        id=None,
+                        name=f"client{index}",
+                        public_key=f"key{index}",
+                        private_key=f"priv{index}",
+                        ip_address=ip_address,
+                        is_active=True,
+                        is_blocked=False,
+                        created_at=datetime.now(),
+                        last_seen=None,
+                        config_path=None,
+                    )
+                )
+
+            self.assertEqual(self.wg_manager._get_next_ip(), "10.42.42.5")
+
+            self.wg_manager.db.delete_client("client1")
+            self.assertEqual(self.wg_manager._get_next_ip(), "10.42.42.3")
 
 
 if __name__ == "__main__":
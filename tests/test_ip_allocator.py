@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import ipaddress
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+
+from fastwg.core.allocator import IPAllocator  # noqa: E402
+
+
+class TestIPAllocator(unittest.TestCase):
+    """Tests for free-range IP allocator"""
+
+    def setUp(self):
+        """Setup before each test"""
+        self.temp_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.temp_db.close()
+        self.conn = sqlite3.connect(self.temp_db.name)
+        IPAllocator.create_table(self.conn)
+        self.allocator = IPAllocator(self.conn)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.conn.close()
+        os.unlink(self.temp_db.name)
+
+    def _ranges(self, network):
+        """Returns free ranges of pool as address strings"""
+        cursor = self.conn.execute(
+            "SELECT start_ip, end_ip FROM ip_pool_ranges WHERE pool = ? ORDER BY start_ip",
+            (network,),
+        )
+        return [
+            (str(ipaddress.IPv4Address(start)), str(ipaddress.IPv4Address(end)))
+            for start, end in cursor.fetchall()
+        ]
+
+    def test_init_pool_skips_used_addresses(self):
+        """Test: pool initialization leaves used addresses out of free ranges"""
+        self.allocator.init_pool(
+            "10.0.0.0/24", ["10.0.0.1", "10.0.0.5", "192.168.1.1", ""]
+        )
+
+        self.assertEqual(
+            self._ranges("10.0.0.0/24"),
+            [("10.0.0.2", "10.0.0.4"), ("10.0.0.6", "10.0.0.254")],
+        )
+        self.assertEqual(self.allocator.first_free("10.0.0.0/24"), "10.0.0.2")
+
+    def test_reserve_splits_and_shrinks_ranges(self):
+        """Test: reserving addresses splits and shrinks free ranges"""
+        self.allocator.init_pool("10.0.0.0/29", [])
+
+        self.allocator.reserve("10.0.0.1")
+        self.allocator.reserve("10.0.0.4")
+        self.allocator.reserve("10.0.0.6")
+
+        self.assertEqual(
+            self._ranges("10.0.0.0/29"),
+            [("10.0.0.2", "10.0.0.3"), ("10.0.0.5", "10.0.0.5")],
+        )
+
+    def test_release_merges_adjacent_ranges(self):
+        """Test: releasing address merges neighbouring free ranges"""
+        self.allocator.init_pool("10.0.0.0/29", ["10.0.0.3"])
+
+        self.allocator.release("10.0.0.3")
+
+        self.assertEqual(self._ranges("10.0.0.0/29"), [("10.0.0.1", "10.0.0.6")])
+
+    def test_release_free_address_is_noop(self):
+        """Test: releasing already free address keeps ranges intact"""
+        self.allocator.init_pool("10.0.0.0/29", [])
+
+        self.allocator.release("10.0.0.2")
+
+        self.assertEqual(self._ranges("10.0.0.0/29"), [("10.0.0.1", "10.0.0.6")])
+
+    def test_exhausted_pool(self):
+        """Test: exhausted pool has no free address"""
+        self.allocator.init_pool("10.0.0.0/30", ["10.0.0.1"])
+        self.allocator.reserve("10.0.0.2")
+
+        self.assertIsNone(self.allocator.first_free("10.0.0.0/30"))
+
+    def test_invalid_address_ignored(self):
+        """Test: invalid addresses are ignored"""
+        self.allocator.init_pool("10.0.0.0/30", [])
+
+        self.allocator.reserve("")
+        self.allocator.release("not-an-ip")
+
+        self.assertEqual(self._ranges("10.0.0.0/30"), [("10.0.0.1", "10.0.0.2")])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
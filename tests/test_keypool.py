@@ -0,0 +1,90 @@
+import base64
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastwg.core.database import Database
+from fastwg.core.keypool import generate_keypair, generate_keypairs
+from fastwg.core.wireguard import WireGuardManager
+
+
+class TestKeyPool(unittest.TestCase):
+    """Tests for pre-generated keypair pool"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = Database(os.path.join(self.temp_dir, "test.db"))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.wg_manager.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_generated_public_key_matches_private_key(self):
+        """Test: keypair public key is derived from its private key"""
+        private_key, public_key = generate_keypair()
+
+        self.assertEqual(len(base64.b64decode(private_key)), 32)
+        self.assertEqual(self.wg_manager._generate_public_key(private_key), public_key)
+
+    def test_generate_keypairs_in_process_pool(self):
+        """Test: batch larger than one chunk is generated by worker processes"""
+        keypairs = generate_keypairs(600, workers=2)
+
+        self.assertEqual(len(keypairs), 600)
+        self.assertEqual(len({public_key for _, public_key in keypairs}), 600)
+
+    def test_fill_tops_up_pool(self):
+        """Test: filling pool only generates missing keypairs"""
+        self.assertEqual(self.wg_manager.fill_keypool(5, workers=1), 5)
+        self.assertEqual(self.wg_manager.fill_keypool(8, workers=1), 3)
+        self.assertEqual(self.wg_manager.db.count_keypairs(), 8)
+
+    def test_keypairs_taken_oldest_first_and_removed(self):
+        """Test: taking keypair removes it from pool"""
+        keypairs = [generate_keypair() for _ in range(2)]
+        self.wg_manager.db.add_keypairs(keypairs)
+
+        self.assertEqual(self.wg_manager._take_keypair(), keypairs[0])
+        self.assertEqual(self.wg_manager._take_keypair(), keypairs[1])
+        self.assertEqual(self.wg_manager.db.count_keypairs(), 0)
+
+    def test_empty_pool_generates_inline(self):
+        """Test: empty pool falls back to generating keypair on demand"""
+        private_key, public_key = self.wg_manager._take_keypair()
+
+        self.assertEqual(self.wg_manager._generate_public_key(private_key), public_key)
+
+    def test_low_pool_refilled_in_background(self):
+        """Test: taking keypair below half of pool size starts refill"""
+        self.wg_manager.keypool_size = 4
+        self.wg_manager.db.add_keypairs([generate_keypair()])
+
+        with patch.object(self.wg_manager, "fill_keypool") as fill:
+            self.wg_manager._take_keypair()
+            self.wg_manager._keypool_refill.join()
+
+        fill.assert_called_once_with(workers=1)
+
+    def test_refill_thread_closes_its_connection(self):
+        """Test: background refills leave no connections behind"""
+        self.wg_manager.keypool_size = 4
+        connections = len(self.wg_manager.db._connections)
+
+        for _ in range(3):
+            # Drain the pool until a new refill starts, then wait for it
+            refill = self.wg_manager._keypool_refill
+            while self.wg_manager._keypool_refill is refill:
+                self.wg_manager._take_keypair()
+            self.wg_manager._keypool_refill.join()
+
+        self.assertEqual(self.wg_manager.db.count_keypairs(), 4)
+        self.assertEqual(len(self.wg_manager.db._connections), connections)
+
+
+if __name__ == "__main__":
+    unittest.main()
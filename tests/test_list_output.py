@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from fastwg.cli import cli
+from fastwg.core.database import Database
+from fastwg.models import Client
+from fastwg.utils.output import write_csv, write_json, write_ndjson, write_plain
+
+
+def row(name, created_at=datetime(2024, 1, 15, 14, 25, 10)):
+    """Builds listed client row"""
+    return {
+        "name": name,
+        "ip_address": "10.42.42.2",
+        "is_active": True,
+        "is_blocked": False,
+        "is_connected": False,
+        "last_seen": None,
+        "created_at": created_at,
+        "endpoint": None,
+        "rx_bytes": 0,
+        "tx_bytes": 0,
+    }
+
+
+class TestWriters(unittest.TestCase):
+    """Tests for streaming output writers"""
+
+    def test_json_streams_valid_array(self):
+        """Test: rows are written as one parseable array"""
+        out = io.StringIO()
+
+        self.assertEqual(write_json(iter([row("alice"), row("bob")]), out), 2)
+
+        data = json.loads(out.getvalue())
+        self.assertEqual([item["name"] for item in data], ["alice", "bob"])
+        self.assertEqual(data[0]["created_at"], "2024-01-15T14:25:10")
+
+    def test_json_empty(self):
+        """Test: no rows give an empty array"""
+        out = io.StringIO()
+
+        write_json(iter([]), out)
+
+        self.assertEqual(json.loads(out.getvalue()), [])
+
+    def test_ndjson_line_per_row(self):
+        """Test: each row is a separate JSON line"""
+        out = io.StringIO()
+
+        write_ndjson(iter([row("alice"), row("bob")]), out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["alice", "bob"])
+
+    def test_csv_header_and_rows(self):
+        """Test: CSV has header and quoted values"""
+        out = io.StringIO()
+
+        write_csv(iter([row("a,b")]), out)
+
+        records = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(records[0]["name"], "a,b")
+        self.assertEqual(records[0]["last_seen"], "")
+
+    def test_plain_columns_aligned(self):
+        """Test: plain columns use fixed widths without buffering"""
+        out = io.StringIO()
+
+        write_plain(
+            iter([["alice", "10.42.42.2", "x"], ["bob", "10.42.42.10", "y"]]),
+            out,
+            ["Name", "IP", "A", "B", "Status"],
+            5,
+            lambda cells: [cells[0], cells[1], "-", "-", cells[2]],
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len({line.index("10.42") for line in lines[1:]}), 1)
+        self.assertTrue(lines[2].endswith("y"))
+
+
+class TestListFormats(unittest.TestCase):
+    """Tests for list command output formats"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        db = Database()
+        for index, name in enumerate(("carol", "alice", "bob")):
+            db.add_client(
+                Client(
+                    id=None,
+                    name=name,
+                    public_key=f"{name}_key=",
+                    private_key=f"{name}_private=",
+                    ip_address=f"10.42.42.{10 - index}",
+                    created_at=datetime.now(),
+                    is_active=True,
+                    is_blocked=name == "bob",
+                    last_seen=None,
+                    config_path=None,
+                )
+            )
+        db.close()
+
+        for patcher in (
+            patch("os.geteuid", return_value=0),
+            patch.dict(os.environ, {"FASTWG_SOCKET": ""}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _list(self, *args):
+        result = CliRunner().invoke(cli, ["list", *args])
+        self.assertEqual(result.exit_code, 0, result.output)
+        return result.output
+
+    def test_ndjson_sorted_and_limited(self):
+        """Test: sort, reverse and limit apply to streamed output"""
+        output = self._list(
+            "--all", "--format", "ndjson", "--sort", "ip_address", "--reverse"
+        )
+        names = [json.loads(line)["name"] for line in output.splitlines()]
+        self.assertEqual(names, ["carol", "alice", "bob"])
+
+        output = self._list("--format", "ndjson", "--limit", "1")
+        self.assertEqual(
+            [json.loads(line)["name"] for line in output.splitlines()], ["alice"]
+        )
+
+    def test_plain_without_color_when_piped(self):
+        """Test: output to a pipe has no escape codes"""
+        output = self._list("--all", "--format", "plain")
+
+        self.assertNotIn("\x1b[", output)
+        self.assertEqual(len(output.splitlines()), 4)
+        self.assertIn("Blocked", output)
+
+    def test_table_without_color_when_piped(self):
+        """Test: default table has no escape codes outside a terminal"""
+        output = self._list()
+
+        self.assertNotIn("\x1b[", output)
+        self.assertIn("alice", output)
+
+    def test_json_empty_listing(self):
+        """Test: no matches give an empty JSON array"""
+        output = self._list("--prefix", "zz", "--format", "json")
+
+        self.assertEqual(json.loads(output), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Client, Server
+
+DUMP = "wg0\tserver_private=\tserver_public=\t51820\toff\n"
+
+
+class TestLiveApply(unittest.TestCase):
+    """Tests for applying server config without restarting the interface"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = MagicMock()
+        self.server = Server(
+            id=1,
+            interface="wg0",
+            private_key="server_private=",
+            public_key="server_public=",
+            address="10.42.42.1/24",
+            port=51820,
+            dns="8.8.8.8",
+            mtu=1420,
+            config_path=os.path.join(self.temp_dir, "wg0.conf"),
+            external_ip="192.168.1.1",
+        )
+        self.wg_manager.db.get_server_config.return_value = self.server
+        self.wg_manager.db.get_server_configs.return_value = [self.server]
+        self.clients = [self._client("alice", 2)]
+        self.wg_manager.db.iter_clients.side_effect = lambda **kwargs: (
+            {column: getattr(client, column) for column in kwargs["columns"]}
+            for client in self.clients
+        )
+        self.fingerprints = {}
+        self.wg_manager.db.get_config_fingerprint.side_effect = self.fingerprints.get
+        self.wg_manager.db.save_config_fingerprint.side_effect = (
+            lambda fingerprint: self.fingerprints.update(
+                {fingerprint.path: fingerprint}
+            )
+        )
+        self.commands = []
+        self.calls = []
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _client(self, name, host):
+        return Client(
+            id=host,
+            name=name,
+            public_key=f"{name}_key=",
+            private_key=f"{name}_private=",
+            ip_address=f"10.42.42.{host}",
+            created_at=datetime.now(),
+            is_active=True,
+            is_blocked=False,
+            last_seen=None,
+            config_path=None,
+        )
+
+    def _run(self, dump=DUMP):
+        """Returns fake subprocess.run recording issued commands"""
+
+        def run(cmd, *args, **kwargs):
+            self.commands.append(cmd[:2])
+            self.calls.append((cmd, kwargs.get("input")))
+            result = MagicMock()
+            result.returncode = 0
+            result.stderr = ""
+            result.stdout = dump if cmd[:2] == ["wg", "show"] else "[Interface]\n"
+            return result
+
+        return run
+
+    def test_peer_change_is_applied_with_syncconf(self):
+        """Test: adding a peer uses wg syncconf and keeps the interface up"""
+        self.wg_manager._update_server_config()
+        self.clients.append(self._client("bob", 3))
+
+        with patch("subprocess.run", side_effect=self._run()):
+            self.assertTrue(self.wg_manager._update_server_config(restart=True))
+
+        with open(self.server.config_path) as f:
+            self.assertIn("PublicKey = bob_key=", f.read())
+        self.assertIn(["wg-quick", "strip"], self.commands)
+        self.assertIn(["wg", "syncconf"], self.commands)
+        self.assertNotIn(["wg-quick", "down"], self.commands)
+
+    def test_stripped_config_is_piped_to_syncconf(self):
+        """Test: stripped config with the private key never touches disk"""
+        self.wg_manager._update_server_config()
+        self.clients.append(self._client("bob", 3))
+
+        with patch("subprocess.run", side_effect=self._run()), patch(
+            "tempfile.NamedTemporaryFile"
+        ) as temp_file:
+            self.assertTrue(self.wg_manager._update_server_config(restart=True))
+
+        temp_file.assert_not_called()
+        syncconf = [call for call in self.calls if call[0][:2] == ["wg", "syncconf"]]
+        self.assertEqual(
+            syncconf, [(["wg", "syncconf", "wg0", "/dev/stdin"], "[Interface]\n")]
+        )
+
+    def test_interface_change_falls_back_to_restart(self):
+        """Test: changing ListenPort restarts the interface"""
+        self.wg_manager._update_server_config()
+        self.server.port = 51821
+
+        with patch("subprocess.run", side_effect=self._run()):
+            self.assertTrue(self.wg_manager._update_server_config(restart=True))
+
+        self.assertEqual(self.commands, [["wg-quick", "down"], ["wg-quick", "up"]])
+
+    def test_stopped_interface_is_started(self):
+        """Test: interface that is not running is brought up by restart"""
+        self.wg_manager._update_server_config()
+
+        with patch("subprocess.run", side_effect=self._run(dump="")):
+            self.assertTrue(self.wg_manager._update_server_config(restart=True))
+
+        self.assertNotIn(["wg", "syncconf"], self.commands)
+        self.assertIn(["wg-quick", "up"], self.commands)
+
+    def test_unchanged_config_skips_write_and_reload(self):
+        """Test: regenerating identical config leaves file and interface alone"""
+        self.wg_manager._update_server_config()
+        mtime_ns = os.stat(self.server.config_path).st_mtime_ns
+
+        with patch("subprocess.run", side_effect=self._run()):
+            self.assertTrue(self.wg_manager._update_server_config(restart=True))
+
+        self.assertEqual(self.commands, [["wg", "show"]])
+        self.assertEqual(os.stat(self.server.config_path).st_mtime_ns, mtime_ns)
+        self.assertEqual(os.listdir(self.temp_dir), ["wg0.conf"])
+
+    def test_externally_edited_config_is_rewritten(self):
+        """Test: config edited outside of fastwg is regenerated"""
+        self.wg_manager._update_server_config()
+        with open(self.server.config_path, "a") as f:
+            f.write("# edited\n")
+
+        self.wg_manager._update_server_config()
+
+        with open(self.server.config_path) as f:
+            self.assertNotIn("# edited", f.read())
+
+    def test_reload_full_restart(self):
+        """Test: reload without live mode always restarts"""
+        self.wg_manager._update_server_config()
+
+        with patch("subprocess.run", side_effect=self._run()):
+            self.assertTrue(self.wg_manager.reload_config(live=False))
+
+        self.assertEqual(self.commands, [["wg-quick", "down"], ["wg-quick", "up"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+from datetime import datetime  # noqa: E402
+
+from fastwg.core.live import LiveState  # noqa: E402
+
+DUMP = (
+    "wg0\tserver_private=\tserver_public=\t51820\toff\n"
+    "wg0\tpeer1=\t(none)\t5.35.114.145:63557\t10.42.42.4/32\t1700000000\t1024\t2048\t25\n"
+    "wg0\tpeer2=\t(none)\t(none)\t10.42.42.3/32\t0\t0\t0\toff\n"
+    "wg1\tserver2_private=\tserver2_public=\t51821\t0x1234\n"
+    "wg1\tpeer3=\t(none)\t1.2.3.4:1000\t10.43.0.2/32,fd00::2/128\t1700000100\t5\t6\toff\n"
+)
+
+
+class TestLiveState(unittest.TestCase):
+    """Tests for `wg show all dump` parsing"""
+
+    def test_parse_interfaces(self):
+        """Test: interface rows are parsed without private keys"""
+        state = LiveState.parse(DUMP)
+
+        self.assertEqual(set(state.interfaces), {"wg0", "wg1"})
+        self.assertEqual(state.interfaces["wg0"].public_key, "server_public=")
+        self.assertEqual(state.interfaces["wg0"].listen_port, 51820)
+        self.assertIsNone(state.interfaces["wg0"].fwmark)
+        self.assertEqual(state.interfaces["wg1"].fwmark, "0x1234")
+
+    def test_parse_peers(self):
+        """Test: peer rows carry exact handshake, transfer and keepalive"""
+        state = LiveState.parse(DUMP)
+
+        peer = state.peers["peer1="]
+        self.assertEqual(peer.interface, "wg0")
+        self.assertEqual(peer.endpoint, "5.35.114.145:63557")
+        self.assertEqual(peer.latest_handshake, 1700000000)
+        self.assertEqual(peer.handshake_time, datetime.fromtimestamp(1700000000))
+        self.assertEqual(peer.rx_bytes, 1024)
+        self.assertEqual(peer.tx_bytes, 2048)
+        self.assertEqual(peer.persistent_keepalive, 25)
+
+        idle = state.peers["peer2="]
+        self.assertIsNone(idle.endpoint)
+        self.assertIsNone(idle.handshake_time)
+        self.assertEqual(idle.persistent_keepalive, 0)
+
+    def test_interface_lookup(self):
+        """Test: peers are resolved to their interface"""
+        state = LiveState.parse(DUMP)
+
+        self.assertEqual(state.interface_of("peer3="), "wg1")
+        self.assertIsNone(state.interface_of("unknown="))
+        self.assertEqual(
+            [peer.public_key for peer in state.interface_peers("wg0")],
+            ["peer1=", "peer2="],
+        )
+
+    def test_parse_skips_malformed_rows(self):
+        """Test: rows of unexpected shape are ignored"""
+        state = LiveState.parse("garbage\n\nwg0\tonly\tthree\n")
+
+        self.assertEqual(state.interfaces, {})
+        self.assertEqual(state.peers, {})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
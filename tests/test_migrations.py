@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+from unittest.mock import patch  # noqa: E402
+
+from fastwg.core import migrations  # noqa: E402
+from fastwg.core.database import Database  # noqa: E402
+
+
+class TestMigrations(unittest.TestCase):
+    """Tests for user_version based schema migrations"""
+
+    def setUp(self):
+        """Setup before each test"""
+        self.temp_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.temp_db.close()
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        os.unlink(self.temp_db.name)
+
+    def _tables(self, db):
+        cursor = db.get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+        return {row[0] for row in cursor}
+
+    def _columns(self, db, table):
+        cursor = db.get_connection().execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cursor}
+
+    def test_new_database_gets_latest_schema(self):
+        """Test: new database has all tables and latest version"""
+        db = Database(self.temp_db.name)
+        try:
+            self.assertEqual(db.schema_version(), len(migrations.MIGRATIONS))
+            self.assertLessEqual(
+                {"clients", "server", "ip_pools", "config_fingerprints", "keypairs"},
+                self._tables(db),
+            )
+        finally:
+            db.close()
+
+    def test_up_to_date_database_skips_migrations(self):
+        """Test: opening migrated database only reads the version"""
+        Database(self.temp_db.name).close()
+
+        with patch.object(Database, "_migrate_database") as migrate:
+            Database(self.temp_db.name).close()
+
+        migrate.assert_not_called()
+
+    def test_legacy_database_is_upgraded(self):
+        """Test: unversioned database from early releases gains new columns"""
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute(
+            "CREATE TABLE clients (id INTEGER PRIMARY KEY, name TEXT UNIQUE, "
+            "public_key TEXT, private_key TEXT, ip_address TEXT, "
+            "created_at TIMESTAMP, is_active BOOLEAN, is_blocked BOOLEAN, "
+            "last_seen TIMESTAMP)"
+        )
+        conn.execute(
+            "CREATE TABLE server (id INTEGER PRIMARY KEY, interface TEXT, "
+            "private_key TEXT, public_key TEXT, address TEXT, port INTEGER, "
+            "dns TEXT, mtu INTEGER, config_path TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO clients (name, public_key, private_key, ip_address) "
+            "VALUES ('alice', 'key', 'private', '10.0.0.2')"
+        )
+        conn.commit()
+        conn.close()
+
+        db = Database(self.temp_db.name)
+        try:
+            self.assertIn("config_path", self._columns(db, "clients"))
+            self.assertIn("external_ip", self._columns(db, "server"))
+            self.assertEqual(db.get_client("alice").ip_address, "10.0.0.2")
+            self.assertEqual(db.schema_version(), len(migrations.MIGRATIONS))
+        finally:
+            db.close()
+
+    def test_minute_traffic_buckets_are_dropped(self):
+        """Test: upgrade removes 1-minute traffic rows, coarser ones stay"""
+        db = Database(self.temp_db.name)
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO traffic (resolution, bucket, public_key) VALUES (?, 0, 'a')",
+                [(60,), (3600,)],
+            )
+            version = migrations.MIGRATIONS.index(migrations._drop_minute_traffic)
+            conn.execute(f"PRAGMA user_version = {version}")
+        db.close()
+
+        db = Database(self.temp_db.name)
+        try:
+            rows = db.get_connection().execute("SELECT resolution FROM traffic")
+            self.assertEqual(rows.fetchall(), [(3600,)])
+        finally:
+            db.close()
+
+    def test_failed_migration_keeps_previous_steps(self):
+        """Test: failing step is rolled back while earlier steps stay applied"""
+        Database(self.temp_db.name).close()
+        version = len(migrations.MIGRATIONS)
+
+        def create_extra(conn):
+            conn.execute("CREATE TABLE extra (id INTEGER)")
+
+        def broken(conn):
+            conn.execute("CREATE TABLE half_done (id INTEGER)")
+            raise sqlite3.OperationalError("boom")
+
+        steps = migrations.MIGRATIONS + [create_extra, broken]
+        with patch("fastwg.core.database.MIGRATIONS", steps):
+            with self.assertRaises(sqlite3.OperationalError):
+                Database(self.temp_db.name)
+
+        db = Database(self.temp_db.name)
+        try:
+            self.assertEqual(db.schema_version(), version + 1)
+            self.assertIn("extra", self._tables(db))
+            self.assertNotIn("half_done", self._tables(db))
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
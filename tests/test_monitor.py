@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from fastwg.core.database import Database
+from fastwg.core.live import LiveState
+from fastwg.core.monitor import Monitor
+from fastwg.models import Client
+
+
+def dump(*peers):
+    """Builds `wg show all dump` output with given (key, endpoint, hs, rx, tx)"""
+    lines = ["wg0\tserver_private=\tserver_public=\t51820\toff"]
+    for key, endpoint, handshake, rx, tx in peers:
+        lines.append(
+            f"wg0\t{key}\t(none)\t{endpoint}\t10.42.42.2/32\t{handshake}\t{rx}\t{tx}\toff"
+        )
+    return "\n".join(lines)
+
+
+class TestMonitor(unittest.TestCase):
+    """Tests for batched peer state monitor"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.temp_dir, "test.db"))
+        self.db.add_client(
+            Client(
+                id=None,
+                name="alice",
+                public_key="alice_key=",
+                private_key="alice_private=",
+                ip_address="10.42.42.2",
+                created_at=datetime.now(),
+                is_active=True,
+                is_blocked=False,
+                last_seen=None,
+                config_path=None,
+            )
+        )
+        self.output = ""
+        self.monitor = Monitor(
+            self.db, interval=0, read_state=lambda: LiveState.parse(self.output)
+        )
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_first_sample_records_peers_and_last_seen(self):
+        """Test: new peers are stored and handshake becomes last seen"""
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 10, 20))
+
+        self.assertEqual(self.monitor.tick(), 1)
+
+        stats = self.db.get_peer_stats()["alice_key="]
+        self.assertEqual((stats.rx_bytes, stats.tx_bytes), (10, 20))
+        self.assertEqual(stats.endpoint, "1.2.3.4:5000")
+        self.assertEqual(
+            self.db.get_client("alice").last_seen, datetime.fromtimestamp(1700000000)
+        )
+
+    def test_first_sample_is_baseline(self):
+        """Test: counters of a new peer are stored but not booked as traffic"""
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 5000, 7000))
+
+        self.assertEqual(self.monitor.tick(), 1)
+
+        stats = self.db.get_peer_stats()["alice_key="]
+        self.assertEqual((stats.rx_bytes, stats.tx_bytes), (5000, 7000))
+        now = int(datetime.now().timestamp())
+        self.assertEqual(self.db.top_traffic(now - 3600, now), [])
+
+    def test_unchanged_peers_not_written(self):
+        """Test: identical sample produces no writes"""
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 10, 20))
+        self.monitor.tick()
+
+        self.assertEqual(self.monitor.tick(), 0)
+
+    def test_traffic_change_keeps_last_seen(self):
+        """Test: counter change is recorded without touching last seen"""
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 10, 20))
+        self.monitor.tick()
+        self.db.update_last_seen_many({"alice": datetime(2020, 1, 1)})
+
+        self.output = dump(("alice_key=", "1.2.3.4:6000", 1700000000, 50, 60))
+        self.assertEqual(self.monitor.tick(), 1)
+
+        stats = self.db.get_peer_stats()["alice_key="]
+        self.assertEqual((stats.endpoint, stats.rx_bytes), ("1.2.3.4:6000", 50))
+        self.assertEqual(self.db.get_client("alice").last_seen, datetime(2020, 1, 1))
+
+    def test_restart_continues_from_recorded_state(self):
+        """Test: new monitor does not rewrite peers recorded before"""
+        self.output = dump(("alice_key=", "(none)", 0, 0, 0))
+        self.monitor.tick()
+
+        restarted = Monitor(self.db, read_state=lambda: LiveState.parse(self.output))
+        self.assertEqual(restarted.tick(), 0)
+
+    def test_traffic_deltas_recorded(self):
+        """Test: counter growth between samples lands in traffic series
+
+        The first sample is only a baseline, counters before it are not traffic.
+        """
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 100, 10))
+        self.monitor.tick()
+        self.output = dump(("alice_key=", "1.2.3.4:5000", 1700000000, 250, 40))
+        self.monitor.tick()
+
+        now = int(datetime.now().timestamp())
+        top = self.db.top_traffic(now - 3600, now)
+        self.assertEqual(
+            [(row["name"], row["rx_bytes"], row["tx_bytes"]) for row in top],
+            [("alice", 150, 30)],
+        )
+
+    def test_inactive_wireguard(self):
+        """Test: no live state means nothing to record"""
+        monitor = Monitor(self.db, read_state=lambda: None)
+
+        self.assertEqual(monitor.tick(), 0)
+
+    def test_run_ticks_requested_times(self):
+        """Test: run loop performs given number of ticks"""
+        samples = []
+        monitor = Monitor(
+            self.db, interval=0, read_state=lambda: samples.append(1) or None
+        )
+
+        monitor.run(iterations=3)
+
+        self.assertEqual(len(samples), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
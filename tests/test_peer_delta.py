@@ -0,0 +1,240 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastwg.core.delta import PeerDelta, PeerSpec
+from fastwg.core.live import PeerState
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Client, Server
+
+
+def _live_peer(public_key, allowed_ips):
+    return PeerState("wg0", public_key, None, allowed_ips, 0, 0, 0, 0)
+
+
+class TestPeerDelta(unittest.TestCase):
+    """Tests for peer delta computation"""
+
+    def test_between_detects_add_update_remove(self):
+        """Test: delta contains exactly the changed peers"""
+        desired = [
+            PeerSpec("same=", "10.0.0.2/32"),
+            PeerSpec("moved=", "10.0.0.3/32"),
+            PeerSpec("new=", "10.0.0.4/32"),
+        ]
+        live = [
+            _live_peer("same=", "10.0.0.2/32"),
+            _live_peer("moved=", "10.0.0.9/32"),
+            _live_peer("stale=", "10.0.0.5/32"),
+        ]
+
+        delta = PeerDelta.between(desired, live)
+
+        self.assertEqual(delta.add, [PeerSpec("new=", "10.0.0.4/32")])
+        self.assertEqual(delta.update, [PeerSpec("moved=", "10.0.0.3/32")])
+        self.assertEqual(delta.remove, ["stale="])
+
+    def test_between_ignores_allowed_ips_order(self):
+        """Test: allowed IPs are compared as sets"""
+        delta = PeerDelta.between(
+            [PeerSpec("key=", "10.0.0.2/32,fd00::2/128")],
+            [_live_peer("key=", "fd00::2/128,10.0.0.2/32")],
+        )
+
+        self.assertTrue(delta.is_empty())
+
+    def test_wg_set_commands_single_invocation(self):
+        """Test: all changes go into one `wg set` call"""
+        delta = PeerDelta(add=[PeerSpec("new=", "10.0.0.4/32")], remove=["old="])
+
+        self.assertEqual(
+            delta.wg_set_commands("wg0"),
+            [
+                [
+                    "wg",
+                    "set",
+                    "wg0",
+                    "peer",
+                    "new=",
+                    "allowed-ips",
+                    "10.0.0.4/32",
+                    "peer",
+                    "old=",
+                    "remove",
+                ]
+            ],
+        )
+
+    def test_wg_set_commands_batches_large_delta(self):
+        """Test: very large deltas are split into bounded batches"""
+        delta = PeerDelta(remove=[f"key{i}=" for i in range(PeerDelta.BATCH_SIZE + 1)])
+
+        commands = delta.wg_set_commands("wg0")
+
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(
+            commands[1],
+            ["wg", "set", "wg0", "peer", f"key{PeerDelta.BATCH_SIZE}=", "remove"],
+        )
+
+
+class TestPeerDeltaOperations(unittest.TestCase):
+    """Tests for per-operation peer updates in WireGuardManager"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = MagicMock()
+        self.wg_manager.db.get_server_config.return_value = Server(
+            id=1,
+            interface="wg3",
+            private_key="server_private=",
+            public_key="server_public=",
+            address="10.42.42.1/24",
+            port=51820,
+            dns="8.8.8.8",
+            mtu=1420,
+            config_path=os.path.join(self.temp_dir, "wg3.conf"),
+            external_ip="192.168.1.1",
+        )
+        self.client = Client(
+            id=1,
+            name="alice",
+            public_key="alice_key=",
+            private_key="alice_private=",
+            ip_address="10.42.42.2",
+            created_at=datetime.now(),
+            is_active=True,
+            is_blocked=False,
+            last_seen=None,
+            config_path=None,
+        )
+        self.wg_manager.db.get_client.return_value = self.client
+        self.wg_manager.db.iter_clients.return_value = iter([])
+        self.wg_manager.db.update_client_status.return_value = True
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("subprocess.run")
+    def test_disable_removes_peer_on_known_interface(self, mock_run):
+        """Test: disable issues one `wg set` without querying `wg show`"""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+
+        self.assertTrue(self.wg_manager.disable_client("alice"))
+
+        mock_run.assert_called_once_with(
+            ["wg", "set", "wg3", "peer", "alice_key=", "remove"],
+            capture_output=True,
+            text=True,
+        )
+
+    @patch("subprocess.run")
+    def test_enable_adds_peer_and_appends_config(self, mock_run):
+        """Test: enable adds the peer live and appends it to server config"""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        self.client.is_active = False
+        self.client.is_blocked = True
+        config_path = os.path.join(self.temp_dir, "wg3.conf")
+        with open(config_path, "w") as f:
+            f.write("[Interface]\nPrivateKey = server_private=\n")
+
+        self.assertTrue(self.wg_manager.enable_client("alice"))
+
+        mock_run.assert_called_once_with(
+            ["wg", "set", "wg3", "peer", "alice_key=", "allowed-ips", "10.42.42.2/32"],
+            capture_output=True,
+            text=True,
+        )
+        with open(config_path) as f:
+            content = f.read()
+        self.assertEqual(
+            content,
+            "[Interface]\nPrivateKey = server_private=\n\n"
+            "[Peer]\n# alice\nPublicKey = alice_key=\nAllowedIPs = 10.42.42.2/32\n\n",
+        )
+        self.wg_manager.db.iter_clients.assert_not_called()
+        self._assert_fingerprint_saved(config_path, content)
+
+    @patch("subprocess.run")
+    def test_disable_drops_peer_section_from_config(self, mock_run):
+        """Test: disable removes only the client section, without reading clients"""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        config_path = os.path.join(self.temp_dir, "wg3.conf")
+        interface = "[Interface]\nPrivateKey = server_private=\n\n"
+        bob = "[Peer]\n# bob\nPublicKey = bob_key=\nAllowedIPs = 10.42.42.3/32\n\n"
+        alice = (
+            "[Peer]\n# alice\nPublicKey = alice_key=\nAllowedIPs = 10.42.42.2/32\n\n"
+        )
+        with open(config_path, "w") as f:
+            f.write(interface + alice + bob)
+
+        self.assertTrue(self.wg_manager.disable_client("alice"))
+
+        with open(config_path) as f:
+            content = f.read()
+        self.assertEqual(content, interface + bob)
+        self.wg_manager.db.iter_clients.assert_not_called()
+        self._assert_fingerprint_saved(config_path, content)
+
+    def _assert_fingerprint_saved(self, config_path, content):
+        """Asserts saved fingerprint describes the written config"""
+        fingerprint = self.wg_manager.db.save_config_fingerprint.call_args[0][0]
+        stat = os.stat(config_path)
+        self.assertEqual(fingerprint.path, config_path)
+        self.assertEqual(
+            fingerprint.sha256, hashlib.sha256(content.encode("utf-8")).hexdigest()
+        )
+        self.assertEqual(
+            (fingerprint.mtime_ns, fingerprint.size), (stat.st_mtime_ns, stat.st_size)
+        )
+
+    @patch("subprocess.run")
+    def test_enable_peer_already_in_config(self, mock_run):
+        """Test: enable keeps one section of a peer the config already has"""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        config_path = os.path.join(self.temp_dir, "wg3.conf")
+        interface = "[Interface]\nPrivateKey = server_private=\n\n"
+        bob = "[Peer]\n# bob\nPublicKey = bob_key=\nAllowedIPs = 10.42.42.3/32\n\n"
+        with open(config_path, "w") as f:
+            f.write(interface + "[Peer]\nPublicKey = alice_key=\n\n" + bob)
+
+        self.assertTrue(self.wg_manager.enable_client("alice"))
+
+        with open(config_path) as f:
+            content = f.read()
+        self.assertEqual(
+            content,
+            interface
+            + bob
+            + "[Peer]\n# alice\nPublicKey = alice_key=\nAllowedIPs = 10.42.42.2/32\n\n",
+        )
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch("subprocess.run")
+    def test_repeated_disable_and_enable_reconcile(self, mock_run):
+        """Test: commands repeated after a failed apply still fix the peer"""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        # Database already has the new status, interface still has the old one
+        self.client.is_active = False
+        self.client.is_blocked = True
+
+        self.assertTrue(self.wg_manager.disable_client("alice"))
+        self.client.is_active = True
+        self.client.is_blocked = False
+        self.assertTrue(self.wg_manager.enable_client("alice"))
+
+        self.assertEqual(
+            [call.args[0][5:] for call in mock_run.call_args_list],
+            [["remove"], ["allowed-ips", "10.42.42.2/32"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
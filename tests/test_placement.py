@@ -0,0 +1,271 @@
+import ipaddress
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from benchmarks.fleet import Fleet
+from fastwg.core import migrations, placement
+from fastwg.core.database import Database
+from fastwg.core.live import LiveState, PeerState
+from fastwg.core.placement import InterfaceLoad, place, plan_moves
+from tests.test_interfaces import make_client, make_server
+
+
+class TestPlacement(unittest.TestCase):
+    """Tests for picking interfaces of new clients"""
+
+    def test_peers_policy_spreads_bulk_creation(self):
+        """Test: clients fill the emptier interface, then alternate"""
+        loads = [
+            InterfaceLoad("wg0", 10, 0.0, 200),
+            InterfaceLoad("wg1", 6, 0.0, 200),
+        ]
+        targets = place(loads, "peers", 8)
+        self.assertEqual(targets[:4], ["wg1"] * 4)
+        self.assertEqual(targets.count("wg0"), 2)
+        self.assertEqual(targets.count("wg1"), 6)
+
+    def test_traffic_policy(self):
+        """Test: quiet interface gets clients until charged with their traffic"""
+        loads = [
+            InterfaceLoad("wg0", 10, 9000.0, 200),
+            InterfaceLoad("wg1", 10, 1000.0, 200),
+        ]
+        self.assertEqual(place(loads, "traffic"), ["wg1"])
+        # Every new peer is charged 500 bytes, the average of existing ones
+        self.assertEqual(place(loads, "traffic", 20).count("wg1"), 18)
+
+    def test_free_and_first_policies(self):
+        """Test: free prefers the largest pool, first ignores load"""
+        loads = [
+            InterfaceLoad("wg0", 0, 0.0, 10),
+            InterfaceLoad("wg1", 50, 0.0, 200),
+        ]
+        self.assertEqual(place(loads, "free"), ["wg1"])
+        self.assertEqual(place(loads, "first", 2), ["wg0", "wg0"])
+
+    def test_full_interfaces_are_skipped(self):
+        """Test: placement stops when every pool is full"""
+        loads = [
+            InterfaceLoad("wg0", 0, 0.0, 1),
+            InterfaceLoad("wg1", 5, 0.0, 2),
+        ]
+        self.assertEqual(place(loads, "peers", 5), ["wg0", "wg1", "wg1"])
+
+    def test_unknown_policy(self):
+        """Test: unknown policy is rejected"""
+        with self.assertRaises(ValueError):
+            place([InterfaceLoad("wg0", 0, 0.0, 10)], "random")
+
+    def test_cli_offers_placement_policies(self):
+        """Test: CLI choices are the policies placement accepts"""
+        from fastwg import cli
+
+        self.assertIs(cli.PLACEMENT_POLICIES, placement.PLACEMENT_POLICIES)
+
+    def test_plan_moves(self):
+        """Test: moves even out counts, balanced hosts are left alone"""
+        loads = [
+            InterfaceLoad("wg0", 10, 0.0, 240),
+            InterfaceLoad("wg1", 0, 0.0, 250),
+            InterfaceLoad("wg2", 0, 0.0, 250),
+        ]
+        self.assertEqual(plan_moves(loads), [("wg0", "wg1", 3), ("wg0", "wg2", 3)])
+
+        balanced = [
+            InterfaceLoad("wg0", 4, 0.0, 240),
+            InterfaceLoad("wg1", 5, 0.0, 250),
+        ]
+        self.assertEqual(plan_moves(balanced), [])
+
+    def test_plan_moves_respects_pool_size(self):
+        """Test: small pools are not filled beyond their size"""
+        loads = [
+            InterfaceLoad("wg0", 30, 0.0, 0),
+            InterfaceLoad("wg1", 0, 0.0, 2),
+            InterfaceLoad("wg2", 0, 0.0, 100),
+        ]
+        self.assertEqual(plan_moves(loads), [("wg0", "wg2", 14), ("wg0", "wg1", 2)])
+
+    def test_decay(self):
+        """Test: recent traffic halves every half-life"""
+        half_life = placement.TRAFFIC_HALF_LIFE
+        self.assertEqual(placement.decay(800.0, 0, 2 * half_life), 200.0)
+        self.assertEqual(placement.decay(800.0, 10, 5), 800.0)
+
+
+class TestInterfaceStats(unittest.TestCase):
+    """Tests for per-interface counters in the database"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "wireguard.db")
+        self.db = Database(self.db_path)
+        self.db.save_server_config(make_server("wg0", "10.1.0.1/24", 51820))
+        self.db.save_server_config(make_server("wg1", "10.2.0.1/24", 51821))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _peers(self):
+        return {
+            interface: peers
+            for interface, (peers, _) in self.db.get_interface_stats(0).items()
+        }
+
+    def test_counts_follow_inserts_deletes_and_moves(self):
+        """Test: triggers keep client counts exact"""
+        self.db.add_client(make_client("alice", "10.1.0.2"))
+        self.db.add_clients(
+            [
+                make_client("bob", "10.2.0.2", "wg1"),
+                make_client("carol", "10.2.0.3", "wg1"),
+                make_client("alice", "10.2.0.4", "wg1"),
+            ]
+        )
+        self.assertEqual(self._peers(), {"wg0": 1, "wg1": 2})
+
+        self.assertEqual(self.db.move_clients({"bob": "10.1.0.9"}, "wg0"), 1)
+        self.assertEqual(self._peers(), {"wg0": 2, "wg1": 1})
+        self.assertEqual(self.db.get_client("bob").ip_address, "10.1.0.9")
+        self.assertEqual(self.db.get_free_ip("10.2.0.0/24", []), "10.2.0.1")
+
+        self.db.delete_client("carol")
+        self.assertEqual(self._peers(), {"wg0": 2, "wg1": 0})
+
+    def test_migration_counts_existing_clients(self):
+        """Test: counters are built from clients of older databases"""
+        self.db.add_client(make_client("alice", "10.1.0.2"))
+        self.db.add_client(make_client("bob", "10.2.0.2", "wg1"))
+        with self.db.transaction() as conn:
+            conn.execute("DROP TABLE interface_stats")
+            version = migrations.MIGRATIONS.index(migrations._create_interface_stats)
+            conn.execute(f"PRAGMA user_version = {version}")
+        self.db.close()
+
+        self.db = Database(self.db_path)
+        self.assertEqual(self._peers(), {"wg0": 1, "wg1": 1})
+
+    def test_recorded_traffic_per_interface(self):
+        """Test: peer samples add up into decayed interface traffic"""
+
+        def peer(interface, key, rx_bytes):
+            return PeerState(interface, key, None, "", 0, rx_bytes, 0, 0)
+
+        with patch("fastwg.core.database.datetime") as clock:
+            for hour, rx_bytes in enumerate((300, 700, 1100)):
+                clock.now.return_value = datetime.fromtimestamp(1000 + hour * 3600)
+                self.db.record_peer_states(
+                    [peer("wg0", "a=", rx_bytes), peer("wg1", "b=", 50)]
+                )
+
+        stats = self.db.get_interface_stats(1000 + 2 * 3600)
+        # First sample is a baseline, the next two add 400 bytes each
+        self.assertEqual(stats["wg0"][1], 400 / 2 + 400)
+        self.assertNotIn("wg1", stats)
+
+
+class TestPlacementManager(unittest.TestCase):
+    """Tests for placement and rebalancing against fake wg"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.fleet = Fleet(self.temp_dir, 10).build()
+        self.activation = self.fleet.activate()
+        self.activation.__enter__()
+        self.db = Database(self.fleet.db_path)
+        self.manager = self.fleet.manager(self.db)
+        with redirect_stdout(StringIO()):
+            self.manager.init_server_config("wg1", 51821, "10.99.0.0/24")
+            self.manager.set_host("203.0.113.1:51821", "wg1")
+            self.manager.start_server("wg1")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        self.activation.__exit__(None, None, None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _live_peers(self, interface):
+        return {peer.public_key for peer in LiveState.read().interface_peers(interface)}
+
+    def test_new_clients_go_to_least_loaded_interface(self):
+        """Test: clients without interface are spread by peer count"""
+        with redirect_stdout(StringIO()):
+            alice = self.manager.create_client("alice")
+            created = self.manager.create_clients(prefix="bulk_", count=12)
+
+        self.assertEqual(alice.interface, "wg1")
+        self.assertEqual(self.manager.count_clients(interface="wg0"), 12)
+        self.assertEqual(self.manager.count_clients(interface="wg1"), 11)
+        self.assertEqual([c.name for c in created], [f"bulk_{i}" for i in range(1, 13)])
+        wg1 = ipaddress.IPv4Network("10.99.0.0/24")
+        for client in created:
+            in_wg1 = ipaddress.IPv4Address(client.ip_address) in wg1
+            self.assertEqual(in_wg1, client.interface == "wg1")
+        self.assertEqual(len(self._live_peers("wg1")), 11)
+
+    def test_rebalance_moves_clients_in_batches(self):
+        """Test: rebalance evens out counts and moves peers between interfaces"""
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertTrue(self.manager.rebalance(dry_run=True))
+        self.assertIn("wg0 -> wg1: 5 clients", output.getvalue())
+        self.assertEqual(self.manager.count_clients(interface="wg1"), 0)
+
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertTrue(self.manager.rebalance(batch_size=2))
+        self.assertIn("wg0 -> wg1: moved 5/5", output.getvalue())
+        self.assertEqual(self.manager.count_clients(interface="wg0"), 5)
+        self.assertEqual(self.manager.count_clients(interface="wg1"), 5)
+
+        moved = [
+            self.db.get_client(row["name"])
+            for row in self.db.iter_clients(interface="wg1")
+        ]
+        wg1_keys = {client.public_key for client in moved}
+        self.assertEqual(self._live_peers("wg1"), wg1_keys)
+        self.assertFalse(self._live_peers("wg0") & wg1_keys)
+        for client in moved:
+            self.assertIn(
+                ipaddress.IPv4Address(client.ip_address),
+                ipaddress.IPv4Network("10.99.0.0/24"),
+            )
+            with open(f"./wireguard/configs/{client.name}.conf") as f:
+                config = f.read()
+            self.assertIn(f"Address = {client.ip_address}/24", config)
+            self.assertIn("Endpoint = 203.0.113.1:51821", config)
+
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertTrue(self.manager.rebalance())
+        self.assertIn("Interfaces are balanced", output.getvalue())
+
+    def test_rebalance_reads_clients_and_free_counts_once(self):
+        """Test: moved clients come from one query, free counts are not recounted"""
+        with patch.object(
+            self.db, "get_client", wraps=self.db.get_client
+        ) as get_client, patch.object(
+            self.db, "count_free_ips", wraps=self.db.count_free_ips
+        ) as count_free_ips, redirect_stdout(
+            StringIO()
+        ):
+            self.assertTrue(self.manager.rebalance(batch_size=2))
+
+        get_client.assert_not_called()
+        self.assertEqual(count_free_ips.call_count, 2)
+        self.assertEqual(self.manager.count_clients(interface="wg1"), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
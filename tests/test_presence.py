@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastwg.core.database import Database
+from fastwg.core.live import LiveState
+from fastwg.core.monitor import Monitor
+from fastwg.core.wireguard import WireGuardManager
+from fastwg.models import Client
+
+
+def dump(handshake, rx=100, tx=200):
+    """Builds `wg show all dump` output with alice's peer"""
+    return (
+        "wg0\tserver_private=\tserver_public=\t51820\toff\n"
+        f"wg0\talice_key=\t(none)\t1.2.3.4:5000\t10.42.42.2/32\t{handshake}\t{rx}\t{tx}\toff"
+    )
+
+
+class TestPresence(unittest.TestCase):
+    """Tests for list backed by recorded peer presence"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test.db")
+        self.wg_manager = WireGuardManager(config_dir=self.temp_dir)
+        self.wg_manager.db = Database(self.db_path)
+        for name in ("alice", "bob"):
+            self.wg_manager.db.add_client(
+                Client(
+                    id=None,
+                    name=name,
+                    public_key=f"{name}_key=",
+                    private_key=f"{name}_private=",
+                    ip_address="10.42.42.2" if name == "alice" else "10.42.42.3",
+                    created_at=datetime.now(),
+                    is_active=True,
+                    is_blocked=False,
+                    last_seen=None,
+                    config_path=None,
+                )
+            )
+        self.handshake = int(time.time()) - 30
+        self.output = dump(self.handshake)
+
+        patcher = patch("subprocess.run", side_effect=self._run)
+        self.run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.wg_manager.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, cmd, *args, **kwargs):
+        return MagicMock(returncode=0, stdout=self.output, stderr="")
+
+    def _clients(self, **kwargs):
+        return {c["name"]: c for c in self.wg_manager.list_clients(**kwargs)}
+
+    def test_list_is_pure_read(self):
+        """Test: list neither runs wg nor writes the database"""
+        version = self.wg_manager.db.data_version()
+        changes = self.wg_manager.db.get_connection().total_changes
+
+        clients = self._clients()
+
+        self.run.assert_not_called()
+        self.assertEqual(self.wg_manager.db.get_connection().total_changes, changes)
+        self.assertEqual(self.wg_manager.db.data_version(), version)
+        self.assertFalse(clients["alice"]["is_connected"])
+        self.assertEqual(clients["alice"]["rx_bytes"], 0)
+
+    def test_list_reads_presence_recorded_by_monitor(self):
+        """Test: connection state recorded by monitor is listed"""
+        Monitor(
+            self.wg_manager.db, read_state=lambda: LiveState.parse(self.output)
+        ).tick()
+
+        clients = self._clients()
+
+        self.run.assert_not_called()
+        self.assertTrue(clients["alice"]["is_connected"])
+        self.assertEqual(clients["alice"]["endpoint"], "1.2.3.4:5000")
+        self.assertEqual(clients["alice"]["tx_bytes"], 200)
+        self.assertEqual(
+            clients["alice"]["last_seen"], datetime.fromtimestamp(self.handshake)
+        )
+        self.assertFalse(clients["bob"]["is_connected"])
+        self.assertIsNone(clients["bob"]["endpoint"])
+
+    def test_live_refreshes_presence(self):
+        """Test: --live samples the interface before reading"""
+        clients = self._clients(live=True)
+
+        self.run.assert_called_once()
+        self.assertTrue(clients["alice"]["is_connected"])
+        self.assertTrue(self._clients()["alice"]["is_connected"])
+
+    def test_old_handshake_is_disconnected(self):
+        """Test: presence older than an hour is not connected"""
+        self.output = dump(int(time.time()) - 7200)
+
+        clients = self._clients(live=True)
+
+        self.assertFalse(clients["alice"]["is_connected"])
+        self.assertIsNotNone(clients["alice"]["last_seen"])
+
+    def test_concurrent_refreshes_count_traffic_once(self):
+        """Test: stale monitor sample does not count traffic twice"""
+        monitor = Monitor(
+            self.wg_manager.db, read_state=lambda: LiveState.parse(self.output)
+        )
+        monitor.tick()
+
+        # Another process refreshes presence between monitor ticks
+        self.output = dump(self.handshake, rx=300, tx=200)
+        other = Database(self.db_path)
+        try:
+            self.assertEqual(
+                other.record_peer_states(LiveState.parse(self.output).peers.values()), 1
+            )
+        finally:
+            other.close()
+
+        self.output = dump(self.handshake, rx=400, tx=200)
+        monitor.tick()
+
+        now = int(time.time())
+        top = self.wg_manager.db.top_traffic(now - 3600, now)
+        self.assertEqual(top[0]["rx_bytes"], 300)
+        self.assertEqual(top[0]["tx_bytes"], 0)
+
+    def test_unchanged_sample_is_not_written(self):
+        """Test: recording the same sample again changes nothing"""
+        peers = LiveState.parse(self.output).peers.values()
+
+        self.assertEqual(self.wg_manager.db.record_peer_states(peers), 1)
+        self.assertEqual(self.wg_manager.db.record_peer_states(peers), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+
+from fastwg.cli import cli  # noqa: E402
+from fastwg.core import profiling  # noqa: E402
+from fastwg.core.database import Database  # noqa: E402
+
+
+def busy() -> int:
+    """Profiled workload"""
+    return sum(len(str(number)) for number in range(20000))
+
+
+class TestCommandProfiler(unittest.TestCase):
+    """Tests for command profiling"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "list.pstats")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_writes_pstats_and_summary(self):
+        """Test: pstats file loads and summary names profiled functions"""
+        profiler = profiling.CommandProfiler("list", path=self.path, top=5)
+        profiler.start()
+        self.assertTrue(profiling.active())
+        busy()
+        summary = profiler.stop()
+
+        self.assertFalse(profiling.active())
+        stats = pstats.Stats(self.path)
+        self.assertTrue(any(key[2] == "busy" for key in stats.stats))
+        self.assertIn("Profile of `list`", summary)
+        self.assertIn("busy", summary)
+        self.assertNotIn("Allocations", summary)
+        with open(self.path + ".txt") as f:
+            self.assertEqual(f.read(), summary)
+
+    def test_memory_summary(self):
+        """Test: allocation tracking adds peak memory and allocation sites"""
+        profiler = profiling.CommandProfiler("scan", path=self.path, memory=True, top=3)
+        profiler.start()
+        data = [str(number) * 10 for number in range(5000)]
+        summary = profiler.stop()
+
+        self.assertTrue(data)
+        self.assertIn("KiB peak", summary)
+        self.assertIn("Top 3 allocation sites", summary)
+        self.assertIn(os.path.basename(__file__), summary)
+
+    def test_default_path(self):
+        """Test: default file is named after command"""
+        path = profiling.default_path("scan")
+        self.assertTrue(path.startswith("fastwg-scan-"))
+        self.assertTrue(path.endswith(".pstats"))
+
+
+class TestProfileOption(unittest.TestCase):
+    """Tests for the global --profile option"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        Database().close()
+
+        for patcher in (
+            patch("os.geteuid", return_value=0),
+            patch.dict(os.environ, {"FASTWG_SOCKET": ""}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_profile_output(self):
+        """Test: command output is unchanged and profile files are written"""
+        result = CliRunner().invoke(
+            cli,
+            ["--profile-output", "out.pstats", "list", "--all", "--format", "json"],
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.stdout, "[]\n")
+        self.assertIn("Profile of `list`", result.stderr)
+        self.assertTrue(os.path.exists("out.pstats"))
+        self.assertTrue(os.path.exists("out.pstats.txt"))
+        self.assertFalse(profiling.active())
+
+    def test_profile_default_path(self):
+        """Test: bare --profile writes file named after command"""
+        result = CliRunner().invoke(cli, ["--profile", "list", "--format", "csv"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        files = [name for name in os.listdir() if name.endswith(".pstats")]
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith("fastwg-list-"))
+
+
+if __name__ == "__main__":
+    unittest.main()
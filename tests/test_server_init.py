@@ -22,9 +22,8 @@ class TestServerInit(unittest.TestCase):
         self.mock_db.save_server_config.return_value = True
 
         # Create WireGuardManager with mocked database
-        with patch("fastwg.core.wireguard.Database") as mock_database_class:
-            mock_database_class.return_value = self.mock_db
-            self.wg_manager = WireGuardManager(config_dir=self.config_dir)
+        self.wg_manager = WireGuardManager(config_dir=self.config_dir)
+        self.wg_manager.db = self.mock_db
 
     def tearDown(self):
         """Clean up test environment"""
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported by `fastwg --help` and `fastwg status`
+HEAVY_MODULES = (
+    "cryptography",
+    "tabulate",
+    "sqlite3",
+    "fastwg.core.wireguard",
+    "fastwg.core.database",
+)
+
+# Modules only loaded by commands that use them, never by `fastwg --help`
+COMMAND_MODULES = (
+    "colorama",
+    "fastwg.core.live",
+    "fastwg.core.tracing",
+    "fastwg.core.profiling",
+)
+
+# Runs CLI command as root against a stopped WireGuard and reports modules
+CLI_SCRIPT = """
+import os, subprocess, sys
+from unittest.mock import MagicMock, patch
+from fastwg.cli import cli
+with patch("os.geteuid", return_value=0), patch(
+    "subprocess.run", return_value=MagicMock(returncode=1, stdout="", stderr="")
+):
+    try:
+        cli(sys.argv[1:])
+    except SystemExit:
+        pass
+sys.stderr.write(" ".join(sorted(sys.modules)))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    """Tests for modules loaded at CLI startup"""
+
+    def _loaded_modules(self, *args):
+        result = subprocess.run(
+            [sys.executable, "-c", CLI_SCRIPT, *args],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+        return set(result.stderr.split())
+
+    def test_help_skips_heavy_modules(self):
+        """Test: fastwg --help does not import heavy modules"""
+        modules = self._loaded_modules("--help")
+
+        self.assertIn("click", modules)
+        for module in HEAVY_MODULES + COMMAND_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_status_skips_heavy_modules(self):
+        """Test: fastwg status does not open database or load crypto"""
+        modules = self._loaded_modules("status")
+
+        self.assertIn("fastwg.core.live", modules)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_import_skips_translation_catalogs(self):
+        """Test: option help is translated when shown, not at import"""
+        script = (
+            "import fastwg.cli, fastwg.utils.i18n as i18n; "
+            "print(i18n._i18n is None); "
+            "from fastwg.cli import cli; cli(['create', '--help'])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            env={**os.environ, "FASTWG_LANG": "ru"},
+        )
+        self.assertTrue(result.stdout.startswith("True\n"), result.stderr)
+        self.assertIn("Интерфейс клиента", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+
+from fastwg.core import tracing  # noqa: E402
+from fastwg.core.database import Database  # noqa: E402
+from fastwg.models import ConfigFingerprint  # noqa: E402
+
+
+class TestTracer(unittest.TestCase):
+    """Tests for span trees"""
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        tracing.stop()
+
+    def test_disabled_span_is_shared_noop(self):
+        """Test that spans cost nothing while tracing is off"""
+        self.assertFalse(tracing.enabled())
+        self.assertIs(tracing.span("sql"), tracing.span("other", key="value"))
+        with tracing.span("sql"):
+            pass
+        self.assertIsNone(tracing.stop())
+
+    def test_spans_nest(self):
+        """Test that spans are attached to the innermost open span"""
+        tracer = tracing.start("create")
+        with tracing.span("outer"):
+            with tracing.span("inner", key="value"):
+                pass
+        with tracing.span("second"):
+            pass
+        root = tracing.stop()
+
+        self.assertIs(root, tracer)
+        self.assertFalse(tracing.enabled())
+        names = [child.name for child in tracer.root.children]
+        self.assertEqual(names, ["outer", "second"])
+        inner = tracer.root.children[0].children[0]
+        self.assertEqual(inner.label(), "inner key=value")
+        self.assertGreaterEqual(tracer.root.duration, inner.duration)
+
+    def test_text_folds_repeated_leaves(self):
+        """Test that identical sibling leaves are shown once with a count"""
+        tracer = tracing.start("list")
+        for _ in range(3):
+            with tracing.span("sql", statement="SELECT 1"):
+                pass
+        with tracing.span("write_config"):
+            with tracing.span("sql", statement="SELECT 2"):
+                pass
+        tracing.stop()
+
+        lines = tracer.render_text().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].endswith("list"))
+        self.assertTrue(lines[1].endswith("├─ sql statement=SELECT 1 (x3)"))
+        self.assertTrue(lines[2].endswith("└─ write_config"))
+        self.assertTrue(lines[3].endswith("   └─ sql statement=SELECT 2"))
+
+    def test_long_labels_are_cut(self):
+        """Test that attributes are shortened to one line"""
+        span = tracing.Span("sql", {"statement": "SELECT\n  " + "x" * 100})
+        self.assertEqual(len(span.label()), len("sql ") + tracing.LABEL_WIDTH)
+        self.assertNotIn("\n", span.label())
+
+    def test_json(self):
+        """Test JSON rendering of span tree"""
+        tracer = tracing.start("status")
+        with tracing.span("subprocess", command="wg show"):
+            pass
+        tracing.stop()
+
+        tree = json.loads(tracer.render("json"))
+        self.assertEqual(tree["name"], "status")
+        self.assertEqual(tree["children"][0]["attrs"], {"command": "wg show"})
+        self.assertEqual(tree["children"][0]["children"], [])
+        self.assertIsInstance(tree["duration_ms"], float)
+
+    def test_env_format(self):
+        """Test FASTWG_TRACE values"""
+        for value, expected in (
+            ("", None),
+            ("0", None),
+            ("1", "text"),
+            ("text", "text"),
+            ("JSON", "json"),
+        ):
+            with patch.dict(os.environ, {"FASTWG_TRACE": value}):
+                self.assertEqual(tracing.env_format(), expected)
+
+    @patch("subprocess.run")
+    def test_run_records_command(self, mock_run):
+        """Test that traced subprocess calls become spans"""
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        tracer = tracing.start("stop")
+        tracing.run(["wg-quick", "down", "wg0"], capture_output=True, text=True)
+        tracing.stop()
+
+        mock_run.assert_called_once_with(
+            ["wg-quick", "down", "wg0"], capture_output=True, text=True
+        )
+        self.assertEqual(
+            tracer.root.children[0].label(), "subprocess command=wg-quick down wg0"
+        )
+
+
+class TestDatabaseTracing(unittest.TestCase):
+    """Tests for traced database connections"""
+
+    def setUp(self):
+        """Setup before each test"""
+        self.temp_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.temp_db.close()
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        tracing.stop()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
+
+    def test_untraced_connection_is_plain(self):
+        """Test that connections opened without tracing are not wrapped"""
+        db = Database(self.temp_db.name)
+        self.assertIs(type(db.get_connection()), sqlite3.Connection)
+        db.close()
+
+    def test_queries_are_spans(self):
+        """Test that statements and commits of traced connections are spans"""
+        tracer = tracing.start("create")
+        db = Database(self.temp_db.name)
+        db.save_config_fingerprint(ConfigFingerprint("/etc/wg0.conf", "0" * 64, 1, 2))
+        db.get_config_fingerprints()
+        db.close()
+        tracing.stop()
+
+        statements = [
+            child.attrs["statement"]
+            for child in tracer.root.children
+            if child.name == "sql"
+        ]
+        self.assertIn("BEGIN IMMEDIATE", statements)
+        self.assertIn("COMMIT", statements)
+        self.assertTrue(any(s.startswith("SELECT") for s in statements))
+        self.assertTrue(all("\n" not in s for s in statements))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add project modules path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest  # noqa: E402
+
+from fastwg.core.traffic import (  # noqa: E402
+    DAY,
+    HOUR,
+    TrafficStore,
+    counter_delta,
+)
+
+# Midnight UTC, 2023-11-14
+T0 = 1699920000
+
+
+class TestTrafficStore(unittest.TestCase):
+    """Tests for per-peer traffic time series"""
+
+    def setUp(self):
+        """Setup before each test"""
+        self.temp_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.temp_db.close()
+        self.conn = sqlite3.connect(self.temp_db.name)
+        TrafficStore.create_table(self.conn)
+        self.store = TrafficStore(self.conn)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.conn.close()
+        os.unlink(self.temp_db.name)
+
+    def _rows(self, resolution):
+        cursor = self.conn.execute(
+            "SELECT bucket, public_key, rx_bytes, tx_bytes FROM traffic "
+            "WHERE resolution = ? ORDER BY bucket, public_key",
+            (resolution,),
+        )
+        return cursor.fetchall()
+
+    def test_samples_rolled_up_into_all_resolutions(self):
+        """Test: deltas accumulate in hour and day buckets"""
+        self.store.record({"a": (10, 1)}, T0 + 5)
+        self.store.record({"a": (20, 2)}, T0 + 30)
+        self.store.record({"a": (40, 4)}, T0 + HOUR + 5)
+
+        self.assertEqual(self._rows(HOUR), [(T0, "a", 30, 3), (T0 + HOUR, "a", 40, 4)])
+        self.assertEqual(self._rows(DAY), [(T0, "a", 70, 7)])
+        self.assertEqual(self._rows(60), [])
+
+    def test_idle_peers_not_stored(self):
+        """Test: zero deltas add no rows"""
+        self.store.record({"a": (0, 0)}, T0)
+
+        self.assertEqual(self._rows(HOUR), [])
+
+    def test_prune_applies_retention_per_resolution(self):
+        """Test: old buckets are dropped while coarser rollups stay"""
+        self.store.record({"a": (10, 0)}, T0)
+
+        self.store.prune(T0 + 40 * DAY)
+
+        self.assertEqual(self._rows(HOUR), [])
+        self.assertEqual(len(self._rows(DAY)), 1)
+
+    def test_rows_stay_bounded_over_many_ticks(self):
+        """Test: retention bounds rows per peer, max_rows caps the total"""
+        for hour in range(40 * 24):
+            now = T0 + hour * HOUR
+            self.store.record({"a": (1, 0), "b": (0, 1)}, now)
+            self.store.prune(now)
+        # Buckets from 30 days ago up to the current one
+        self.assertEqual(len(self._rows(HOUR)), 2 * (30 * 24 + 1))
+        self.assertEqual(len(self._rows(DAY)), 2 * 40)
+
+        self.store.prune(now, max_rows=51)
+
+        hours = self._rows(HOUR)
+        self.assertEqual(len(hours), 50)
+        self.assertEqual(hours[-1][0], now)
+        # Whole buckets are dropped, so both peers keep the same days
+        self.assertEqual(len(self._rows(DAY)), 50)
+
+    def test_top_orders_by_total_traffic(self):
+        """Test: top returns biggest peers first within limit"""
+        self.store.record({"a": (10, 0), "b": (50, 50), "c": (30, 0)}, T0)
+
+        self.assertEqual(
+            self.store.top(T0, T0 + HOUR, 2), [("b", 50, 50), ("c", 30, 0)]
+        )
+
+    def test_top_combines_hours_and_days(self):
+        """Test: partial first day comes from hourly buckets"""
+        self.store.record({"a": (1, 0)}, T0 + 2 * HOUR)
+        self.store.record({"a": (10, 0)}, T0 + 20 * HOUR)
+        self.store.record({"a": (100, 0)}, T0 + DAY + HOUR)
+
+        self.assertEqual(
+            self.store.top(T0 + 10 * HOUR, T0 + 2 * DAY, 5), [("a", 110, 0)]
+        )
+
+    def test_counter_reset(self):
+        """Test: decreasing counter counts from zero"""
+        self.assertEqual(counter_delta(150, 100), 50)
+        self.assertEqual(counter_delta(20, 100), 20)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)